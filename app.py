@@ -1,41 +1,283 @@
 """Application entry point for RSS Feed Reader
 """
-from sys import stdout
-from typing import Optional, Sequence, TextIO
-from model import RSSFeedChannel
+import json
+from concurrent.futures import Executor
+from functools import partial
+from sys import stderr, stdout
+from time import perf_counter
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, TextIO
+from model import RSSFeedChannel, RSSFeedItem
 from cli import CLIParser
 from cli import CLIWriter
+from feedwriters import CSVWriter, NDJSONWriter
 from rssfeedloader import RSSFeedLoader
 from rssfeedreader import RSSFeedReader
-from feedloaders import FeedParserRSSFeedLoader
+import feedloaders
+from feedloaders import FeedParserRSSFeedLoader, StreamingRSSFeedLoader
+from feedpool import FeedLoaderPool, UnavailableRSSFeedLoader
+from httpclient import PooledHTTPClient
+from fetchpolicy import CircuitBreaker, FetchPolicy
+from feedwatcher import FeedWatcher
+from feedcache import FeedCache
+from pipelinehooks import PipelineHooks
+from pipelinestats import PipelineHooksGroup, PipelineStats
+from seenindex import SeenItemIndex
+from searchindex import SearchIndex
+from feedsnapshots import FeedSnapshotStore
+from itemwindow import ItemWindow
+from itemcache import ConvertedItemCache
+from feedqueue import SQLiteFeedQueue
+from feedresults import FeedResultStore
+from queueworker import FeedQueueWorker
 
-def get_default_feedloader(rss_feed_url: str) -> RSSFeedLoader:
+def get_default_feedloader(rss_feed_url: str, feed_cache: Optional[FeedCache]=None, # pylint: disable=too-many-arguments
+hooks: Optional[PipelineHooks]=None, seen_index: Optional[SeenItemIndex]=None,
+parse_executor: Optional[Executor]=None,
+fetch_policy: Optional[FetchPolicy]=None,
+search_index: Optional[SearchIndex]=None,
+snapshot_store: Optional[FeedSnapshotStore]=None,
+item_window: Optional[ItemWindow]=None,
+item_cache: Optional[ConvertedItemCache]=None,
+keep_all_items: bool=False) -> RSSFeedLoader:
     """Factory method for default RSSFeedLoader implementation"""
-    return FeedParserRSSFeedLoader(rss_feed_url)
+    return FeedParserRSSFeedLoader(rss_feed_url, feed_cache=feed_cache, hooks=hooks,
+        seen_index=seen_index, parse_executor=parse_executor, fetch_policy=fetch_policy,
+        search_index=search_index, snapshot_store=snapshot_store, item_window=item_window,
+        item_cache=item_cache, keep_all_items=keep_all_items)
 
-def get_default_feedreader(file: TextIO) -> RSSFeedReader:
-    """Factory method for default RSSFeedReader implementation"""
-    return CLIWriter(file=file)
+def get_streaming_feedloader(rss_feed_url: str,
+fetch_policy: Optional[FetchPolicy]=None) -> RSSFeedLoader:
+    """Factory method for RSSFeedLoader implementation reading items as they are displayed"""
+    return StreamingRSSFeedLoader(rss_feed_url, fetch_policy=fetch_policy)
 
-def main(output_stream: TextIO=stdout, args: Optional[Sequence[str]]=None) -> None:
-    """Application entry point for RSS Feed Reader"""
-    cli_parser: CLIParser = CLIParser(file=output_stream)
-    cli_writer: RSSFeedReader = get_default_feedreader(file=output_stream)
-    cli_parser.parse_rss_feed_urls_from_args(args)
-    rss_feed_url_list: list[str] = [str(url) for url in cli_parser.get_list_of_rss_feed_urls()]
+def get_default_feedreader(file: TextIO, buffer_size: int=0,
+output_format: str='text') -> RSSFeedReader:
+    """Factory method for the RSSFeedReader implementation writing output_format, by default
+    CLIWriter"""
+    if output_format == 'ndjson':
+        return NDJSONWriter(file=file)
+    if output_format == 'csv':
+        return CSVWriter(file=file)
+    return CLIWriter(file=file, buffer_size=buffer_size)
+
+def _search_rss_feed_items(cli_parser: CLIParser, output_stream: TextIO) -> None:
+    """Show the indexed items matching the query of the search command"""
+    cli_writer: CLIWriter = CLIWriter(file=output_stream)
+    search_index: SearchIndex = SearchIndex(cli_parser.get_searched_index_path())
+    try:
+        cli_writer.show_search_results(search_index.search(cli_parser.get_search_query(),
+            since=cli_parser.get_search_since(), limit=cli_parser.get_search_limit()))
+    except ValueError as error:
+        print(error, file=cli_parser.get_diagnostic_stream())
+    search_index.close()
+
+def _build_fetch_policy(cli_parser: CLIParser) -> FetchPolicy:
+    """Returns the policy for fetching feeds requested on the CLI, with a circuit breaker
+    remembering failing feeds in a file or during this run only
+    """
+    return FetchPolicy(rate_limit=cli_parser.get_rate_limit(), retries=cli_parser.get_retries(),
+        circuit_breaker=CircuitBreaker(cli_parser.get_circuit_breaker_path() or ':memory:'))
+
+def _build_item_window(cli_parser: CLIParser) -> Optional[ItemWindow]:
+    """Returns the selection of items of every feed requested on the CLI, or None to show
+    all items
+    """
+    max_items: Optional[int] = cli_parser.get_max_items()
+    since: Optional[float] = cli_parser.get_items_since()
+    if max_items is None and since is None:
+        return None
+    return ItemWindow(max_items=max_items, since=since)
+
+def _open_stores(cli_parser: CLIParser) -> dict[str, Any]:
+    """Returns the persistent stores requested on the CLI, by the name of the
+    FeedParserRSSFeedLoader parameter taking each, with None for those not requested
+    """
+    cache_path: Optional[str] = cli_parser.get_cache_path()
+    seen_index_path: Optional[str] = cli_parser.get_seen_index_path()
+    search_index_path: Optional[str] = cli_parser.get_search_index_path()
+    snapshot_path: Optional[str] = cli_parser.get_snapshot_path()
+    return {
+        'feed_cache': FeedCache(cache_path) if cache_path else None,
+        'seen_index': SeenItemIndex(seen_index_path) if seen_index_path else None,
+        'search_index': SearchIndex(search_index_path) if search_index_path else None,
+        'snapshot_store': FeedSnapshotStore(snapshot_path) if snapshot_path else None
+    }
+
+def _open_queue_stores(cli_parser: CLIParser) -> dict[str, Any]:
+    """Returns the feed queue shared with other workers and the store of their results
+    requested on the CLI, with None for those not requested
+    """
+    queue_path: Optional[str] = cli_parser.get_queue_path()
+    results_path: Optional[str] = cli_parser.get_results_path()
+    return {
+        'feed_queue': SQLiteFeedQueue(queue_path, cli_parser.get_worker_id(),
+            lease_seconds=cli_parser.get_lease_seconds()) if queue_path else None,
+        'result_store': FeedResultStore(results_path) if results_path else None
+    }
+
+def _report_pipeline_stats(cli_parser: CLIParser, pipeline_stats: PipelineStats,
+components: dict[str, Any]) -> None:
+    """Show statistics as a table and/or write them as JSON, as requested on the CLI,
+    with the counters of every component that is not None under its name"""
+    name: str
+    component: Any
+    for name, component in components.items():
+        if component is not None:
+            pipeline_stats.add_counters(name, component.get_statistics())
+    if cli_parser.is_showing_stats():
+        print(pipeline_stats.format_summary_table(), file=cli_parser.get_diagnostic_stream())
+    stats_json_path: Optional[str] = cli_parser.get_stats_json_path()
+    if stats_json_path is not None:
+        stats_json_file: TextIO
+        with open(stats_json_path, mode='w', encoding='utf-8') as stats_json_file:
+            json.dump(pipeline_stats.to_dict(), stats_json_file, indent=2)
+
+def _get_load_error(feedloader: RSSFeedLoader) -> Optional[str]:
+    """Returns why feedloader could not load its feed, at all or completely, or None"""
+    if isinstance(feedloader, UnavailableRSSFeedLoader):
+        return feedloader.get_rss_feed_channel().description
+    if hasattr(feedloader, 'has_failed') and feedloader.has_failed():
+        return feedloader.get_error()
+    return None
 
-    # in the backgeound process all feed urls
-    feedloader_list: list[RSSFeedLoader] = []
+def _show_rss_feeds(feedloader_pool: FeedLoaderPool, rss_feed_urls: Iterable[str], # pylint: disable=too-many-arguments
+cli_writer: RSSFeedReader, hooks: Optional[PipelineHooks], skip_unchanged: bool=False,
+error_stream: TextIO=stderr) -> int:
+    """Load all feed urls in the background, displaying output in the original order.
+    With skip_unchanged, channels without any items to show are not displayed, unless
+    they could not be loaded. A feed that could not be loaded is shown as a channel
+    without items whose description is the error, and streamed feeds are shown up to
+    where they could not be read. Either way the feed is reported to error_stream once
+    shown. Returns the number of feeds reported."""
+    failed_feeds: int = 0
     rss_feed_url: str
-    for rss_feed_url in rss_feed_url_list:
-        feedloader: RSSFeedLoader = get_default_feedloader(rss_feed_url)
-        feedloader.load_rss_feed()
-        feedloader_list.append(feedloader)
-    # display all output together
     feedloader: RSSFeedLoader
-    for feedloader in feedloader_list:
+    for rss_feed_url, feedloader in feedloader_pool.load_rss_feeds(rss_feed_urls):
+        start: float = perf_counter()
         rss_feed_channel: RSSFeedChannel = feedloader.get_rss_feed_channel()
+        error: Optional[str] = _get_load_error(feedloader)
+        if skip_unchanged and not rss_feed_channel.items and error is None:
+            continue
+        if error is not None:
+            rss_feed_channel = RSSFeedChannel(
+                'No title', error, rss_feed_url, list[RSSFeedItem]())
         cli_writer.show_rss_feed_content(rss_feed_channel)
+        error = error or _get_load_error(feedloader)
+        if error is not None:
+            failed_feeds += 1
+            print(f'{rss_feed_url}: {error}', file=error_stream)
+        if hooks is not None:
+            hooks.on_stage(rss_feed_url, 'render', perf_counter() - start)
+    return failed_feeds
+
+def _watch_rss_feeds(feedloader_pool: FeedLoaderPool, rss_feed_urls: Iterable[str],
+cli_writer: RSSFeedReader, cli_parser: CLIParser) -> None:
+    """Keep loading feed urls when due and displaying new items until interrupted"""
+    default_interval: float
+    min_interval: float
+    max_interval: float
+    default_interval, min_interval, max_interval = cli_parser.get_refresh_intervals()
+    feed_watcher: FeedWatcher = FeedWatcher(feedloader_pool, cli_writer,
+        default_interval=default_interval, min_interval=min_interval, max_interval=max_interval)
+    rss_feed_url: str
+    for rss_feed_url in rss_feed_urls:
+        feed_watcher.add_rss_feed_url(rss_feed_url)
+    try:
+        feed_watcher.run()
+    except KeyboardInterrupt:
+        pass
+
+def _work_rss_feed_queue(feedloader_pool: FeedLoaderPool, rss_feed_urls: Iterable[str], # pylint: disable=too-many-arguments
+cli_writer: RSSFeedReader, cli_parser: CLIParser, queue_stores: dict[str, Any],
+skip_unchanged: bool=False) -> None:
+    """Add feed urls to the shared feed queue, then load this worker's share of the due
+    feeds until none is due, or keep doing so in watch mode until interrupted"""
+    queue_stores['feed_queue'].add_rss_feed_urls(rss_feed_urls)
+    default_interval: float
+    min_interval: float
+    max_interval: float
+    default_interval, min_interval, max_interval = cli_parser.get_refresh_intervals()
+    feed_queue_worker: FeedQueueWorker = FeedQueueWorker(queue_stores['feed_queue'],
+        feedloader_pool, cli_writer, cli_parser.get_worker_id(),
+        result_store=queue_stores['result_store'], default_interval=default_interval,
+        min_interval=min_interval, max_interval=max_interval, skip_unchanged=skip_unchanged)
+    try:
+        feed_queue_worker.run(watch=cli_parser.is_watching())
+    except KeyboardInterrupt:
+        pass
+
+def main(output_stream: TextIO=stdout, args: Optional[Sequence[str]]=None, # pylint: disable=too-many-locals
+hooks: Optional[PipelineHooks]=None, error_stream: TextIO=stderr) -> int:
+    """Application entry point for RSS Feed Reader, with optional parameter hooks
+    to observe the duration of each loading and rendering stage for every feed, and
+    optional parameter error_stream to report feeds that could not be loaded to, and to
+    print errors and statistics to when feeds are written as records. Returns the exit
+    status, 1 if a feed shown could not be loaded."""
+    cli_parser: CLIParser = CLIParser(file=output_stream, error_file=error_stream)
+    cli_parser.parse_rss_feed_urls_from_args(args)
+    if cli_parser.get_command() == 'search':
+        _search_rss_feed_items(cli_parser, output_stream)
+        return 0
+    pipeline_stats: Optional[PipelineStats] = None
+    if cli_parser.is_showing_stats() or cli_parser.get_stats_json_path() is not None:
+        pipeline_stats = PipelineStats()
+        hooks = pipeline_stats if hooks is None else PipelineHooksGroup([hooks, pipeline_stats])
+    cli_writer: RSSFeedReader = get_default_feedreader(file=output_stream,
+        buffer_size=cli_parser.get_buffer_size(), output_format=cli_parser.get_output_format())
+    rss_feed_urls: Iterator[str] = cli_parser.iter_rss_feed_urls()
+
+    timeout: Optional[float] = cli_parser.get_timeout()
+    feedloaders.http_client = PooledHTTPClient(
+        max_idle_connections_per_host=cli_parser.get_max_connections_per_host(), timeout=timeout)
+    stores: dict[str, Any] = _open_stores(cli_parser)
+    fetch_policy: FetchPolicy = _build_fetch_policy(cli_parser)
+    # items are only loaded again from the same feed in watch and queue modes
+    item_cache: Optional[ConvertedItemCache] = ConvertedItemCache() if (
+        cli_parser.is_watching() or cli_parser.get_queue_path() is not None) else None
+    parse_executor: Optional[Executor] = None
+    feedloader_factory: Callable[[str], RSSFeedLoader] = partial(
+        get_streaming_feedloader, fetch_policy=fetch_policy)
+    if not cli_parser.is_streaming():
+        if cli_parser.get_process_count() is not None:
+            from concurrent.futures import ProcessPoolExecutor # pylint: disable=import-outside-toplevel
+            parse_executor = ProcessPoolExecutor(max_workers=cli_parser.get_process_count())
+        feedloader_factory = partial(get_default_feedloader, hooks=hooks,
+            parse_executor=parse_executor, fetch_policy=fetch_policy,
+            item_window=_build_item_window(cli_parser), item_cache=item_cache,
+            keep_all_items=cli_parser.get_results_path() is not None, **stores)
+    feedloader_pool: FeedLoaderPool = FeedLoaderPool(
+        feedloader_factory,
+        max_workers=cli_parser.get_max_workers(),
+        max_connections_per_host=cli_parser.get_max_connections_per_host(),
+        timeout=timeout
+    )
+
+    queue_stores: dict[str, Any] = _open_queue_stores(cli_parser)
+    failed_feeds: int = 0
+    if queue_stores['feed_queue'] is not None:
+        _work_rss_feed_queue(feedloader_pool, rss_feed_urls, cli_writer, cli_parser,
+            queue_stores, skip_unchanged=stores['snapshot_store'] is not None)
+    elif cli_parser.is_watching():
+        _watch_rss_feeds(feedloader_pool, rss_feed_urls, cli_writer, cli_parser)
+    else:
+        failed_feeds = _show_rss_feeds(feedloader_pool, rss_feed_urls, cli_writer, hooks,
+            skip_unchanged=stores['snapshot_store'] is not None,
+            error_stream=error_stream)
+    if pipeline_stats is not None:
+        _report_pipeline_stats(cli_parser, pipeline_stats, {
+            'html_to_text': feedloaders.html_to_text_converter, 'item_cache': item_cache,
+            **stores, **queue_stores,
+            'http_client': feedloaders.http_client, 'fetch_policy': fetch_policy
+        })
+    if parse_executor is not None:
+        parse_executor.shutdown()
+    feedloaders.http_client.close()
+    fetch_policy.close()
+    store: Any
+    for store in [*stores.values(), *queue_stores.values()]:
+        if store is not None:
+            store.close()
+    return 1 if failed_feeds else 0
 
 if __name__ == '__main__':
-    main()
+    raise SystemExit(main())
@@ -1,14 +1,32 @@
 """Tests for the app module
 """
+import contextlib
+import io
+import json
 import unittest
 import os
+import socket
+import subprocess
+import sys
+import tempfile
+from time import time
+from unittest import mock
 from argparse import Namespace
 from typing import Any, TextIO
 from rssfeedreader import RSSFeedReader
 from model import RSSFeedChannel, RSSFeedItem
-from cli import CLIParser
+from cli import CLIParser, CLIWriter, DEFAULT_BUFFER_SIZE
+from feedpool import DEFAULT_MAX_WORKERS, DEFAULT_MAX_CONNECTIONS_PER_HOST
 from app import get_default_feedreader
 from app import main
+from pipelinestats import PipelineStats
+from feedwriters import CSVWriter, NDJSONWriter, OUTPUT_FORMATS
+from fetchpolicy import DEFAULT_RETRIES, CircuitBreaker
+from searchindex import DEFAULT_SEARCH_LIMIT
+from feedqueue import DEFAULT_LEASE_SECONDS
+from feedresults import FeedResultStore
+from feedfixtures import FeedFixtureServer, generate_feed
+from feedwatcher import DEFAULT_REFRESH_INTERVAL, DEFAULT_MIN_INTERVAL, DEFAULT_MAX_INTERVAL
 
 class TestRSSFeedDataClasses(unittest.TestCase):
     """Tests for data model of RSS feed reader
@@ -92,6 +110,93 @@ class TestRSSFeedCLI(unittest.TestCase):
         expected_result: list[Any] = []
         self.assertEqual(actual_result, expected_result)
 
+    def test_get_pool_options(self) -> None:
+        """Verify concurrency options are parsed and fall back to defaults when absent
+        """
+        cli_parser: CLIParser = CLIParser()
+        cli_parser.parse_rss_feed_urls_from_args(
+            ['--url', 'http://123.lnk', '--workers', '3', '--per-host', '1', '--timeout', '2.5'])
+        self.assertEqual(cli_parser.get_max_workers(), 3)
+        self.assertEqual(cli_parser.get_max_connections_per_host(), 1)
+        self.assertEqual(cli_parser.get_timeout(), 2.5)
+        cli_parser.parse_rss_feed_urls_from_args(['--url', 'http://123.lnk'])
+        self.assertEqual(cli_parser.get_max_workers(), DEFAULT_MAX_WORKERS)
+        self.assertEqual(cli_parser.get_max_connections_per_host(),
+            DEFAULT_MAX_CONNECTIONS_PER_HOST)
+        self.assertIsNone(cli_parser.get_timeout())
+
+    def test_get_refresh_intervals(self) -> None:
+        """Verify watch mode options are parsed and fall back to defaults when absent
+        """
+        cli_parser: CLIParser = CLIParser()
+        cli_parser.parse_rss_feed_urls_from_args(['--url', 'http://123.lnk', '--watch',
+            '--interval', '30', '--min-interval', '10', '--max-interval', '90'])
+        self.assertTrue(cli_parser.is_watching())
+        self.assertEqual(cli_parser.get_refresh_intervals(), (30, 10, 90))
+        cli_parser.parse_rss_feed_urls_from_args(['--url', 'http://123.lnk'])
+        self.assertFalse(cli_parser.is_watching())
+        self.assertEqual(cli_parser.get_refresh_intervals(),
+            (DEFAULT_REFRESH_INTERVAL, DEFAULT_MIN_INTERVAL, DEFAULT_MAX_INTERVAL))
+
+    def test_iter_rss_feed_urls(self) -> None:
+        """Verify URLs from the command line, OPML and text files are yielded once each,
+        skipping invalid URLs and unreadable files with an error printed out
+        """
+        output_stream: io.StringIO = io.StringIO()
+        cli_parser: CLIParser = CLIParser(file=output_stream)
+        with tempfile.TemporaryDirectory() as list_dir:
+            opml_path: str = os.path.join(list_dir, 'feeds.opml')
+            with open(opml_path, mode='w', encoding='utf-8') as opml_file:
+                opml_file.write('<opml><body><outline text="News">'
+                    '<outline xmlUrl="HTTP://123.LNK#top"/><outline xmlUrl="http://456.lnk/"/>'
+                    '</outline></body></opml>')
+            text_path: str = os.path.join(list_dir, 'feeds.txt')
+            with open(text_path, mode='w', encoding='utf-8') as text_file:
+                text_file.write('# subscriptions\nhttp://456.lnk\nnot a url\n\nhttp://789.lnk\n')
+            cli_parser.parse_rss_feed_urls_from_args(['--url', 'http://123.lnk/',
+                '--opml', opml_path, '--url-file', text_path,
+                '--url-file', os.path.join(list_dir, 'missing.txt')])
+            actual_result: list[str] = list(cli_parser.iter_rss_feed_urls())
+        self.assertEqual(cli_parser.get_list_of_rss_feed_urls(), ['http://123.lnk/'])
+        self.assertEqual(actual_result, ['http://123.lnk/', 'http://456.lnk/', 'http://789.lnk/'])
+        self.assertIn('Invalid feed URL skipped: not a url', output_stream.getvalue())
+        self.assertIn('Cannot read feed URLs from', output_stream.getvalue())
+        self.assertNotIn('usage', output_stream.getvalue())
+
+    def test_get_process_count(self) -> None:
+        """Verify process count is parsed, is one per CPU when not given and is None
+        when feeds are not parsed in processes
+        """
+        cli_parser: CLIParser = CLIParser()
+        cli_parser.parse_rss_feed_urls_from_args(['--url', 'http://123.lnk', '--processes', '3'])
+        self.assertEqual(cli_parser.get_process_count(), 3)
+        cli_parser.parse_rss_feed_urls_from_args(['--url', 'http://123.lnk', '--processes'])
+        self.assertEqual(cli_parser.get_process_count(), os.cpu_count() or 1)
+        cli_parser.parse_rss_feed_urls_from_args(['--url', 'http://123.lnk'])
+        self.assertIsNone(cli_parser.get_process_count())
+
+    def test_get_fetch_policy_options(self) -> None:
+        """Verify retries, rate limit and circuit breaker path are parsed, with defaults
+        when not given
+        """
+        cli_parser: CLIParser = CLIParser()
+        cli_parser.parse_rss_feed_urls_from_args(['--url', 'http://123.lnk', '--retries', '0',
+            '--rate-limit', '0.5', '--circuit-breaker', 'breaker.db'])
+        self.assertEqual(cli_parser.get_retries(), 0)
+        self.assertEqual(cli_parser.get_rate_limit(), 0.5)
+        self.assertEqual(cli_parser.get_circuit_breaker_path(), 'breaker.db')
+        cli_parser.parse_rss_feed_urls_from_args(['--url', 'http://123.lnk'])
+        self.assertEqual(cli_parser.get_retries(), DEFAULT_RETRIES)
+        self.assertIsNone(cli_parser.get_rate_limit())
+        self.assertIsNone(cli_parser.get_circuit_breaker_path())
+
+    def test_invalid_positive_number(self) -> None:
+        """Verify zero or negative numeric options raise ValueError
+        """
+        self.assertRaises(ValueError, CLIParser._positive_int, '0') # pylint: disable=protected-access
+        self.assertRaises(ValueError, CLIParser._non_negative_int, '-1') # pylint: disable=protected-access
+        self.assertRaises(ValueError, CLIParser._positive_float, '-1') # pylint: disable=protected-access
+
     @staticmethod
     def test_show_rss_feed_content() -> None:
         """Verify code statements run successfully when invoking show_rss_feed_content method of
@@ -105,6 +210,109 @@ class TestRSSFeedCLI(unittest.TestCase):
             cli_writer: RSSFeedReader = get_default_feedreader(file=devnull_file)
             cli_writer.show_rss_feed_content(test_data)
 
+    def test_buffered_output_matches_printed_output(self) -> None:
+        """Verify buffered rendering writes the same text as line by line rendering,
+        whether the buffer fills up or not
+        """
+        test_data: list[RSSFeedItem] = [RSSFeedItem(f'T{index}', 'D', 'L') for index in range(5)]
+        outputs: list[str] = []
+        buffer_size: int
+        for buffer_size in (0, 1, 30, DEFAULT_BUFFER_SIZE):
+            output_stream: io.StringIO = io.StringIO()
+            CLIWriter(file=output_stream, buffer_size=buffer_size).show_rss_feed_content(
+                RSSFeedChannel('Title', 'Description', 'Link', iter(test_data)))
+            outputs.append(output_stream.getvalue())
+        self.assertIn('Item Title: T4', outputs[0])
+        self.assertEqual(outputs, [outputs[0]] * 4)
+
+    def test_get_search_options(self) -> None:
+        """Verify the search command and its options are parsed, with defaults when absent
+        """
+        cli_parser: CLIParser = CLIParser()
+        cli_parser.parse_rss_feed_urls_from_args(['--url', 'http://123.lnk', '--index', 'i.db',
+            '--delta', 's.db'])
+        self.assertIsNone(cli_parser.get_command())
+        self.assertEqual(cli_parser.get_snapshot_path(), 's.db')
+        self.assertEqual(cli_parser.get_search_index_path(), 'i.db')
+        self.assertIsNone(cli_parser.get_searched_index_path())
+        self.assertIsNone(cli_parser.get_search_since())
+        self.assertEqual(cli_parser.get_search_limit(), DEFAULT_SEARCH_LIMIT)
+        cli_parser.parse_rss_feed_urls_from_args(
+            ['search', 'some words', '--index', 'i.db', '--since', '7', '--limit', '5'])
+        self.assertEqual(cli_parser.get_command(), 'search')
+        self.assertEqual(cli_parser.get_search_query(), 'some words')
+        self.assertEqual(cli_parser.get_searched_index_path(), 'i.db')
+        self.assertAlmostEqual(cli_parser.get_search_since(), time() - 7 * 24 * 60 * 60, -1)
+        self.assertEqual(cli_parser.get_search_limit(), 5)
+        cli_parser.parse_rss_feed_urls_from_args(
+            ['--index', 'a.db', '--since', '7', 'search', 'words', '--index', 'b.db'])
+        self.assertEqual(cli_parser.get_search_index_path(), 'a.db')
+        self.assertEqual(cli_parser.get_searched_index_path(), 'b.db')
+        self.assertIsNone(cli_parser.get_search_since())
+        self.assertIsNotNone(cli_parser.get_items_since())
+
+    def test_get_item_window_options(self) -> None:
+        """Verify the largest number of items and the time since which items are shown are
+        parsed, with all items shown when absent
+        """
+        cli_parser: CLIParser = CLIParser()
+        cli_parser.parse_rss_feed_urls_from_args(['--url', 'http://123.lnk'])
+        self.assertIsNone(cli_parser.get_max_items())
+        self.assertIsNone(cli_parser.get_items_since())
+        cli_parser.parse_rss_feed_urls_from_args(
+            ['--url', 'http://123.lnk', '--max-items', '10', '--since', '0.5'])
+        self.assertEqual(cli_parser.get_max_items(), 10)
+        self.assertAlmostEqual(cli_parser.get_items_since(), time() - 12 * 60 * 60, -1)
+
+    def test_get_queue_options(self) -> None:
+        """Verify the feed queue options are parsed, with defaults when absent, no usage
+        is printed when a worker only loads feeds already queued, and options of queue
+        workers are not allowed without a queue
+        """
+        output_stream: io.StringIO = io.StringIO()
+        cli_parser: CLIParser = CLIParser(file=output_stream)
+        cli_parser.parse_rss_feed_urls_from_args(['--url', 'http://123.lnk'])
+        self.assertIsNone(cli_parser.get_queue_path())
+        self.assertIsNone(cli_parser.get_results_path())
+        self.assertEqual(cli_parser.get_worker_id(), f'{socket.gethostname()}-{os.getpid()}')
+        self.assertEqual(cli_parser.get_lease_seconds(), DEFAULT_LEASE_SECONDS)
+        cli_parser.parse_rss_feed_urls_from_args(['--queue', 'q.db', '--results', 'r.db',
+            '--worker-id', 'worker-1', '--lease', '30'])
+        self.assertEqual(cli_parser.get_queue_path(), 'q.db')
+        self.assertEqual(cli_parser.get_results_path(), 'r.db')
+        self.assertEqual(cli_parser.get_worker_id(), 'worker-1')
+        self.assertEqual(cli_parser.get_lease_seconds(), 30)
+        self.assertEqual(output_stream.getvalue(), '')
+        with contextlib.redirect_stderr(io.StringIO()) as error_stream:
+            with self.assertRaises(SystemExit):
+                cli_parser.parse_rss_feed_urls_from_args(['--url', 'http://123.lnk',
+                    '--results', 'r.db'])
+        self.assertIn('--results: only allowed with argument --queue', error_stream.getvalue())
+
+    def test_get_output_format(self) -> None:
+        """Verify the output format is parsed, text by default, and selects the
+        RSSFeedReader implementation
+        """
+        cli_parser: CLIParser = CLIParser()
+        cli_parser.parse_rss_feed_urls_from_args(['--url', 'http://123.lnk'])
+        self.assertEqual(cli_parser.get_output_format(), 'text')
+        cli_parser.parse_rss_feed_urls_from_args(['--url', 'http://123.lnk', '--format', 'csv'])
+        self.assertEqual(cli_parser.get_output_format(), 'csv')
+        output_stream: io.StringIO = io.StringIO()
+        self.assertIsInstance(get_default_feedreader(output_stream), CLIWriter)
+        self.assertIsInstance(
+            get_default_feedreader(output_stream, output_format='ndjson'), NDJSONWriter)
+        self.assertIsInstance(get_default_feedreader(output_stream, output_format='csv'), CSVWriter)
+
+    def test_get_buffer_size(self) -> None:
+        """Verify output is buffered only when requested
+        """
+        cli_parser: CLIParser = CLIParser()
+        cli_parser.parse_rss_feed_urls_from_args(['--url', 'http://123.lnk'])
+        self.assertEqual(cli_parser.get_buffer_size(), 0)
+        cli_parser.parse_rss_feed_urls_from_args(['--url', 'http://123.lnk', '--buffered'])
+        self.assertEqual(cli_parser.get_buffer_size(), DEFAULT_BUFFER_SIZE)
+
 class TestRSSFeedMethods(unittest.TestCase):
     """Tests for entry point module of RSS feed reader
     """
@@ -114,6 +322,16 @@ class TestRSSFeedMethods(unittest.TestCase):
         Used for testing purposes."""
         return url
 
+    def test_import_defers_heavy_dependencies(self) -> None:
+        """Verify importing the application does not import feedparser, html2text or
+        validators, which are imported when first needed
+        """
+        completed: subprocess.CompletedProcess = subprocess.run([sys.executable, '-c',
+            'import sys, app; print(*sorted(set(sys.modules) & '
+            '{"feedparser", "html2text", "validators"}))'],
+            capture_output=True, text=True, check=True)
+        self.assertEqual(completed.stdout.strip(), '')
+
     @staticmethod
     def test_main_noop() -> None:
         """Verify code statements successful when no arguments provided
@@ -130,3 +348,311 @@ class TestRSSFeedMethods(unittest.TestCase):
         devnull_file: TextIO
         with open(file=os.devnull, mode='w', encoding='utf-8') as devnull_file:
             main(output_stream=devnull_file, args=['--url', 'testing'])
+
+
+    def test_main_with_timeout(self) -> None:
+        """Verify code statements successful when a timeout is provided, without changing
+        the default timeout of every socket in the process
+        """
+        CLIParser._uri = TestRSSFeedMethods.mock_uri_method # pylint: disable=protected-access
+        devnull_file: TextIO
+        with open(file=os.devnull, mode='w', encoding='utf-8') as devnull_file:
+            main(output_stream=devnull_file, args=['--url', 'testing', '--timeout', '5'])
+            main(output_stream=devnull_file,
+                args=['--url', 'testing', '--timeout', '5', '--stream'])
+        self.assertIsNone(socket.getdefaulttimeout())
+
+    @staticmethod
+    def test_main_with_cache() -> None:
+        """Verify code statements successful when a feed cache is provided
+        """
+        CLIParser._uri = TestRSSFeedMethods.mock_uri_method # pylint: disable=protected-access
+        devnull_file: TextIO
+        with tempfile.TemporaryDirectory() as cache_dir, \
+            open(file=os.devnull, mode='w', encoding='utf-8') as devnull_file:
+            main(output_stream=devnull_file,
+                args=['--url', 'testing', '--cache', os.path.join(cache_dir, 'cache.db')])
+
+    @staticmethod
+    def test_main_with_processes() -> None:
+        """Verify code statements successful when feeds are parsed in a process pool
+        """
+        CLIParser._uri = TestRSSFeedMethods.mock_uri_method # pylint: disable=protected-access
+        devnull_file: TextIO
+        with open(file=os.devnull, mode='w', encoding='utf-8') as devnull_file:
+            main(output_stream=devnull_file, args=['--url', 'testing', '--processes', '1'])
+
+    def test_main_with_search(self) -> None:
+        """Verify items indexed while feeds load are found by the search command
+        """
+        CLIParser._uri = TestRSSFeedMethods.mock_uri_method # pylint: disable=protected-access
+        output_stream: io.StringIO = io.StringIO()
+        with tempfile.TemporaryDirectory() as index_dir:
+            feed_path: str = os.path.join(index_dir, 'feed.xml')
+            with open(feed_path, mode='w', encoding='utf-8') as feed_file:
+                feed_file.write('<rss><channel><title>Feed</title><item><title>Found story'
+                    '</title><link>http://a.lnk/1</link><description>Some words</description>'
+                    '</item></channel></rss>')
+            index_path: str = os.path.join(index_dir, 'index.db')
+            with open(file=os.devnull, mode='w', encoding='utf-8') as devnull_file:
+                main(output_stream=devnull_file, args=['--url', feed_path, '--index', index_path])
+            main(output_stream=output_stream,
+                args=['search', 'story', '--index', index_path, '--since', '1'])
+            main(output_stream=output_stream, args=['search', 'missing', '--index', index_path])
+            main(output_stream=output_stream, args=['search', '"bad', '--index', index_path])
+        output: str = output_stream.getvalue()
+        self.assertIn('Item Title: Found story\nLink: http://a.lnk/1\n', output)
+        self.assertIn(f'Feed: {feed_path}\n', output)
+        self.assertIn('No items found', output)
+        self.assertIn('Invalid search query', output)
+        self.assertNotIn('usage', output)
+
+    def test_main_with_delta(self) -> None:
+        """Verify only items added or changed since the last run are shown, and channels
+        without any are not shown at all
+        """
+        CLIParser._uri = TestRSSFeedMethods.mock_uri_method # pylint: disable=protected-access
+        outputs: list[str] = []
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            feed_path: str = os.path.join(snapshot_dir, 'feed.xml')
+            stats_json_path: str = os.path.join(snapshot_dir, 'stats.json')
+            args: list[str] = ['--url', feed_path, '--delta',
+                os.path.join(snapshot_dir, 'snapshots.db'), '--stats-json', stats_json_path]
+            title: str
+            for title in ('First', 'First', 'Second'):
+                with open(feed_path, mode='w', encoding='utf-8') as feed_file:
+                    feed_file.write('<rss><channel><title>Feed</title><item><title>Kept</title>'
+                        f'<link>http://a.lnk/1</link></item><item><title>{title}</title>'
+                        '<link>http://a.lnk/2</link></item></channel></rss>')
+                output_stream: io.StringIO = io.StringIO()
+                main(output_stream=output_stream, args=args)
+                outputs.append(output_stream.getvalue())
+            with open(stats_json_path, encoding='utf-8') as stats_json_file:
+                stats: dict[str, Any] = json.load(stats_json_file)
+        self.assertEqual(outputs[0].count('Item Title:'), 2)
+        self.assertEqual(outputs[1], '')
+        self.assertIn('Feed Title: Feed', outputs[2])
+        self.assertEqual(outputs[2].count('Item Title:'), 1)
+        self.assertIn('Item Title: Second', outputs[2])
+        self.assertEqual(stats['counters']['snapshot_store'],
+            {'added': 0, 'updated': 1, 'unchanged': 1})
+        self.assertNotIn('item_cache', stats['counters'])
+
+    def test_main_with_delta_reports_failed_feeds(self) -> None:
+        """Verify a feed that could not be loaded is still shown and reported with --delta,
+        though it has no items
+        """
+        CLIParser._uri = TestRSSFeedMethods.mock_uri_method # pylint: disable=protected-access
+        with tempfile.TemporaryDirectory() as snapshot_dir, FeedFixtureServer() as server:
+            missing_url: str = server.add_feed('/feed', b'<rss/>').replace('/feed', '/missing')
+            output_stream: io.StringIO = io.StringIO()
+            error_stream: io.StringIO = io.StringIO()
+            exit_status: int = main(output_stream=output_stream, error_stream=error_stream,
+                args=['--url', missing_url, '--delta', os.path.join(snapshot_dir, 'snapshots.db')])
+        self.assertEqual(exit_status, 1)
+        self.assertIn('Feed could not be loaded: HTTP status 404', output_stream.getvalue())
+        self.assertEqual(error_stream.getvalue(),
+            f'{missing_url}: Feed could not be loaded: HTTP status 404\n')
+
+    def test_main_with_max_items(self) -> None:
+        """Verify only the newest items of a feed published since the given time are shown,
+        in the order of the feed
+        """
+        CLIParser._uri = TestRSSFeedMethods.mock_uri_method # pylint: disable=protected-access
+        output_stream: io.StringIO = io.StringIO()
+        with tempfile.TemporaryDirectory() as feed_dir:
+            feed_path: str = os.path.join(feed_dir, 'feed.xml')
+            with open(feed_path, mode='w', encoding='utf-8') as feed_file:
+                feed_file.write('<rss><channel><title>Feed</title>'
+                    '<item><title>Old</title><pubDate>Mon, 01 Jan 2001 00:00:00 GMT</pubDate>'
+                    '</item><item><title>Newest</title>'
+                    '<pubDate>Wed, 01 Jan 2070 00:00:00 GMT</pubDate></item>'
+                    '<item><title>Newer</title><pubDate>Tue, 01 Jan 2069 00:00:00 GMT</pubDate>'
+                    '</item>'
+                    '<item><title>New</title><pubDate>Mon, 01 Jan 2068 00:00:00 GMT</pubDate>'
+                    '</item></channel></rss>')
+            main(output_stream=output_stream,
+                args=['--url', feed_path, '--max-items', '2', '--format', 'ndjson'])
+            main(output_stream=output_stream,
+                args=['--url', feed_path, '--since', '1', '--format', 'ndjson'])
+        actual_result: list[str] = [json.loads(line)['title']
+            for line in output_stream.getvalue().splitlines()]
+        self.assertEqual(actual_result, ['Newest', 'Newer', 'Newest', 'Newer', 'New'])
+
+    def test_main_with_queue(self) -> None:
+        """Verify queued feeds are loaded by the first worker to claim them, stored in the
+        results file and not loaded again by other workers until due
+        """
+        CLIParser._uri = TestRSSFeedMethods.mock_uri_method # pylint: disable=protected-access
+        outputs: list[str] = []
+        with tempfile.TemporaryDirectory() as queue_dir:
+            feed_path: str = os.path.join(queue_dir, 'feed.xml')
+            with open(feed_path, mode='w', encoding='utf-8') as feed_file:
+                feed_file.write('<rss><channel><title>Feed</title><item><title>One</title>'
+                    '</item></channel></rss>')
+            stats_json_path: str = os.path.join(queue_dir, 'stats.json')
+            results_path: str = os.path.join(queue_dir, 'results.db')
+            args: list[str] = ['--queue', os.path.join(queue_dir, 'queue.db'),
+                '--results', results_path, '--stats-json', stats_json_path]
+            worker_args: list[str]
+            for worker_args in (['--url', feed_path, '--worker-id', 'a'], ['--worker-id', 'a']):
+                output_stream: io.StringIO = io.StringIO()
+                main(output_stream=output_stream, args=args + worker_args)
+                outputs.append(output_stream.getvalue())
+            with open(stats_json_path, encoding='utf-8') as stats_json_file:
+                stats: dict[str, Any] = json.load(stats_json_file)
+            result_store: FeedResultStore = FeedResultStore(results_path)
+            self.assertEqual(result_store.get(feed_path).worker_id, 'a')
+            result_store.close()
+        self.assertIn('Item Title: One', outputs[0])
+        self.assertEqual(outputs[1], '')
+        self.assertEqual(stats['counters']['feed_queue'],
+            {'claimed': 0, 'completed': 0, 'released': 0, 'lost': 0, 'queued': 1})
+        self.assertEqual(stats['counters']['item_cache']['feeds'], 0)
+
+    def test_main_with_format(self) -> None:
+        """Verify items are written as JSON lines with the ndjson format
+        """
+        CLIParser._uri = TestRSSFeedMethods.mock_uri_method # pylint: disable=protected-access
+        output_stream: io.StringIO = io.StringIO()
+        with tempfile.TemporaryDirectory() as feed_dir:
+            feed_path: str = os.path.join(feed_dir, 'feed.xml')
+            with open(feed_path, mode='w', encoding='utf-8') as feed_file:
+                feed_file.write('<rss><channel><title>Feed</title><item><title>One</title>'
+                    '</item><item><title>Two</title></item></channel></rss>')
+            main(output_stream=output_stream, args=['--url', feed_path, '--format', 'ndjson'])
+        actual_result: list[str] = [json.loads(line)['title']
+            for line in output_stream.getvalue().splitlines()]
+        self.assertEqual(actual_result, ['One', 'Two'])
+
+    def test_main_with_format_reports_errors_apart(self) -> None:
+        """Verify errors and statistics are printed to the error stream with the ndjson and
+        csv formats, feeds that could not be loaded are reported there with exit status 1,
+        and the csv header is written even without any feed
+        """
+        CLIParser._uri = TestRSSFeedMethods.mock_uri_method # pylint: disable=protected-access
+        output_stream: io.StringIO = io.StringIO()
+        error_stream: io.StringIO = io.StringIO()
+        with tempfile.TemporaryDirectory() as feed_dir:
+            feed_path: str = os.path.join(feed_dir, 'feed.xml')
+            with open(feed_path, mode='w', encoding='utf-8') as feed_file:
+                feed_file.write('<rss><channel><item><title>One</title></item></channel></rss>')
+            text_path: str = os.path.join(feed_dir, 'feeds.txt')
+            with open(text_path, mode='w', encoding='utf-8') as text_file:
+                text_file.write('not a url\n')
+            breaker_path: str = os.path.join(feed_dir, 'breaker.db')
+            circuit_breaker: CircuitBreaker = CircuitBreaker(breaker_path, failure_threshold=1)
+            circuit_breaker.record_failure('http://down.lnk')
+            circuit_breaker.close()
+            exit_status: int = main(output_stream=output_stream, error_stream=error_stream,
+                args=['--url', feed_path, '--url', 'http://down.lnk', '--url-file', text_path,
+                    '--url-file', os.path.join(feed_dir, 'missing.txt'),
+                    '--circuit-breaker', breaker_path, '--format', 'ndjson', '--stats'])
+            self.assertEqual(exit_status, 1)
+            self.assertEqual([json.loads(line)['title']
+                for line in output_stream.getvalue().splitlines()], ['One'])
+            self.assertIn('Invalid feed URL skipped: not a url', error_stream.getvalue())
+            self.assertIn('Cannot read feed URLs from', error_stream.getvalue())
+            self.assertIn('http://down.lnk: Feed could not be loaded: Skipped after 1 failures',
+                error_stream.getvalue())
+            self.assertIn('html2text', error_stream.getvalue())
+            output_stream = io.StringIO()
+            exit_status = main(output_stream=output_stream, error_stream=error_stream,
+                args=['--url', feed_path, '--format', 'csv'])
+        self.assertEqual(exit_status, 0)
+        self.assertEqual(output_stream.getvalue().splitlines()[0],
+            'channel_title,channel_link,title,link,description')
+        output_stream = io.StringIO()
+        error_stream = io.StringIO()
+        main(output_stream=output_stream, error_stream=error_stream, args=['--format', 'csv'])
+        self.assertEqual(output_stream.getvalue(),
+            'channel_title,channel_link,title,link,description\r\n')
+        self.assertIn('usage', error_stream.getvalue())
+
+    def test_main_reports_feeds_not_served(self) -> None:
+        """Verify a feed its server answers with an error status is reported on the error
+        stream with exit status 1 in every format, instead of showing the error page
+        """
+        CLIParser._uri = TestRSSFeedMethods.mock_uri_method # pylint: disable=protected-access
+        with FeedFixtureServer() as server:
+            feed_url: str = server.add_feed('/feed', generate_feed(1))
+            missing_url: str = feed_url.replace('/feed', '/missing')
+            output_format: str
+            for output_format in OUTPUT_FORMATS:
+                output_stream: io.StringIO = io.StringIO()
+                error_stream: io.StringIO = io.StringIO()
+                exit_status: int = main(output_stream=output_stream, error_stream=error_stream,
+                    args=['--url', missing_url, '--url', feed_url, '--format', output_format])
+                self.assertEqual(exit_status, 1)
+                self.assertEqual(error_stream.getvalue(),
+                    f'{missing_url}: Feed could not be loaded: HTTP status 404\n')
+                self.assertIn('Item 0', output_stream.getvalue())
+                self.assertNotIn('Not Found', output_stream.getvalue())
+
+    def test_main_with_stream(self) -> None:
+        """Verify streamed feed items are shown, a feed read only up to an XML syntax error
+        is reported, and options needing whole feeds are not allowed with --stream
+        """
+        CLIParser._uri = TestRSSFeedMethods.mock_uri_method # pylint: disable=protected-access
+        output_stream: io.StringIO = io.StringIO()
+        error_stream: io.StringIO = io.StringIO()
+        with tempfile.TemporaryDirectory() as feed_dir:
+            feed_path: str = os.path.join(feed_dir, 'feed.xml')
+            with open(feed_path, mode='w', encoding='utf-8') as feed_file:
+                feed_file.write('<rss><channel><item><title>One</title></item><item>&nbsp;')
+            main(output_stream=output_stream, error_stream=error_stream,
+                args=['--url', feed_path, '--stream'])
+        self.assertIn('Item Title: One', output_stream.getvalue())
+        self.assertIn(f'{feed_path}: Feed is not well-formed XML', error_stream.getvalue())
+        with contextlib.redirect_stderr(io.StringIO()) as error_stream:
+            with self.assertRaises(SystemExit):
+                main(output_stream=output_stream,
+                    args=['--url', 'testing', '--stream', '--cache', 'cache.db'])
+        self.assertIn('--stream: not allowed with argument --cache', error_stream.getvalue())
+
+    def test_main_with_stats(self) -> None:
+        """Verify statistics are shown and written as JSON, and passed to given hooks
+        """
+        CLIParser._uri = TestRSSFeedMethods.mock_uri_method # pylint: disable=protected-access
+        hooks: PipelineStats = PipelineStats()
+        output_stream: io.StringIO = io.StringIO()
+        with tempfile.TemporaryDirectory() as stats_dir:
+            stats_json_path: str = os.path.join(stats_dir, 'stats.json')
+            main(output_stream=output_stream, hooks=hooks, args=[
+                '--url', 'testing', '--stats', '--stats-json', stats_json_path,
+                '--cache', os.path.join(stats_dir, 'cache.db'),
+                '--seen', os.path.join(stats_dir, 'seen.db'),
+                '--circuit-breaker', os.path.join(stats_dir, 'breaker.db'),
+                '--index', os.path.join(stats_dir, 'index.db')])
+            with open(stats_json_path, encoding='utf-8') as stats_json_file:
+                stats: dict[str, Any] = json.load(stats_json_file)
+        self.assertIn('total', output_stream.getvalue())
+        self.assertIn('feed_cache', stats['counters'])
+        self.assertIn('seen_index', stats['counters'])
+        self.assertIn('fetch_policy', stats['counters'])
+        self.assertIn('search_index', stats['counters'])
+        self.assertIn('render', stats['feeds']['testing']['seconds'])
+        self.assertEqual(hooks.to_dict()['feeds'].keys(), stats['feeds'].keys())
+
+    @staticmethod
+    def test_main_with_watch() -> None:
+        """Verify code statements successful in watch mode when there is nothing to watch
+        """
+        devnull_file: TextIO
+        with open(file=os.devnull, mode='w', encoding='utf-8') as devnull_file:
+            main(output_stream=devnull_file, args=['--watch', '--interval', '60'])
+
+    @staticmethod
+    def test_main_with_watch_interrupted() -> None:
+        """Verify watch mode ends quietly when interrupted, also when working a feed queue
+        """
+        CLIParser._uri = TestRSSFeedMethods.mock_uri_method # pylint: disable=protected-access
+        devnull_file: TextIO
+        with open(file=os.devnull, mode='w', encoding='utf-8') as devnull_file, \
+            mock.patch('feedwatcher.FeedWatcher.run', side_effect=KeyboardInterrupt):
+            main(output_stream=devnull_file, args=['--url', 'testing', '--watch'])
+        with tempfile.TemporaryDirectory() as queue_dir, \
+            open(file=os.devnull, mode='w', encoding='utf-8') as devnull_file, \
+            mock.patch('queueworker.FeedQueueWorker.run', side_effect=KeyboardInterrupt):
+            main(output_stream=devnull_file, args=['--url', 'testing', '--watch',
+                '--queue', os.path.join(queue_dir, 'queue.db')])
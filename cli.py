@@ -1,19 +1,51 @@
 """cli: module to handle the validation and parsing of the RSS feed URLs on the
 command line interface.
 """
-from sys import stdout
-from typing import TextIO, Sequence, Any, Optional
-from argparse import ArgumentParser, Namespace
-import validators
+import os
+import socket
+from datetime import datetime
+from sys import stderr, stdout
+from time import time
+from typing import BinaryIO, Callable, TextIO, Sequence, Any, Iterator, Optional
+from argparse import ArgumentParser, Namespace, SUPPRESS
 from model import RSSFeedChannel, RSSFeedItem
+from feedpool import DEFAULT_MAX_WORKERS, DEFAULT_MAX_CONNECTIONS_PER_HOST
+from feedwatcher import DEFAULT_REFRESH_INTERVAL, DEFAULT_MIN_INTERVAL, DEFAULT_MAX_INTERVAL
+from fetchpolicy import DEFAULT_RETRIES
+from feedqueue import DEFAULT_LEASE_SECONDS
+from searchindex import DEFAULT_SEARCH_LIMIT, SearchResult
+from feedwriters import OUTPUT_FORMATS
+from feedsources import FeedURLValidator, iter_opml_urls, iter_text_urls, iter_unique_feed_urls
+
+DEFAULT_BUFFER_SIZE: int = 64 * 1024
+# options needing every item of a feed parsed before it is shown, by their dest
+_OPTIONS_NOT_STREAMED: dict[str, str] = {
+    'cache': '--cache',
+    'seen': '--seen',
+    'delta': '--delta',
+    'index': '--index',
+    'max_items': '--max-items',
+    'items_since': '--since',
+    'processes': '--processes'
+}
+# options of the workers of a feed queue, meaningless without --queue
+_QUEUE_OPTIONS: dict[str, str] = {
+    'results': '--results',
+    'worker_id': '--worker-id',
+    'lease': '--lease'
+}
 
 class CLIWriter:
-    """Class to write RSS feed content to the commane line interface
+    """Class to write RSS feed content to the commane line interface.
+    With a buffer_size, output is rendered into a buffer written out whenever it holds
+    buffer_size characters, and the buffer and output stream are flushed after every
+    channel. Otherwise each line is printed on its own.
     """
-    def __init__(self, file: TextIO) -> None:
+    def __init__(self, file: TextIO, buffer_size: int=0) -> None:
         """Build a CLIWriter
         """
         self.output_stream: TextIO = file
+        self.buffer_size: int = buffer_size
         CLIWriter.initialise()
 
     @staticmethod
@@ -27,9 +59,38 @@ class CLIWriter:
         """
         print(msg, file=self.output_stream)
 
+    @staticmethod
+    def _format_rss_feed_content(content: RSSFeedChannel) -> Iterator[str]:
+        """Yields representation of RSSFeedChannel, one chunk for the channel and each item
+        """
+        yield (f"{'='*20}\nFeed Title: {content.title}\n"
+            f"Link: {content.link}\n{content.description}\n")
+        item: RSSFeedItem
+        for item in content.items:
+            yield f"{'-'*20}\nItem Title: {item.title}\nLink: {item.link}\n{item.description}\n"
+
+    def _write_buffered_rss_feed_content(self, content: RSSFeedChannel) -> None:
+        """Render representation of RSSFeedChannel in chunks of at least buffer_size characters
+        """
+        buffer: list[str] = []
+        buffered_size: int = 0
+        chunk: str
+        for chunk in CLIWriter._format_rss_feed_content(content):
+            buffer.append(chunk)
+            buffered_size += len(chunk)
+            if buffered_size >= self.buffer_size:
+                self.output_stream.write(''.join(buffer))
+                buffer.clear()
+                buffered_size = 0
+        self.output_stream.write(''.join(buffer))
+        self.output_stream.flush()
+
     def show_rss_feed_content(self, content: RSSFeedChannel) -> None:
         """Render representation of RSSFeedChannel on the CLI
         """
+        if self.buffer_size > 0:
+            self._write_buffered_rss_feed_content(content)
+            return
         self.print_func(f"{'='*20}")
         self.print_func(f"Feed Title: {content.title}")
         self.print_func(f"Link: {content.link}")
@@ -41,25 +102,76 @@ class CLIWriter:
             self.print_func(f"Link: {item.link}")
             self.print_func(f"{item.description}")
 
-class CLIParser:
+    def show_search_results(self, results: list[SearchResult]) -> None:
+        """Render representation of items found by a search on the CLI
+        """
+        if not results:
+            self.print_func('No items found')
+            return
+        result: SearchResult
+        for result in results:
+            self.print_func(f"{'-'*20}")
+            self.print_func(f"Item Title: {result.title}")
+            self.print_func(f"Link: {result.link}")
+            self.print_func(f"Feed: {result.feed}")
+            self.print_func(
+                f"First seen: {datetime.fromtimestamp(result.first_seen):%Y-%m-%d %H:%M}")
+            self.print_func(f"{result.snippet}")
+
+class CLIParser: # pylint: disable=too-many-public-methods
     """Class to encapsulate the parsing of the RSS feed URLs on the command line interface.
     """
-    def __init__(self, file: TextIO=stdout):
+    def __init__(self, file: TextIO=stdout, error_file: TextIO=stderr):
         """Builds a CLIParser instance, with optional parameter file to specify target of CLI output
+        and optional parameter error_file to specify target of diagnostics when feeds are
+        written as records
         """
         self.cli_parser: ArgumentParser = CLIParser._build_argument_parser()
         self.rss_feed_url_list: list[Any] = list[Any]()
+        self.parsed_args: Namespace = Namespace()
         self.output_stream: TextIO = file
+        self.error_stream: TextIO = error_file
 
     @staticmethod
     def _uri(url: Any) -> Any:
         """Returns url if url is a valid URL
         ValueError: If url is not a valid URL
         """
+        import validators # pylint: disable=import-outside-toplevel
         if validators.url(url) is True:
             return url
         raise ValueError
 
+    @staticmethod
+    def _positive_int(value: Any) -> int:
+        """Returns value as an int if it is a positive whole number
+        ValueError: If value is not a positive whole number
+        """
+        number: int = int(value)
+        if number > 0:
+            return number
+        raise ValueError
+
+    @staticmethod
+    def _non_negative_int(value: Any) -> int:
+        """Returns value as an int if it is zero or a positive whole number
+        ValueError: If value is not zero or a positive whole number
+        """
+        number: int = int(value)
+        if number >= 0:
+            return number
+        raise ValueError
+
+    @staticmethod
+    def _positive_float(value: Any) -> float:
+        """Returns value as a float if it is a positive number
+        ValueError: If value is not a positive number
+        """
+        number: float = float(value)
+        if number > 0:
+            return number
+        raise ValueError
+
     @staticmethod
     def _build_argument_parser() -> ArgumentParser:
         """Returns object responsible for transforming command line strings into RSS feed URLs.
@@ -73,8 +185,245 @@ class CLIParser:
             type=CLIParser._uri,
             action='append'
         )
+        cli_parser.add_argument(
+            '--opml',
+            metavar='PATH',
+            action='append',
+            default=SUPPRESS,
+            help='OPML subscription list whose feeds are loaded as well'
+        )
+        cli_parser.add_argument(
+            '--url-file',
+            metavar='PATH',
+            action='append',
+            default=SUPPRESS,
+            help='text file with one feed URL per line whose feeds are loaded as well'
+        )
+        cli_parser.add_argument(
+            '--workers',
+            metavar='N',
+            type=CLIParser._positive_int,
+            default=SUPPRESS,
+            help='number of feeds loaded concurrently'
+        )
+        cli_parser.add_argument(
+            '--per-host',
+            metavar='N',
+            type=CLIParser._positive_int,
+            default=SUPPRESS,
+            help='number of feeds loaded concurrently from the same host'
+        )
+        cli_parser.add_argument(
+            '--processes',
+            metavar='N',
+            nargs='?',
+            const=0,
+            type=CLIParser._positive_int,
+            default=SUPPRESS,
+            help='parse and convert feeds in N processes, one per CPU if N is not given'
+        )
+        cli_parser.add_argument(
+            '--timeout',
+            metavar='SECONDS',
+            type=CLIParser._positive_float,
+            default=SUPPRESS,
+            help='give up on a feed that takes longer than this to load'
+        )
+        cli_parser.add_argument(
+            '--retries',
+            metavar='N',
+            type=CLIParser._non_negative_int,
+            default=SUPPRESS,
+            help=f'times to retry a feed that is unreachable or temporarily failing, '
+                f'{DEFAULT_RETRIES} by default'
+        )
+        cli_parser.add_argument(
+            '--rate-limit',
+            metavar='PER_SECOND',
+            type=CLIParser._positive_float,
+            default=SUPPRESS,
+            help='most requests per second sent to the same host'
+        )
+        cli_parser.add_argument(
+            '--circuit-breaker',
+            metavar='PATH',
+            default=SUPPRESS,
+            help='file remembering failing feeds across runs, so feeds that keep failing are '
+                'skipped for a while'
+        )
+        cli_parser.add_argument(
+            '--cache',
+            metavar='PATH',
+            default=SUPPRESS,
+            help='file in which to cache feeds, unchanged feeds are then not downloaded again'
+        )
+        cli_parser.add_argument(
+            '--seen',
+            metavar='PATH',
+            default=SUPPRESS,
+            help='file remembering items shown before, in any feed, so they are not shown again'
+        )
+        cli_parser.add_argument(
+            '--delta',
+            metavar='PATH',
+            default=SUPPRESS,
+            help='file keeping a snapshot of every feed, so only items added or changed since '
+                'the feed was last loaded are shown'
+        )
+        cli_parser.add_argument(
+            '--index',
+            metavar='PATH',
+            default=SUPPRESS,
+            help='file in which to index loaded items, to be found with the search command'
+        )
+        cli_parser.add_argument(
+            '--max-items',
+            metavar='N',
+            type=CLIParser._positive_int,
+            default=SUPPRESS,
+            help='most items shown of every feed, the newest by publication date'
+        )
+        cli_parser.add_argument(
+            '--since',
+            dest='items_since',
+            metavar='DAYS',
+            type=CLIParser._positive_float,
+            default=SUPPRESS,
+            help='only items published in the last DAYS days, and items without a date'
+        )
+        cli_parser.add_argument(
+            '--format',
+            choices=OUTPUT_FORMATS,
+            default=SUPPRESS,
+            help='show feeds as text, or every item as a JSON line or a CSV row for other '
+                'programs to read'
+        )
+        cli_parser.add_argument(
+            '--buffered',
+            action='store_true',
+            default=SUPPRESS,
+            help='write output in large chunks, faster when output goes to a file or pipe'
+        )
+        cli_parser.add_argument(
+            '--stats',
+            action='store_true',
+            default=SUPPRESS,
+            help='show time taken by each loading stage for every feed when done'
+        )
+        cli_parser.add_argument(
+            '--stats-json',
+            metavar='PATH',
+            default=SUPPRESS,
+            help='write statistics of every feed as JSON to this file when done'
+        )
+        cli_parser.add_argument(
+            '--watch',
+            action='store_true',
+            default=SUPPRESS,
+            help='keep running, loading feeds again when due and showing only new items'
+        )
+        cli_parser.add_argument(
+            '--interval',
+            metavar='SECONDS',
+            type=CLIParser._positive_float,
+            default=SUPPRESS,
+            help='time between loads of a feed in watch mode, unless the feed asks otherwise'
+        )
+        cli_parser.add_argument(
+            '--min-interval',
+            metavar='SECONDS',
+            type=CLIParser._positive_float,
+            default=SUPPRESS,
+            help='shortest time between loads of a feed in watch mode'
+        )
+        cli_parser.add_argument(
+            '--max-interval',
+            metavar='SECONDS',
+            type=CLIParser._positive_float,
+            default=SUPPRESS,
+            help='longest time between loads of a feed in watch mode'
+        )
+        cli_parser.add_argument(
+            '--stream',
+            action='store_true',
+            default=SUPPRESS,
+            help='show feed items while they are downloaded, for very large feeds'
+        )
+        CLIParser._add_queue_arguments(cli_parser)
+        CLIParser._add_search_command(cli_parser)
         return cli_parser
 
+    @staticmethod
+    def _add_queue_arguments(cli_parser: ArgumentParser) -> None:
+        """Add the options sharing the loading of feeds with other workers to cli_parser
+        """
+        cli_parser.add_argument(
+            '--queue',
+            metavar='PATH',
+            default=SUPPRESS,
+            help='file queueing feeds for all workers given the same file, the given feeds are '
+                'added to it and this worker loads its share of the due feeds'
+        )
+        cli_parser.add_argument(
+            '--worker-id',
+            metavar='ID',
+            default=SUPPRESS,
+            help='name of this worker in the queue, unique across workers, the host name and '
+                'process id by default'
+        )
+        cli_parser.add_argument(
+            '--lease',
+            metavar='SECONDS',
+            type=CLIParser._positive_float,
+            default=SUPPRESS,
+            help=f'time after which a feed claimed from the queue by a worker that did not '
+                f'load it may be claimed again, {DEFAULT_LEASE_SECONDS:g} by default'
+        )
+        cli_parser.add_argument(
+            '--results',
+            metavar='PATH',
+            default=SUPPRESS,
+            help='file in which workers of the queue store the latest content of every feed'
+        )
+
+    @staticmethod
+    def _add_search_command(cli_parser: ArgumentParser) -> None:
+        """Add the search command, finding items indexed with --index, to cli_parser
+        """
+        search_parser: ArgumentParser = cli_parser.add_subparsers(metavar='command').add_parser(
+            'search',
+            help='search items indexed with --index instead of loading feeds',
+            description='Searches items indexed with --index, best matches first'
+        )
+        search_parser.set_defaults(command='search')
+        search_parser.add_argument(
+            'query',
+            help='words to search for in item titles and descriptions, in SQLite FTS5 syntax'
+        )
+        search_parser.add_argument(
+            '--index',
+            dest='searched_index',
+            metavar='PATH',
+            default=SUPPRESS,
+            required=True,
+            help='file in which items were indexed'
+        )
+        search_parser.add_argument(
+            '--since',
+            dest='search_since',
+            metavar='DAYS',
+            type=CLIParser._positive_float,
+            default=SUPPRESS,
+            help='only items first loaded in the last DAYS days'
+        )
+        search_parser.add_argument(
+            '--limit',
+            metavar='N',
+            type=CLIParser._positive_int,
+            default=SUPPRESS,
+            help=f'most items shown, {DEFAULT_SEARCH_LIMIT} by default'
+        )
+
     @staticmethod
     def _get_list_of_rss_feed_urls_from_parsed_args(parsed_args: Namespace) -> list[Any]:
         """Returns list of RSS Feed URLs from given Namespace object
@@ -95,14 +444,242 @@ class CLIParser:
         """Parses RSS Feed URLs from command line strings.
         Prints out help message for CLI usage if no URLs are provided.
         Performs validation of RSS Feed URLs and prints out error if it finds a string
-        that is not a valid URL.
+        that is not a valid URL, or options that are not allowed together or without --queue.
         """
         parsed_args: Namespace = self._get_parsed_namespace_from_args(args=args)
+        self.parsed_args = parsed_args
         self.rss_feed_url_list = CLIParser._get_list_of_rss_feed_urls_from_parsed_args(parsed_args)
-        if len(self.rss_feed_url_list) == 0:
-            self.cli_parser.print_usage(self.output_stream)
+        dest: str
+        option: str
+        if self.is_streaming() and self.get_command() is None:
+            for dest, option in _OPTIONS_NOT_STREAMED.items():
+                if dest in parsed_args:
+                    self.cli_parser.error(f'argument --stream: not allowed with argument {option}')
+        if self.get_queue_path() is None:
+            for dest, option in _QUEUE_OPTIONS.items():
+                if dest in parsed_args:
+                    self.cli_parser.error(f'argument {option}: only allowed with argument --queue')
+        if len(self.rss_feed_url_list) == 0 and not self._has_url_files() and (
+            self.get_command() is None) and self.get_queue_path() is None:
+            self.cli_parser.print_usage(self.get_diagnostic_stream())
 
     def get_list_of_rss_feed_urls(self) -> list[Any]:
         """Returns list of validated RSS feed URLs from command line strings.
         """
         return self.rss_feed_url_list
+
+    def _has_url_files(self) -> bool:
+        """Returns True if feed URLs are to be read from OPML or text files
+        """
+        return 'opml' in self.parsed_args or 'url_file' in self.parsed_args
+
+    def _report_invalid_url(self, url: str) -> None:
+        """Prints out error for a string read from a file that is not a valid URL
+        """
+        print(f'Invalid feed URL skipped: {url}', file=self.get_diagnostic_stream())
+
+    def _iter_rss_feed_urls_from_files(self, option: str,
+    iter_urls: Callable[[BinaryIO], Iterator[str]]) -> Iterator[str]:
+        """Yields the URLs read with iter_urls from every file given with option
+        """
+        path: str
+        for path in vars(self.parsed_args).get(option, list[str]()):
+            try:
+                source: BinaryIO
+                with open(path, mode='rb') as source:
+                    yield from iter_urls(source)
+            except OSError as error:
+                print(f'Cannot read feed URLs from {path}: {error.strerror}',
+                    file=self.get_diagnostic_stream())
+
+    def iter_rss_feed_urls(self) -> Iterator[str]:
+        """Yields validated RSS feed URLs from command line strings, followed by those read
+        from OPML and text files, each URL only once. Files are read and their URLs validated
+        as they are needed, and invalid URLs are skipped with an error printed out.
+        """
+        seen_urls: set[str] = set()
+        yield from iter_unique_feed_urls(
+            (str(url) for url in self.rss_feed_url_list), seen_urls)
+        validator: FeedURLValidator = FeedURLValidator()
+        yield from iter_unique_feed_urls(
+            self._iter_rss_feed_urls_from_files('opml', iter_opml_urls),
+            seen_urls, validator, self._report_invalid_url)
+        yield from iter_unique_feed_urls(
+            self._iter_rss_feed_urls_from_files('url_file', iter_text_urls),
+            seen_urls, validator, self._report_invalid_url)
+
+    def get_max_workers(self) -> int:
+        """Returns number of feeds to load concurrently
+        """
+        return vars(self.parsed_args).get('workers') or DEFAULT_MAX_WORKERS
+
+    def get_max_connections_per_host(self) -> int:
+        """Returns number of feeds to load concurrently from the same host
+        """
+        return vars(self.parsed_args).get('per_host') or DEFAULT_MAX_CONNECTIONS_PER_HOST
+
+    def get_process_count(self) -> Optional[int]:
+        """Returns number of processes in which to parse and convert feeds, or None to do so
+        in the threads loading them
+        """
+        processes: Optional[int] = vars(self.parsed_args).get('processes')
+        if processes == 0:
+            return os.cpu_count() or 1
+        return processes
+
+    def get_timeout(self) -> Optional[float]:
+        """Returns number of seconds after which a feed is given up on, or None to wait
+        """
+        return vars(self.parsed_args).get('timeout')
+
+    def get_retries(self) -> int:
+        """Returns number of times to retry a feed that is unreachable or temporarily failing
+        """
+        return vars(self.parsed_args).get('retries', DEFAULT_RETRIES)
+
+    def get_rate_limit(self) -> Optional[float]:
+        """Returns most requests per second sent to the same host, or None for no limit
+        """
+        return vars(self.parsed_args).get('rate_limit')
+
+    def get_circuit_breaker_path(self) -> Optional[str]:
+        """Returns path of the file remembering failing feeds, or None to remember them
+        during this run only
+        """
+        return vars(self.parsed_args).get('circuit_breaker')
+
+    def get_cache_path(self) -> Optional[str]:
+        """Returns path of the feed cache file, or None if feeds should not be cached
+        """
+        return vars(self.parsed_args).get('cache')
+
+    def get_seen_index_path(self) -> Optional[str]:
+        """Returns path of the seen item index file, or None if all items should be shown
+        """
+        return vars(self.parsed_args).get('seen')
+
+    def get_snapshot_path(self) -> Optional[str]:
+        """Returns path of the feed snapshot file, or None if all items should be shown
+        """
+        return vars(self.parsed_args).get('delta')
+
+    def get_search_index_path(self) -> Optional[str]:
+        """Returns path of the search index file, or None if items should not be indexed
+        """
+        return vars(self.parsed_args).get('index')
+
+    def get_searched_index_path(self) -> Optional[str]:
+        """Returns path of the search index file searched by the search command
+        """
+        return vars(self.parsed_args).get('searched_index')
+
+    def get_command(self) -> Optional[str]:
+        """Returns the command given, or None to load and show feeds
+        """
+        return vars(self.parsed_args).get('command')
+
+    def get_search_query(self) -> str:
+        """Returns the query of the search command
+        """
+        return vars(self.parsed_args).get('query', '')
+
+    def _get_since(self, dest: str) -> Optional[float]:
+        """Returns the time DAYS days ago given with the --since option parsed to dest, in
+        seconds since the epoch, or None if not given
+        """
+        since_days: Optional[float] = vars(self.parsed_args).get(dest)
+        if since_days is None:
+            return None
+        return time() - since_days * 24 * 60 * 60
+
+    def get_search_since(self) -> Optional[float]:
+        """Returns the time since which items were first loaded to be found by the search
+        command, or None to find items however old
+        """
+        return self._get_since('search_since')
+
+    def get_search_limit(self) -> int:
+        """Returns the largest number of items shown by the search command
+        """
+        return vars(self.parsed_args).get('limit', DEFAULT_SEARCH_LIMIT)
+
+    def get_max_items(self) -> Optional[int]:
+        """Returns the largest number of items shown of every feed, or None to show all
+        """
+        return vars(self.parsed_args).get('max_items')
+
+    def get_items_since(self) -> Optional[float]:
+        """Returns the time since which items were published to be shown, or None to show
+        items however old
+        """
+        return self._get_since('items_since')
+
+    def is_streaming(self) -> bool:
+        """Returns True if feed items should be shown while they are downloaded
+        """
+        return vars(self.parsed_args).get('stream', False)
+
+    def get_output_format(self) -> str:
+        """Returns the format in which feeds are shown, one of OUTPUT_FORMATS
+        """
+        return vars(self.parsed_args).get('format', OUTPUT_FORMATS[0])
+
+    def get_diagnostic_stream(self) -> TextIO:
+        """Returns the stream to print errors and statistics to: the output stream when
+        feeds are shown as text, and the error stream when they are written as records, so
+        that records are not mixed with other lines
+        """
+        if self.get_output_format() == OUTPUT_FORMATS[0]:
+            return self.output_stream
+        return self.error_stream
+
+    def get_buffer_size(self) -> int:
+        """Returns size of the output buffer in characters, or 0 to print line by line
+        """
+        return DEFAULT_BUFFER_SIZE if vars(self.parsed_args).get('buffered', False) else 0
+
+    def is_showing_stats(self) -> bool:
+        """Returns True if statistics should be shown when done
+        """
+        return vars(self.parsed_args).get('stats', False)
+
+    def get_stats_json_path(self) -> Optional[str]:
+        """Returns path of the file to write statistics to as JSON, or None
+        """
+        return vars(self.parsed_args).get('stats_json')
+
+    def is_watching(self) -> bool:
+        """Returns True if feeds should be loaded again when due until interrupted
+        """
+        return vars(self.parsed_args).get('watch', False)
+
+    def get_queue_path(self) -> Optional[str]:
+        """Returns path of the feed queue file shared with other workers, or None to load
+        the given feeds in this process only
+        """
+        return vars(self.parsed_args).get('queue')
+
+    def get_worker_id(self) -> str:
+        """Returns the name of this worker in the feed queue
+        """
+        return vars(self.parsed_args).get('worker_id') or f'{socket.gethostname()}-{os.getpid()}'
+
+    def get_lease_seconds(self) -> float:
+        """Returns seconds for which a feed claimed from the feed queue is leased
+        """
+        return vars(self.parsed_args).get('lease', DEFAULT_LEASE_SECONDS)
+
+    def get_results_path(self) -> Optional[str]:
+        """Returns path of the file storing the latest content of every feed loaded from the
+        feed queue, or None if it should not be stored
+        """
+        return vars(self.parsed_args).get('results')
+
+    def get_refresh_intervals(self) -> tuple[float, float, float]:
+        """Returns default, shortest and longest seconds between loads of a feed in watch mode
+        """
+        return (
+            vars(self.parsed_args).get('interval', DEFAULT_REFRESH_INTERVAL),
+            vars(self.parsed_args).get('min_interval', DEFAULT_MIN_INTERVAL),
+            vars(self.parsed_args).get('max_interval', DEFAULT_MAX_INTERVAL)
+        )
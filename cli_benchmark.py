@@ -0,0 +1,56 @@
+"""Benchmark of CLIWriter throughput writing large synthetic channels to a file,
+comparing line by line printing against buffered rendering, and of the NDJSON and CSV
+writers.
+
+Usage: python cli_benchmark.py [item count] [channel count]
+"""
+import os
+import sys
+from time import perf_counter
+from model import RSSFeedChannel, RSSFeedItem
+from cli import DEFAULT_BUFFER_SIZE
+from rssfeedreader import RSSFeedReader
+from app import get_default_feedreader
+
+def _build_channels(item_count: int, channel_count: int) -> list[RSSFeedChannel]:
+    """Build channel_count channels of item_count items each
+    """
+    return [
+        RSSFeedChannel(
+            f'Channel {channel}', 'Channel description', f'http://channel{channel}.example.com/',
+            [RSSFeedItem(f'Item {index}', 'Some description of the item. ' * 5,
+                f'http://channel{channel}.example.com/item/{index}')
+                for index in range(item_count)])
+        for channel in range(channel_count)
+    ]
+
+def measure_seconds(channels: list[RSSFeedChannel], buffer_size: int,
+output_format: str='text') -> float:
+    """Returns seconds taken to write channels to the null device in output_format
+    """
+    with open(os.devnull, mode='w', encoding='utf-8') as output_stream:
+        cli_writer: RSSFeedReader = get_default_feedreader(output_stream, buffer_size,
+            output_format)
+        start: float = perf_counter()
+        channel: RSSFeedChannel
+        for channel in channels:
+            cli_writer.show_rss_feed_content(channel)
+        return perf_counter() - start
+
+def main(item_count: int=20000, channel_count: int=5) -> None:
+    """Print throughput of every output path"""
+    channels: list[RSSFeedChannel] = _build_channels(item_count, channel_count)
+    total_items: int = item_count * channel_count
+    printed: float = measure_seconds(channels, 0)
+    buffered: float = measure_seconds(channels, DEFAULT_BUFFER_SIZE)
+    ndjson: float = measure_seconds(channels, 0, 'ndjson')
+    csv: float = measure_seconds(channels, 0, 'csv')
+    print(f'{total_items} items in {channel_count} channels')
+    print(f'print per line: {printed:7.3f} s {total_items / printed:12.0f} items/s')
+    print(f'buffered:       {buffered:7.3f} s {total_items / buffered:12.0f} items/s')
+    print(f'speedup:        {printed / buffered:7.1f} x')
+    print(f'ndjson:         {ndjson:7.3f} s {total_items / ndjson:12.0f} items/s')
+    print(f'csv:            {csv:7.3f} s {total_items / csv:12.0f} items/s')
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
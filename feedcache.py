@@ -0,0 +1,115 @@
+"""feedcache: persistent on-disk cache of loaded RSS feeds and their HTTP validators,
+so unchanged feeds can be revalidated with a conditional GET instead of reloaded
+"""
+import pickle
+import sqlite3
+from dataclasses import dataclass, field
+from time import time
+from typing import Optional
+from model import RSSFeedChannel
+from feedsnapshots import ItemFingerprint
+from sqlitestore import SQLiteStore
+
+DEFAULT_MAX_ENTRIES: int = 10000
+DEFAULT_MAX_AGE: float = 30 * 24 * 60 * 60
+
+@dataclass
+class RSSFeedItemKeys:
+    """ Keys of the items of a feed, in the order of the feed, by which the items to show
+    are selected: identities for the seen item index, fingerprints for feed snapshots and
+    the item cache, and publication times for the item window, or None if not needed """
+    identities: Optional[list[list[str]]] = None
+    fingerprints: Optional[list[ItemFingerprint]] = None
+    timestamps: Optional[list[Optional[float]]] = None
+
+@dataclass
+class CachedRSSFeed:
+    """ Representation of a cached RSS feed with all its items, the keys of its items
+    and the validators it was served with """
+    etag: Optional[str]
+    modified: Optional[str]
+    rss_feed_channel: RSSFeedChannel
+    item_keys: RSSFeedItemKeys = field(default_factory=RSSFeedItemKeys)
+
+class FeedCache(SQLiteStore):
+    """SQLite backed cache of RSS feeds keyed by feed URL.
+    Entries not used for max_age seconds are evicted, as are the least recently
+    used entries once there are more than max_entries.
+    """
+    def __init__(self, path: str, max_entries: int=DEFAULT_MAX_ENTRIES,
+    max_age: float=DEFAULT_MAX_AGE) -> None:
+        """Build a FeedCache stored in the SQLite database file at path
+        """
+        super().__init__(path,
+            'CREATE TABLE IF NOT EXISTS feed_cache ('
+            'url TEXT PRIMARY KEY, etag TEXT, modified TEXT, '
+            'rss_feed_channel BLOB NOT NULL, last_used REAL NOT NULL)')
+        self.max_entries: int = max_entries
+        self.max_age: float = max_age
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._evict()
+
+    def get(self, url: str) -> Optional[CachedRSSFeed]:
+        """Returns the cached feed for url, or None if url is not cached
+        """
+        with self.lock:
+            row: Optional[tuple] = self.connection.execute(
+                'SELECT etag, modified, rss_feed_channel FROM feed_cache WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        rss_feed_channel: RSSFeedChannel
+        item_keys: RSSFeedItemKeys
+        rss_feed_channel, item_keys = pickle.loads(row[2])
+        return CachedRSSFeed(etag=row[0], modified=row[1], rss_feed_channel=rss_feed_channel,
+            item_keys=item_keys)
+
+    def record_not_modified(self, url: str) -> None:
+        """Record that the cached feed for url was reused because the server reported
+        it has not been modified
+        """
+        with self.lock, self.connection:
+            self.hits += 1
+            self.connection.execute(
+                'UPDATE feed_cache SET last_used = ? WHERE url = ?', (time(), url))
+
+    def put(self, url: str, etag: Optional[str], modified: Optional[str], # pylint: disable=too-many-arguments
+    rss_feed_channel: RSSFeedChannel, item_keys: Optional[RSSFeedItemKeys]=None) -> None:
+        """Store a freshly loaded feed for url, with all its items and their item_keys if
+        given, and the validators it was served with
+        """
+        data: bytes = pickle.dumps((rss_feed_channel, item_keys or RSSFeedItemKeys()),
+            protocol=pickle.HIGHEST_PROTOCOL)
+        with self.lock, self.connection:
+            self.misses += 1
+            self.connection.execute(
+                'INSERT OR REPLACE INTO feed_cache VALUES (?, ?, ?, ?, ?)',
+                (url, etag, modified, data, time()))
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove entries that are too old or in excess of max_entries
+        """
+        with self.lock, self.connection:
+            cursor: sqlite3.Cursor = self.connection.execute(
+                'DELETE FROM feed_cache WHERE last_used < ?', (time() - self.max_age,))
+            self.evictions += max(0, cursor.rowcount)
+            cursor = self.connection.execute(
+                'DELETE FROM feed_cache WHERE url NOT IN '
+                '(SELECT url FROM feed_cache ORDER BY last_used DESC LIMIT ?)',
+                (self.max_entries,))
+            self.evictions += max(0, cursor.rowcount)
+
+    def get_statistics(self) -> dict[str, int]:
+        """Returns counters of cache hits, misses, evictions and the current entry count
+        """
+        with self.lock:
+            entries: int = self.connection.execute('SELECT COUNT(*) FROM feed_cache').fetchone()[0]
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': entries
+        }
@@ -0,0 +1,57 @@
+"""Tests for module feedcache
+"""
+import unittest
+from typing import Optional
+from model import RSSFeedChannel, RSSFeedItem
+from feedcache import CachedRSSFeed, FeedCache, RSSFeedItemKeys
+
+class TestFeedCache(unittest.TestCase):
+    """Tests for module feedcache members including class FeedCache
+    """
+    def setUp(self) -> None:
+        self.rss_feed_channel: RSSFeedChannel = RSSFeedChannel(
+            'Some title', 'Some description', 'http://somelink.lnk', [RSSFeedItem('a','b','c')])
+
+    def test_put_and_get(self) -> None:
+        """Verify a stored feed is returned with its item keys and validators
+        """
+        feed_cache: FeedCache = FeedCache(':memory:')
+        item_keys: RSSFeedItemKeys = RSSFeedItemKeys([['link:c']], [('link:c', b'1')], [None])
+        feed_cache.put('http://feed.lnk', '"etag"', 'Mon, 01 Jan 2024 00:00:00 GMT',
+            self.rss_feed_channel, item_keys)
+        actual_result: Optional[CachedRSSFeed] = feed_cache.get('http://feed.lnk')
+        expected_result: CachedRSSFeed = CachedRSSFeed(
+            '"etag"', 'Mon, 01 Jan 2024 00:00:00 GMT', self.rss_feed_channel, item_keys)
+        self.assertEqual(actual_result, expected_result)
+        self.assertIsNone(feed_cache.get('http://other.lnk'))
+        feed_cache.close()
+
+    def test_statistics(self) -> None:
+        """Verify hits and misses are counted
+        """
+        feed_cache: FeedCache = FeedCache(':memory:')
+        feed_cache.put('http://feed.lnk', '"etag"', None, self.rss_feed_channel)
+        feed_cache.record_not_modified('http://feed.lnk')
+        feed_cache.record_not_modified('http://feed.lnk')
+        self.assertEqual(feed_cache.get_statistics(),
+            {'hits': 2, 'misses': 1, 'evictions': 0, 'entries': 1})
+
+    def test_evict_least_recently_used(self) -> None:
+        """Verify entries beyond max_entries are evicted least recently used first
+        """
+        feed_cache: FeedCache = FeedCache(':memory:', max_entries=2)
+        feed_cache.put('http://1.lnk', '"1"', None, self.rss_feed_channel)
+        feed_cache.put('http://2.lnk', '"2"', None, self.rss_feed_channel)
+        feed_cache.record_not_modified('http://1.lnk')
+        feed_cache.put('http://3.lnk', '"3"', None, self.rss_feed_channel)
+        self.assertIsNotNone(feed_cache.get('http://1.lnk'))
+        self.assertIsNone(feed_cache.get('http://2.lnk'))
+        self.assertIsNotNone(feed_cache.get('http://3.lnk'))
+        self.assertEqual(feed_cache.get_statistics()['evictions'], 1)
+
+    def test_evict_old_entries(self) -> None:
+        """Verify entries not used within max_age are evicted
+        """
+        feed_cache: FeedCache = FeedCache(':memory:', max_age=-1)
+        feed_cache.put('http://1.lnk', '"1"', None, self.rss_feed_channel)
+        self.assertIsNone(feed_cache.get('http://1.lnk'))
@@ -0,0 +1,133 @@
+"""feedfixtures: generated RSS/Atom feeds served from a local HTTP server, for benchmarks
+"""
+from gzip import compress as gzip_compress
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from time import sleep
+from types import TracebackType
+from typing import Optional, Type
+from xml.sax.saxutils import escape
+
+FEED_CONTENT_TYPES: dict[str, str] = {
+    'rss': 'application/rss+xml; charset=utf-8',
+    'atom': 'application/atom+xml; charset=utf-8'
+}
+
+def _generate_description(index: int, description_size: int, is_html: bool) -> str:
+    """Return a description of about description_size characters, marked up as HTML if is_html
+    """
+    words: str = ' '.join(f'word{(index + count) % 97}' for count in range(description_size // 7))
+    if is_html:
+        return (f'<p>Story <b>{index}</b> <a href="http://example.com/{index}">link</a></p>'
+            f'<p>{words}</p>')
+    return f'Story {index} {words}'
+
+def generate_feed(item_count: int, feed_format: str='rss', description_size: int=500,
+html_density: float=1.0, name: str='feed') -> bytes:
+    """Returns an RSS 2.0 or Atom feed of item_count items, where a fraction html_density
+    of item descriptions contain HTML markup
+    """
+    html_items: int = round(item_count * html_density)
+    parts: list[str] = []
+    index: int
+    if feed_format == 'atom':
+        parts.append('<?xml version="1.0" encoding="utf-8"?>'
+            '<feed xmlns="http://www.w3.org/2005/Atom">'
+            f'<title>Feed {name}</title><link href="http://example.com/{name}"/>'
+            f'<subtitle>Generated feed {name}</subtitle>')
+        for index in range(item_count):
+            description: str = _generate_description(index, description_size, index < html_items)
+            parts.append(f'<entry><title>Item {index}</title>'
+                f'<link href="http://example.com/{name}/{index}"/>'
+                f'<id>urn:{name}:{index}</id>'
+                f'<summary type="html">{escape(description)}</summary></entry>')
+        parts.append('</feed>')
+    else:
+        parts.append('<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>'
+            f'<title>Feed {name}</title><link>http://example.com/{name}</link>'
+            f'<description>Generated feed {name}</description>')
+        for index in range(item_count):
+            description = _generate_description(index, description_size, index < html_items)
+            parts.append(f'<item><title>Item {index}</title>'
+                f'<link>http://example.com/{name}/{index}</link>'
+                f'<guid>urn:{name}:{index}</guid>'
+                f'<description>{escape(description)}</description></item>')
+        parts.append('</channel></rss>')
+    return ''.join(parts).encode('utf-8')
+
+def _build_request_handler(fixture_server: 'FeedFixtureServer') -> Type[BaseHTTPRequestHandler]:
+    """Returns a request handler class serving the feeds of fixture_server
+    """
+    class FeedRequestHandler(BaseHTTPRequestHandler):
+        """Serves a registered feed or redirect, or 404 Not Found"""
+        protocol_version: str = 'HTTP/1.1'
+        # send the body without waiting for the headers to be acknowledged, as
+        # servers keeping connections open do
+        disable_nagle_algorithm: bool = True
+
+        def do_GET(self) -> None: # pylint: disable=invalid-name
+            """Respond with the feed registered for the request path"""
+            sleep(fixture_server.latency)
+            if self.path in fixture_server.redirects:
+                self.send_response(302)
+                self.send_header('Location', fixture_server.redirects[self.path])
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            feed: Optional[tuple[bytes, str]] = fixture_server.feeds.get(self.path)
+            if feed is None:
+                self.send_error(404)
+                return
+            content: bytes = feed[0]
+            self.send_response(200)
+            self.send_header('Content-Type', feed[1])
+            if fixture_server.compress and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                content = gzip_compress(content)
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format: str, *args: object) -> None: # pylint: disable=redefined-builtin
+            """Do not log requests"""
+
+    return FeedRequestHandler
+
+class FeedFixtureServer:
+    """Local HTTP server serving generated feeds by path, after an artificial latency,
+    gzip compressed to clients accepting it if compress is set.
+    Use as a context manager to run the server on a background thread.
+    """
+    def __init__(self, latency: float=0.0, compress: bool=False) -> None:
+        """Build a FeedFixtureServer listening on a free port of the loopback interface
+        """
+        self.latency: float = latency
+        self.compress: bool = compress
+        self.feeds: dict[str, tuple[bytes, str]] = {}
+        self.redirects: dict[str, str] = {}
+        self.http_server: ThreadingHTTPServer = ThreadingHTTPServer(
+            ('127.0.0.1', 0), _build_request_handler(self))
+        self.http_server.daemon_threads = True
+        self.thread: Thread = Thread(target=self.http_server.serve_forever,
+            kwargs={'poll_interval': 0.01}, daemon=True)
+
+    def add_feed(self, path: str, content: bytes, feed_format: str='rss') -> str:
+        """Serve content at path and return its URL
+        """
+        self.feeds[path] = (content, FEED_CONTENT_TYPES[feed_format])
+        return f'http://127.0.0.1:{self.http_server.server_port}{path}'
+
+    def add_redirect(self, path: str, target_path: str) -> str:
+        """Redirect requests for path to target_path and return the URL of path
+        """
+        self.redirects[path] = target_path
+        return f'http://127.0.0.1:{self.http_server.server_port}{path}'
+
+    def __enter__(self) -> 'FeedFixtureServer':
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]],
+    exc_value: Optional[BaseException], traceback: Optional[TracebackType]) -> None:
+        self.http_server.shutdown()
+        self.http_server.server_close()
@@ -1,9 +1,49 @@
 """feedparsers: contains one or more implementations of the RSSFeedLoader protocol
 """
-from typing import Any
-import feedparser
-import html2text
+import re
+from collections import OrderedDict
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from functools import partial
+from hashlib import blake2b
+from http.client import HTTPException
+from sys import intern
+from threading import Lock, local
+from time import perf_counter
+from typing import Any, BinaryIO, Callable, Iterator, Optional, Pattern, Sequence, TypeVar, Union
+from urllib.parse import urlsplit
+from xml.etree import ElementTree
 from model import RSSFeedItem, RSSFeedChannel
+from feedcache import CachedRSSFeed, FeedCache, RSSFeedItemKeys
+from pipelinehooks import PipelineHooks
+from seenindex import SeenItemIndex, get_parsed_rss_feed_item_identities
+from httpclient import HTTPClientResponse, HTTPClientStream, PooledHTTPClient
+from fetchpolicy import FetchPolicy
+from searchindex import SearchIndex
+from feedsnapshots import FeedSnapshotStore, ItemFingerprint
+from feedsnapshots import get_parsed_rss_feed_item_fingerprint
+from itemwindow import ItemWindow, get_parsed_rss_feed_item_timestamp
+from itemcache import ConvertedItemCache
+
+HTTP_NOT_MODIFIED: int = 304
+USER_AGENT: str = 'rss-feed-reader'
+DEFAULT_CONVERSION_CACHE_SIZE: int = 4096
+
+StageResult = TypeVar('StageResult')
+
+_SECONDS_PER_UPDATE_PERIOD: dict[str, float] = {
+    'hourly': 60 * 60,
+    'daily': 24 * 60 * 60,
+    'weekly': 7 * 24 * 60 * 60,
+    'monthly': 30 * 24 * 60 * 60,
+    'yearly': 365 * 24 * 60 * 60
+}
+_MAX_AGE_PATTERN: Pattern[str] = re.compile(r'max-age\s*=\s*(\d+)')
+
+# content html2text would change beyond collapsing whitespace: markup, entities,
+# backslash escapes, and line starts it escapes as markdown list or heading syntax
+_NOT_PLAIN_TEXT_PATTERN: Pattern[str] = re.compile(r'[<&\\\r\n]|^\s*[\d+-]')
 
 def _strip_whitespace(text_content: str) -> str:
     """Return text_content with leading and trailing whitespace removed
@@ -13,33 +53,499 @@ def _strip_whitespace(text_content: str) -> str:
         output_content = text_content.strip()
     return output_content
 
+class HTMLToTextConverter: # pylint: disable=too-many-instance-attributes
+    """Converts HTML content to plain text with html2text, remembering the most recent
+    max_entries results by content hash so repeated content is only converted once.
+    Content without any markup skips html2text altogether.
+    """
+    def __init__(self, max_entries: int=DEFAULT_CONVERSION_CACHE_SIZE, bodywidth: int=0) -> None:
+        """Build an HTMLToTextConverter
+        """
+        self.max_entries: int = max_entries
+        self.bodywidth: int = bodywidth
+        self.converted_text: OrderedDict[bytes, str] = OrderedDict()
+        self.lock: Lock = Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.plain_text: int = 0
+        self.thread_local: local = local()
+
+    def _convert(self, html_content: str) -> str:
+        """Return html_content converted by html2text with leading and trailing
+        whitespace removed
+        """
+        import html2text # pylint: disable=import-outside-toplevel
+        # HTML2Text instances hold parser state and can convert only one document
+        converter: html2text.HTML2Text = html2text.HTML2Text(bodywidth=self.bodywidth)
+        return _strip_whitespace(converter.handle(html_content))
+
+    def convert(self, html_content: str) -> str:
+        """Return html_content as plain text with leading and trailing whitespace removed
+        """
+        start: float = perf_counter()
+        text_content: str = self._convert_memoized(html_content)
+        self.thread_local.seconds = self.get_thread_seconds() + perf_counter() - start
+        return text_content
+
+    def get_thread_seconds(self) -> float:
+        """Returns total seconds the calling thread has spent converting content
+        """
+        return getattr(self.thread_local, 'seconds', 0.0)
+
+    def _convert_memoized(self, html_content: str) -> str:
+        """Return html_content as plain text, skipping html2text for plain text content
+        and reusing remembered results
+        """
+        if _NOT_PLAIN_TEXT_PATTERN.search(html_content) is None:
+            with self.lock:
+                self.plain_text += 1
+            return ' '.join(html_content.split())
+        key: bytes = blake2b(html_content.encode('utf-8', 'surrogatepass'),
+            digest_size=16).digest()
+        with self.lock:
+            memoized_text_content: Optional[str] = self.converted_text.get(key)
+            if memoized_text_content is not None:
+                self.hits += 1
+                self.converted_text.move_to_end(key)
+                return memoized_text_content
+            self.misses += 1
+        text_content: str = self._convert(html_content)
+        with self.lock:
+            self.converted_text[key] = text_content
+            if len(self.converted_text) > self.max_entries:
+                self.converted_text.popitem(last=False)
+        return text_content
+
+    def get_statistics(self) -> dict[str, int]:
+        """Returns counters of memoized conversions reused (hits), conversions performed
+        (misses), plain text content that needed no conversion and the current entry count
+        """
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'plain_text': self.plain_text,
+                'entries': len(self.converted_text)
+            }
+
+html_to_text_converter: HTMLToTextConverter = HTMLToTextConverter()
+
+def _intern_stripped(text_content: str) -> str:
+    """Return text_content with leading and trailing whitespace removed, interned so
+    that titles and links repeated across feeds and refreshes are stored once
+    """
+    return intern(_strip_whitespace(text_content))
+
 def _convert_html_content_to_text(html_content: str) -> str:
     """Return html_content (expecting HTML content) as plain text with leading and
     trailing whitespace removed
     """
-    text_content: str = html2text.html2text(html_content, bodywidth=0)
-    return _strip_whitespace(text_content)
+    return html_to_text_converter.convert(html_content)
+
+@dataclass
+class FetchedRSSFeed:
+    """ Representation of RSS feed content as downloaded, or as a stream of it while it is
+    downloaded, or of the location of a feed that is not fetched over HTTP and is read by
+    feedparser itself """
+    source: Union[bytes, str, BinaryIO]
+    status: Optional[int] = None
+    headers: dict[str, str] = field(default_factory=dict)
+    downloaded_bytes: int = 0
+
+http_client: PooledHTTPClient = PooledHTTPClient()
+
+def _get_refresh_interval(parsed_rss_feed_channel: dict[str, Any],
+headers: dict[str, str]) -> Optional[float]:
+    """Return the longest interval in seconds before the feed should be loaded again
+    according to its ttl or sy:updatePeriod/sy:updateFrequency elements and its HTTP
+    Cache-Control or Expires headers, or None if there are no such hints
+    """
+    intervals: list[float] = []
+    try:
+        intervals.append(float(parsed_rss_feed_channel['ttl']) * 60)
+    except (KeyError, TypeError, ValueError):
+        pass
+    update_period: str = str(parsed_rss_feed_channel.get('sy_updateperiod', '')).strip().lower()
+    if update_period in _SECONDS_PER_UPDATE_PERIOD:
+        try:
+            update_frequency: float = float(parsed_rss_feed_channel.get('sy_updatefrequency', 1))
+        except (TypeError, ValueError):
+            update_frequency = 1
+        intervals.append(_SECONDS_PER_UPDATE_PERIOD[update_period] / max(update_frequency, 1))
+    max_age_match: Optional[re.Match[str]] = _MAX_AGE_PATTERN.search(
+        headers.get('cache-control', ''))
+    if max_age_match is not None:
+        intervals.append(float(max_age_match.group(1)))
+    elif 'expires' in headers and 'date' in headers:
+        try:
+            intervals.append((parsedate_to_datetime(headers['expires'])
+                - parsedate_to_datetime(headers['date'])).total_seconds())
+        except (TypeError, ValueError):
+            pass
+    positive_intervals: list[float] = [interval for interval in intervals if interval > 0]
+    return max(positive_intervals) if positive_intervals else None
+
+def _get_parsed_rss_feed_item_keys(parsed_rss_feed_items: list[dict[str, Any]],
+with_identities: bool, with_fingerprints: bool, with_timestamps: bool) -> RSSFeedItemKeys:
+    """Return the keys of all parsed feed items, only those asked for
+    """
+    item_keys: RSSFeedItemKeys = RSSFeedItemKeys()
+    if with_identities:
+        item_keys.identities = [get_parsed_rss_feed_item_identities(parsed_rss_feed_item)
+            for parsed_rss_feed_item in parsed_rss_feed_items]
+    if with_fingerprints:
+        item_keys.fingerprints = [get_parsed_rss_feed_item_fingerprint(parsed_rss_feed_item)
+            for parsed_rss_feed_item in parsed_rss_feed_items]
+    if with_timestamps:
+        item_keys.timestamps = [get_parsed_rss_feed_item_timestamp(parsed_rss_feed_item)
+            for parsed_rss_feed_item in parsed_rss_feed_items]
+    return item_keys
 
-class FeedParserRSSFeedLoader:
+@dataclass
+class ProcessedRSSFeed: # pylint: disable=too-many-instance-attributes
+    """ Representation of a feed parsed and converted in a worker process, as plain tuples
+    of channel and item fields that are cheap to send back to the loading process. Items
+    are those converted, at item_indexes in the feed, while item_keys are of all items.
+    malformed is True if feedparser found the content was not well-formed. """
+    channel: tuple[str, str, str]
+    items: list[tuple[str, str, str]]
+    item_indexes: list[int]
+    item_keys: RSSFeedItemKeys
+    item_count: int
+    malformed: bool
+    refresh_interval: Optional[float]
+    seconds: dict[str, float]
+
+class FeedParserRSSFeedLoader: # pylint: disable=too-many-instance-attributes
     """Implements the RSSFeedLoader protocol using feedparser and html2text libraries
     """
-    def __init__(self, url: str) -> None:
-        """Build an instance of FeedParserRSSFeedLoader
+    def __init__(self, url: str, feed_cache: Optional[FeedCache]=None, # pylint: disable=too-many-arguments
+    hooks: Optional[PipelineHooks]=None, seen_index: Optional[SeenItemIndex]=None,
+    parse_executor: Optional[Executor]=None, fetch_policy: Optional[FetchPolicy]=None,
+    search_index: Optional[SearchIndex]=None,
+    snapshot_store: Optional[FeedSnapshotStore]=None,
+    item_window: Optional[ItemWindow]=None,
+    item_cache: Optional[ConvertedItemCache]=None, keep_all_items: bool=False) -> None:
+        """Build an instance of FeedParserRSSFeedLoader, with optional parameter feed_cache
+        to revalidate previously loaded content with a conditional GET, optional
+        parameter hooks to observe the duration of each loading stage, optional
+        parameter seen_index to drop items seen before, in any feed, before conversion,
+        optional parameter parse_executor, a process pool in which to parse and convert
+        downloaded content, optional parameter fetch_policy to rate limit, retry or
+        skip fetches over HTTP, optional parameter search_index to index loaded items
+        for full-text search, optional parameter snapshot_store to drop items unchanged
+        since the feed was last loaded before conversion, optional parameter
+        item_window to convert only the newest items, or those published since a time,
+        optional parameter item_cache to reuse items converted from the same entries
+        when the feed was last loaded and optional parameter keep_all_items to convert all
+        items of the feed, not only those to show, so they can be stored
         """
         self.url: str = url
+        self.feed_cache: Optional[FeedCache] = feed_cache
+        self.hooks: Optional[PipelineHooks] = hooks
+        self.seen_index: Optional[SeenItemIndex] = seen_index
+        self.parse_executor: Optional[Executor] = parse_executor
+        self.fetch_policy: Optional[FetchPolicy] = fetch_policy
+        self.search_index: Optional[SearchIndex] = search_index
+        self.snapshot_store: Optional[FeedSnapshotStore] = snapshot_store
+        self.item_window: Optional[ItemWindow] = item_window
+        self.item_cache: Optional[ConvertedItemCache] = item_cache
+        self.keep_all_items: bool = keep_all_items
         self.rss_feed_channel: RSSFeedChannel = RSSFeedChannel('','','', list[RSSFeedItem]())
+        self.cached_rss_feed: Optional[CachedRSSFeed] = None
+        self.status: Optional[int] = None
+        self.refresh_interval: Optional[float] = None
 
     def load_rss_feed(self) -> None:
-        """RSS feed content is loaded in this method
+        """RSS feed content is loaded in this method.
+        If the feed is cached and the server reports it unchanged, the cached content is used.
+        Either way, only the items selected by the item window, changed since the feed
+        snapshot and not seen before are kept. All items of a feed downloaded again are
+        added to the search index, if any.
         """
-        parsed_rss_feed: dict[str, Any] = self._parse_rss_feed_by_url(self.url)
-        self.rss_feed_channel: RSSFeedChannel = self._convert_parsed_rss_feed_to_rss_feed_channel(
-            parsed_rss_feed)
+        cached_rss_feed: Optional[CachedRSSFeed] = None
+        if self.feed_cache is not None:
+            cached_rss_feed = self.feed_cache.get(self.url)
+        etag: Optional[str] = None if cached_rss_feed is None else cached_rss_feed.etag
+        modified: Optional[str] = None if cached_rss_feed is None else cached_rss_feed.modified
+        fetched_rss_feed: FetchedRSSFeed = self._run_stage(
+            'fetch', lambda: self._fetch_rss_feed(etag, modified))
+        self.status = fetched_rss_feed.status
+        if cached_rss_feed is not None and fetched_rss_feed.status == HTTP_NOT_MODIFIED:
+            self.feed_cache.record_not_modified(self.url)
+            self.cached_rss_feed = cached_rss_feed
+            cached_rss_feed_channel: RSSFeedChannel = cached_rss_feed.rss_feed_channel
+            cached_items: list[RSSFeedItem] = list(cached_rss_feed_channel.items)
+            self.rss_feed_channel = RSSFeedChannel(cached_rss_feed_channel.title,
+                cached_rss_feed_channel.description, cached_rss_feed_channel.link,
+                [cached_items[item_index] for item_index in self._select_item_indexes(
+                    len(cached_items), cached_rss_feed.item_keys)])
+            self.refresh_interval = _get_refresh_interval({}, fetched_rss_feed.headers)
+            self._report_feed_loaded(fetched_rss_feed, 'hit')
+            return
+        if self.parse_executor is None:
+            self._convert_fetched_rss_feed(fetched_rss_feed)
+        else:
+            self._convert_fetched_rss_feed_in_process(fetched_rss_feed)
+        self._store_rss_feed_channel(fetched_rss_feed)
+        if self.search_index is not None:
+            self.search_index.add_rss_feed_channel(self.url,
+                self.cached_rss_feed.rss_feed_channel)
+        self._report_feed_loaded(fetched_rss_feed, None if self.feed_cache is None else 'miss')
 
     def get_rss_feed_channel(self) -> RSSFeedChannel:
         """Returns RSS feed channel content as an instance of RSSFeedChannel"""
         return self.rss_feed_channel
 
+    def get_loaded_rss_feed_channel(self) -> RSSFeedChannel:
+        """Returns RSS feed channel content with all items of the feed, including those not
+        to show, if they were kept, or else with the items to show
+        """
+        if self.cached_rss_feed is None:
+            return self.rss_feed_channel
+        return self.cached_rss_feed.rss_feed_channel
+
+    def get_refresh_interval(self) -> Optional[float]:
+        """Returns seconds the feed asked to wait before it is loaded again, or None"""
+        return self.refresh_interval
+
+    def _keeps_all_items(self) -> bool:
+        """Returns True if all items of the feed are converted, not only those to show, as
+        the feed is cached, indexed or kept with all its items
+        """
+        return self.keep_all_items or self.feed_cache is not None or (
+            self.search_index is not None)
+
+    def _get_item_key_options(self) -> tuple[bool, bool, bool]:
+        """Returns whether identities, fingerprints and publication times of items are
+        needed, all of them when the feed is cached so its items can be selected again
+        """
+        return (self.seen_index is not None or self.feed_cache is not None,
+            self.snapshot_store is not None or self.item_cache is not None
+                or self.feed_cache is not None,
+            self.item_window is not None or self.feed_cache is not None)
+
+    def _select_item_indexes(self, item_count: int, item_keys: RSSFeedItemKeys,
+    malformed: bool=False) -> list[int]:
+        """Returns the indexes of the items to show among the item_count items of the feed:
+        those selected by the item window, changed since the feed snapshot, which is then
+        replaced, and not seen before, which are then recorded as seen. The snapshot is left
+        as is if the feed failed to load, or was malformed without any item, as the feed
+        would then seem to have lost all its items.
+        """
+        item_indexes: Sequence[int] = range(item_count)
+        if self.item_window is not None:
+            item_indexes = self.item_window.select_timestamps(item_keys.timestamps)
+        if self.snapshot_store is not None and not self.has_failed() and not (
+            malformed and item_count == 0):
+            changed_items: list[bool] = self.snapshot_store.compare_and_store(
+                self.url, item_keys.fingerprints)
+            item_indexes = [item_index for item_index in item_indexes
+                if changed_items[item_index]]
+        if self.seen_index is not None:
+            item_indexes = [item_index for item_index in item_indexes
+                if not self.seen_index.check_and_add(item_keys.identities[item_index])]
+            self.seen_index.commit()
+        return list(item_indexes)
+
+    def _set_loaded_items(self, channel_fields: tuple[str, str, str], # pylint: disable=too-many-arguments
+    item_count: int, item_keys: RSSFeedItemKeys, item_indexes: list[int],
+    loaded_items: dict[int, RSSFeedItem]) -> None:
+        """Set the loaded channel to the items at item_indexes, keep all items for the feed
+        cache and replace the items of the feed in the item cache by loaded_items, all items
+        converted or reused by index in the feed, unless the feed failed to load
+        """
+        if self.item_cache is not None and not self.has_failed():
+            self.item_cache.put_items(self.url, {item_keys.fingerprints[item_index]: rss_feed_item
+                for item_index, rss_feed_item in loaded_items.items()})
+        self.rss_feed_channel = RSSFeedChannel(*channel_fields,
+            [loaded_items[item_index] for item_index in item_indexes])
+        if self._keeps_all_items():
+            self.cached_rss_feed = CachedRSSFeed(None, None, RSSFeedChannel(*channel_fields,
+                [loaded_items[item_index] for item_index in range(item_count)]), item_keys)
+
+    def has_failed(self) -> bool:
+        """Returns True if the feed was not served by its HTTP server"""
+        return urlsplit(self.url).scheme in ('http', 'https') and (
+            self.status is None or self.status >= 400)
+
+    def get_error(self) -> Optional[str]:
+        """Returns why the feed was not served by its HTTP server, or None"""
+        if not self.has_failed():
+            return None
+        return f'Feed could not be loaded: HTTP status {self.status}' if self.status else (
+            'Feed could not be loaded: server not reachable')
+
+    def _fetch_rss_feed(self, etag: Optional[str], modified: Optional[str]) -> FetchedRSSFeed:
+        """Returns the feed fetched with the given validators, following the fetch policy
+        if there is one and the feed is fetched over HTTP
+        CircuitOpenError: If the feed is skipped after failing repeatedly
+        """
+        if self.fetch_policy is None or urlsplit(self.url).scheme not in ('http', 'https'):
+            return self._fetch_rss_feed_by_url(self.url, etag=etag, modified=modified)
+        return self.fetch_policy.fetch(
+            self.url, lambda: self._fetch_rss_feed_by_url(self.url, etag=etag, modified=modified))
+
+    def _run_stage(self, stage: str, run: Callable[[], StageResult]) -> StageResult:
+        """Returns result of run, reporting its duration to hooks as stage
+        """
+        start: float = perf_counter()
+        result: StageResult = run()
+        if self.hooks is not None:
+            self.hooks.on_stage(self.url, stage, perf_counter() - start)
+        return result
+
+    def _report_feed_loaded(self, fetched_rss_feed: FetchedRSSFeed,
+    cache_outcome: Optional[str]) -> None:
+        """Report the loaded feed to hooks
+        """
+        if self.hooks is not None:
+            self.hooks.on_feed_loaded(self.url, len(list(self.rss_feed_channel.items)),
+                fetched_rss_feed.downloaded_bytes, cache_outcome)
+
+    def _convert_fetched_rss_feed(self, fetched_rss_feed: FetchedRSSFeed) -> None:
+        """Parse fetched_rss_feed and convert it to an RSSFeedChannel in this thread
+        """
+        parsed_rss_feed: dict[str, Any] = self._run_stage(
+            'parse', lambda: self._parse_fetched_rss_feed(fetched_rss_feed))
+        self.refresh_interval = _get_refresh_interval(
+            self._get_parsed_rss_feed_channel(parsed_rss_feed), fetched_rss_feed.headers)
+        html2text_seconds: float = html_to_text_converter.get_thread_seconds()
+        start: float = perf_counter()
+        self._load_parsed_rss_feed(parsed_rss_feed)
+        if self.hooks is not None:
+            html2text_seconds = html_to_text_converter.get_thread_seconds() - html2text_seconds
+            self.hooks.on_stage(self.url, 'html2text', html2text_seconds)
+            self.hooks.on_stage(self.url, 'model', perf_counter() - start - html2text_seconds)
+
+    def _convert_fetched_rss_feed_in_process(self, fetched_rss_feed: FetchedRSSFeed) -> None:
+        """Parse fetched_rss_feed and convert it to an RSSFeedChannel in a worker process of
+        parse_executor. Items to show are then selected in this process, as the seen item
+        index and feed snapshots are only available here. Entries the item cache has items
+        for are not converted in the worker process.
+        """
+        cached_items: dict[ItemFingerprint, RSSFeedItem] = self._get_cached_items()
+        processed_rss_feed: ProcessedRSSFeed = self.parse_executor.submit(
+            FeedParserRSSFeedLoader._process_fetched_rss_feed, fetched_rss_feed,
+            *self._get_item_key_options(),
+            None if self._keeps_all_items() else self.item_window,
+            frozenset(cached_items)).result()
+        self.refresh_interval = processed_rss_feed.refresh_interval
+        item_keys: RSSFeedItemKeys = processed_rss_feed.item_keys
+        item_indexes: list[int] = self._select_item_indexes(
+            processed_rss_feed.item_count, item_keys, processed_rss_feed.malformed)
+        loaded_items: dict[int, RSSFeedItem] = {
+            item_index: RSSFeedItem(intern(item_fields[0]), item_fields[1], intern(item_fields[2]))
+            for item_index, item_fields in zip(
+                processed_rss_feed.item_indexes, processed_rss_feed.items)}
+        item_index: int
+        for item_index in range(processed_rss_feed.item_count) if self._keeps_all_items() else (
+            item_indexes):
+            if item_index not in loaded_items:
+                loaded_items[item_index] = cached_items[item_keys.fingerprints[item_index]]
+        self._set_loaded_items((intern(processed_rss_feed.channel[0]),
+            processed_rss_feed.channel[1], intern(processed_rss_feed.channel[2])),
+            processed_rss_feed.item_count, item_keys, item_indexes, loaded_items)
+        if self.hooks is not None:
+            stage: str
+            seconds: float
+            for stage, seconds in processed_rss_feed.seconds.items():
+                self.hooks.on_stage(self.url, stage, seconds)
+
+    @staticmethod
+    def _process_fetched_rss_feed(fetched_rss_feed: FetchedRSSFeed, # pylint: disable=too-many-arguments,too-many-locals
+    with_item_identities: bool, with_item_fingerprints: bool=False,
+    with_item_timestamps: bool=False, item_window: Optional[ItemWindow]=None,
+    reusable_fingerprints: frozenset[ItemFingerprint]=frozenset()) -> ProcessedRSSFeed:
+        """Returns fetched_rss_feed parsed and converted, with the time taken by each stage.
+        Runs in a worker process, so the result is made of plain tuples cheap to pickle.
+        Only items selected by item_window are converted, while item keys are of all items,
+        as the snapshot of the feed is of all of them. Items whose fingerprint is in
+        reusable_fingerprints are not converted either, as they are in the item cache.
+        """
+        start: float = perf_counter()
+        parsed_rss_feed: dict[str, Any] = FeedParserRSSFeedLoader._parse_fetched_rss_feed(
+            fetched_rss_feed)
+        parse_seconds: float = perf_counter() - start
+        parsed_rss_feed_items: list[dict[str, Any]] = parsed_rss_feed.get('entries', [])
+        item_keys: RSSFeedItemKeys = _get_parsed_rss_feed_item_keys(parsed_rss_feed_items,
+            with_item_identities, with_item_fingerprints or bool(reusable_fingerprints),
+            with_item_timestamps)
+        item_indexes: list[int] = list(range(len(parsed_rss_feed_items)))
+        if item_window is not None:
+            item_indexes = item_window.select(parsed_rss_feed_items)
+        if reusable_fingerprints:
+            item_indexes = [item_index for item_index in item_indexes
+                if item_keys.fingerprints[item_index] not in reusable_fingerprints]
+        parsed_rss_feed['entries'] = [
+            parsed_rss_feed_items[item_index] for item_index in item_indexes]
+        html2text_seconds: float = html_to_text_converter.get_thread_seconds()
+        start = perf_counter()
+        feedloader: FeedParserRSSFeedLoader = FeedParserRSSFeedLoader(fetched_rss_feed.headers.get(
+            'content-location', ''))
+        rss_feed_channel: RSSFeedChannel = feedloader._convert_parsed_rss_feed_to_rss_feed_channel( #pylint: disable=protected-access
+            parsed_rss_feed)
+        html2text_seconds = html_to_text_converter.get_thread_seconds() - html2text_seconds
+        return ProcessedRSSFeed(
+            channel=(rss_feed_channel.title, rss_feed_channel.description,
+                rss_feed_channel.link),
+            items=[(item.title, item.description, item.link) for item in rss_feed_channel.items],
+            item_indexes=item_indexes,
+            item_keys=item_keys,
+            item_count=len(parsed_rss_feed_items),
+            malformed=bool(parsed_rss_feed.get('bozo')),
+            refresh_interval=_get_refresh_interval(
+                FeedParserRSSFeedLoader._get_parsed_rss_feed_channel(parsed_rss_feed),
+                fetched_rss_feed.headers),
+            seconds={'parse': parse_seconds, 'html2text': html2text_seconds,
+                'model': perf_counter() - start - html2text_seconds}
+        )
+
+    def _store_rss_feed_channel(self, fetched_rss_feed: FetchedRSSFeed) -> None:
+        """Store the loaded feed with all its items in the feed cache if the server sent
+        validators for it
+        """
+        etag: Optional[str] = fetched_rss_feed.headers.get('etag')
+        modified: Optional[str] = fetched_rss_feed.headers.get('last-modified')
+        if self.feed_cache is not None and (etag or modified):
+            self.feed_cache.put(self.url, etag, modified,
+                self.cached_rss_feed.rss_feed_channel, self.cached_rss_feed.item_keys)
+
+    def _get_cached_items(self) -> dict[ItemFingerprint, RSSFeedItem]:
+        """Returns the items converted when the feed was last loaded by fingerprint of their
+        entries, empty without an item cache
+        """
+        if self.item_cache is None:
+            return {}
+        return self.item_cache.get_items(self.url)
+
+    def _load_parsed_rss_feed(self, parsed_rss_feed: dict[str, Any]) -> None:
+        """Set the loaded channel to the items of parsed_rss_feed to show, converting only
+        those, or all items when the feed is cached, and reusing items of the item cache
+        """
+        parsed_rss_feed_items: list[dict[str, Any]] = self._get_parsed_rss_feed_item_list(
+            parsed_rss_feed)
+        item_keys: RSSFeedItemKeys = _get_parsed_rss_feed_item_keys(
+            parsed_rss_feed_items, *self._get_item_key_options())
+        item_indexes: list[int] = self._select_item_indexes(len(parsed_rss_feed_items), item_keys,
+            bool(parsed_rss_feed.get('bozo')))
+        cached_items: dict[ItemFingerprint, RSSFeedItem] = self._get_cached_items()
+        loaded_items: dict[int, RSSFeedItem] = {}
+        item_index: int
+        for item_index in range(len(parsed_rss_feed_items)) if self._keeps_all_items() else (
+            item_indexes):
+            rss_feed_item: Optional[RSSFeedItem] = None
+            if self.item_cache is not None:
+                rss_feed_item = cached_items.get(item_keys.fingerprints[item_index])
+            if rss_feed_item is None:
+                rss_feed_item = self._convert_parsed_rss_feed_item_to_rss_feed_item(
+                    parsed_rss_feed_items[item_index])
+            loaded_items[item_index] = rss_feed_item
+        rss_feed_channel: RSSFeedChannel = self._convert_parsed_rss_feed_to_rss_feed_channel(
+            {'feed': self._get_parsed_rss_feed_channel(parsed_rss_feed)})
+        self._set_loaded_items(
+            (rss_feed_channel.title, rss_feed_channel.description, rss_feed_channel.link),
+            len(parsed_rss_feed_items), item_keys, item_indexes, loaded_items)
 
     def _convert_parsed_rss_feed_to_rss_feed_channel(self,
     parsed_rss_feed: dict[str, Any]) -> RSSFeedChannel:
@@ -54,11 +560,11 @@ class FeedParserRSSFeedLoader:
                 parsed_rss_feed_item)
             rss_feed_item_list.append(rss_feed_item)
 
-        whitespace_stripped_title: str = _strip_whitespace(
+        whitespace_stripped_title: str = _intern_stripped(
             parsed_rss_feed_channel.get('title', 'No title'))
         whitespace_stripped_description: str = _convert_html_content_to_text(
             parsed_rss_feed_channel.get('description', 'No description'))
-        whitespace_stripped_link: str = _strip_whitespace(
+        whitespace_stripped_link: str = _intern_stripped(
             parsed_rss_feed_channel.get('link', 'No link'))
 
         return RSSFeedChannel(
@@ -69,8 +575,37 @@ class FeedParserRSSFeedLoader:
         )
 
     @staticmethod
-    def _parse_rss_feed_by_url(url: str) -> dict[str, Any]:
-        return feedparser.parse(url)
+    def _fetch_rss_feed_by_url(url: str, etag: Optional[str]=None,
+    modified: Optional[str]=None) -> FetchedRSSFeed:
+        if urlsplit(url).scheme not in ('http', 'https'):
+            return FetchedRSSFeed(url)
+        request_headers: dict[str, str] = {
+            'User-Agent': USER_AGENT
+        }
+        if etag:
+            request_headers['If-None-Match'] = etag
+        if modified:
+            request_headers['If-Modified-Since'] = modified
+        try:
+            response: HTTPClientResponse = http_client.get(url, request_headers)
+        except (HTTPException, OSError, ValueError):
+            return FetchedRSSFeed(b'')
+        response.headers.setdefault('content-location', response.url)
+        return FetchedRSSFeed(
+            response.content, response.status, response.headers, response.downloaded_bytes)
+
+    @staticmethod
+    def _parse_fetched_rss_feed(fetched_rss_feed: FetchedRSSFeed) -> dict[str, Any]:
+        import feedparser # pylint: disable=import-outside-toplevel
+        if isinstance(fetched_rss_feed.source, str):
+            return feedparser.parse(fetched_rss_feed.source)
+        return feedparser.parse(fetched_rss_feed.source, response_headers=fetched_rss_feed.headers)
+
+    @staticmethod
+    def _parse_rss_feed_by_url(url: str, etag: Optional[str]=None,
+    modified: Optional[str]=None) -> dict[str, Any]:
+        return FeedParserRSSFeedLoader._parse_fetched_rss_feed(
+            FeedParserRSSFeedLoader._fetch_rss_feed_by_url(url, etag=etag, modified=modified))
 
     @staticmethod
     def _get_parsed_rss_feed_channel(parsed_rss_feed: dict[str, Any]) -> dict[str, Any]:
@@ -84,11 +619,11 @@ class FeedParserRSSFeedLoader:
     def _convert_parsed_rss_feed_item_to_rss_feed_item(
         parsed_rss_feed_item: dict[str, Any]) -> RSSFeedItem:
 
-        whitespace_stripped_title: str = _strip_whitespace(
+        whitespace_stripped_title: str = _intern_stripped(
             parsed_rss_feed_item.get('title', 'No title'))
         whitespace_stripped_description: str = _convert_html_content_to_text(
             parsed_rss_feed_item.get('description', 'No description'))
-        whitespace_stripped_link: str = _strip_whitespace(
+        whitespace_stripped_link: str = _intern_stripped(
             parsed_rss_feed_item.get('link', 'No link'))
 
         return RSSFeedItem(
@@ -96,3 +631,198 @@ class FeedParserRSSFeedLoader:
             description=whitespace_stripped_description,
             link=whitespace_stripped_link
         )
+
+_CHANNEL_TAGS: frozenset[str] = frozenset(('channel', 'feed'))
+_ITEM_TAGS: frozenset[str] = frozenset(('item', 'entry'))
+# element names across RSS 0.9x/1.0/2.0 and Atom mapped to RSSFeedItem/RSSFeedChannel fields
+_FIELD_NAMES: dict[str, str] = {
+    'title': 'title',
+    'link': 'link',
+    'description': 'description',
+    'summary': 'description',
+    'subtitle': 'description',
+    'content': 'description'
+}
+
+def _get_local_name(tag: str) -> str:
+    """Return tag without its XML namespace
+    """
+    return tag.rsplit('}', 1)[-1]
+
+def _add_field(fields: dict[str, str], element: ElementTree.Element) -> None:
+    """Add the content of element to fields if it maps to a field not yet seen.
+    Atom links carry their URL in the href attribute, and Atom XHTML content
+    is kept as markup for conversion to text.
+    """
+    field_name: Optional[str] = _FIELD_NAMES.get(_get_local_name(element.tag))
+    if field_name is None or field_name in fields:
+        return
+    if field_name == 'link' and element.get('rel', 'alternate') != 'alternate':
+        return
+    content: str = element.get('href') or element.text or ''
+    if len(element) > 0:
+        content += ''.join(ElementTree.tostring(child, encoding='unicode') for child in element)
+    fields[field_name] = content
+
+class _StreamingRSSFeedParser:
+    """Incremental RSS/Atom parser reading channel fields first and then one item at a
+    time, discarding each item's elements once it has been converted
+    """
+    def __init__(self, source: BinaryIO) -> None:
+        self.source: BinaryIO = source
+        self.open_elements: list[ElementTree.Element] = []
+        self.item_fields: Optional[dict[str, str]] = None
+        self.error: Optional[str] = None
+        self.events: Iterator[tuple[str, ElementTree.Element]] = self._iter_events()
+
+    def _iter_events(self) -> Iterator[tuple[str, ElementTree.Element]]:
+        """Yields start and end events of the document, keeping track of open elements.
+        Stops at the first XML syntax error or error reading the source, recording it and
+        keeping what was read before it.
+        """
+        try:
+            event: str
+            element: ElementTree.Element
+            for event, element in ElementTree.iterparse(self.source, events=('start', 'end')):
+                if event == 'start':
+                    self.open_elements.append(element)
+                yield event, element
+                if event == 'end':
+                    self.open_elements.pop()
+        except ElementTree.ParseError as error:
+            self.error = f'Feed is not well-formed XML, items after the error are missing: {error}'
+        except OSError as error:
+            self.error = f'Feed could not be read completely, items after the error are ' \
+                f'missing: {error.strerror or error}'
+
+    def _get_parent_name(self) -> str:
+        """Return the local name of the parent of the element that just ended
+        """
+        if len(self.open_elements) < 2:
+            return ''
+        return _get_local_name(self.open_elements[-2].tag)
+
+    def read_rss_feed_channel_fields(self) -> dict[str, str]:
+        """Returns channel fields found before the first item
+        """
+        channel_fields: dict[str, str] = {}
+        event: str
+        element: ElementTree.Element
+        for event, element in self.events:
+            if event == 'start':
+                if _get_local_name(element.tag) in _ITEM_TAGS:
+                    self.item_fields = {}
+                    break
+            elif self._get_parent_name() in _CHANNEL_TAGS:
+                _add_field(channel_fields, element)
+        return channel_fields
+
+    def iter_rss_feed_items(self) -> Iterator[RSSFeedItem]:
+        """Yields each item as soon as it has been read, closing the source at the end
+        """
+        try:
+            event: str
+            element: ElementTree.Element
+            for event, element in self.events:
+                is_item: bool = _get_local_name(element.tag) in _ITEM_TAGS
+                if event == 'start':
+                    if is_item:
+                        self.item_fields = {}
+                elif is_item and self.item_fields is not None:
+                    convert = FeedParserRSSFeedLoader._convert_parsed_rss_feed_item_to_rss_feed_item #pylint: disable=protected-access
+                    yield convert(self.item_fields)
+                    self.item_fields = None
+                    if len(self.open_elements) > 1:
+                        self.open_elements[-2].remove(element)
+                elif self.item_fields is not None and self._get_parent_name() in _ITEM_TAGS:
+                    _add_field(self.item_fields, element)
+        finally:
+            self.source.close()
+
+class StreamingRSSFeedLoader:
+    """Implements the RSSFeedLoader protocol with an incremental XML parser.
+    The channel fields are read by load_rss_feed, while the items of the returned
+    RSSFeedChannel are parsed and converted lazily as they are shown, so output can start
+    before the whole feed has been downloaded and memory use does not grow with feed size.
+    Feeds served over HTTP are requested by load_rss_feed through the shared HTTP client
+    and fetch_policy, if any, and their content is parsed as it is downloaded, the
+    connection going back to the pool once the last item has been read. Channel fields
+    placed after the first item are not read.
+    """
+    def __init__(self, url: str, fetch_policy: Optional[FetchPolicy]=None) -> None:
+        """Build an instance of StreamingRSSFeedLoader, with optional parameter fetch_policy
+        to rate limit, retry or skip fetches over HTTP
+        """
+        self.url: str = url
+        self.fetch_policy: Optional[FetchPolicy] = fetch_policy
+        self.rss_feed_channel: RSSFeedChannel = RSSFeedChannel('','','', list[RSSFeedItem]())
+        self.parser: Optional[_StreamingRSSFeedParser] = None
+        self.error: Optional[str] = None
+
+    def load_rss_feed(self) -> None:
+        """RSS feed channel fields are loaded in this method, items are loaded on iteration
+        CircuitOpenError: If the feed is skipped after failing repeatedly
+        """
+        try:
+            source: BinaryIO = self._open_rss_feed()
+        except OSError as error:
+            self.error = f'Feed could not be read: {error.strerror or error}'
+            self.rss_feed_channel = RSSFeedChannel(
+                'No title', 'No description', 'No link', list[RSSFeedItem]())
+            return
+        self.parser = _StreamingRSSFeedParser(source)
+        channel_fields: dict[str, str] = self.parser.read_rss_feed_channel_fields()
+        self.rss_feed_channel = RSSFeedChannel(
+            title=_intern_stripped(channel_fields.get('title', 'No title')),
+            description=_convert_html_content_to_text(
+                channel_fields.get('description', 'No description')),
+            link=_intern_stripped(channel_fields.get('link', 'No link')),
+            items=self.parser.iter_rss_feed_items()
+        )
+
+    def get_rss_feed_channel(self) -> RSSFeedChannel:
+        """Returns RSS feed channel content as an instance of RSSFeedChannel,
+        whose items can be iterated once
+        """
+        return self.rss_feed_channel
+
+    def get_error(self) -> Optional[str]:
+        """Returns why the feed could not be read, at all or past an XML syntax error met
+        while reading its items so far, or None
+        """
+        if self.error is None and self.parser is not None:
+            return self.parser.error
+        return self.error
+
+    def has_failed(self) -> bool:
+        """Returns True if the feed could not be read completely"""
+        return self.get_error() is not None
+
+    @staticmethod
+    def _open_rss_feed_by_url(url: str) -> FetchedRSSFeed:
+        """Returns the feed at the HTTP(S) url with a stream of its content as it is
+        downloaded, or closed if the server answered with an error status
+        """
+        try:
+            stream: HTTPClientStream = http_client.open(url, {'User-Agent': USER_AGENT})
+        except (HTTPException, OSError, ValueError):
+            return FetchedRSSFeed(b'')
+        if stream.status >= 400:
+            stream.close()
+        return FetchedRSSFeed(stream, stream.status, stream.headers)
+
+    def _open_rss_feed(self) -> BinaryIO:
+        """Returns a binary stream of the feed, read as it is downloaded if url is an
+        HTTP(S) URL or opened if it is a file path
+        OSError: If the feed could not be downloaded or opened
+        """
+        if urlsplit(self.url).scheme not in ('http', 'https'):
+            return open(self.url, 'rb') #pylint: disable=consider-using-with
+        fetch: Callable[[], FetchedRSSFeed] = partial(
+            StreamingRSSFeedLoader._open_rss_feed_by_url, self.url)
+        fetched_rss_feed: FetchedRSSFeed = fetch() if self.fetch_policy is None else (
+            self.fetch_policy.fetch(self.url, fetch))
+        if fetched_rss_feed.status is None or fetched_rss_feed.status >= 400:
+            raise OSError(f'HTTP status {fetched_rss_feed.status}'
+                if fetched_rss_feed.status else 'server not reachable')
+        return fetched_rss_feed.source
@@ -1,12 +1,29 @@
 """Tests for module feedloaders
 """
-from typing import Any, Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+import io
+import os
+import tempfile
 import unittest
+from unittest import mock
 from model import RSSFeedChannel, RSSFeedItem
-from feedloaders import _convert_html_content_to_text, _strip_whitespace
-from feedloaders import FeedParserRSSFeedLoader
+from feedloaders import _convert_html_content_to_text, _strip_whitespace, _intern_stripped
+from feedloaders import FeedParserRSSFeedLoader, HTMLToTextConverter, StreamingRSSFeedLoader
+from feedloaders import FetchedRSSFeed, ProcessedRSSFeed, _get_refresh_interval
+from feedloaders import html_to_text_converter
+from feedfixtures import FeedFixtureServer, generate_feed
+from httpclient import PooledHTTPClient
+from feedcache import FeedCache
+from fetchpolicy import CircuitBreaker, CircuitOpenError, FetchPolicy
+from seenindex import SeenItemIndex
+from searchindex import SearchIndex
+from feedsnapshots import FeedSnapshotStore
+from pipelinestats import PipelineStats
+from itemwindow import ItemWindow
+from itemcache import ConvertedItemCache
 
-class TestRSSFeedParsers(unittest.TestCase):
+class TestRSSFeedParsers(unittest.TestCase): #pylint: disable=too-many-public-methods
     """Tests for module feedloaders members including class FeedParserRSSFeedLoader
     """
     def test_convert_html_content_to_text(self) -> None:
@@ -17,6 +34,38 @@ class TestRSSFeedParsers(unittest.TestCase):
         expected_result: str = 'Paragraph'
         self.assertEqual(actual_result, expected_result)
 
+    def test_html_to_text_converter_plain_text(self) -> None:
+        """Verify content without markup gives the same result as html2text without using it
+        """
+        converter: HTMLToTextConverter = HTMLToTextConverter()
+        test_data: list[str] = [' Some  plain\ttext. ', 'a*b_c [x]', '']
+        expected_result: list[str] = [converter._convert(text) for text in test_data] #pylint: disable=protected-access
+        actual_result: list[str] = [converter.convert(text) for text in test_data]
+        self.assertEqual(actual_result, expected_result)
+        self.assertEqual(converter.get_statistics()['plain_text'], 3)
+
+    def test_html_to_text_converter_escaped_content(self) -> None:
+        """Verify content html2text escapes as markdown is still converted with html2text
+        """
+        converter: HTMLToTextConverter = HTMLToTextConverter()
+        self.assertEqual(converter.convert('1. first'), '1\\. first')
+        self.assertEqual(converter.convert('a\n- b'), 'a \\- b')
+        self.assertEqual(converter.get_statistics()['plain_text'], 0)
+
+    def test_html_to_text_converter_memoizes(self) -> None:
+        """Verify repeated content is converted once and least recently used results
+        are evicted beyond max_entries
+        """
+        converter: HTMLToTextConverter = HTMLToTextConverter(max_entries=2)
+        converter.convert('<p>One</p>')
+        converter.convert('<p>Two</p>')
+        self.assertEqual(converter.convert('<p>One</p>'), 'One')
+        converter.convert('<p>Three</p>')
+        self.assertEqual(converter.get_statistics(),
+            {'hits': 1, 'misses': 3, 'plain_text': 0, 'entries': 2})
+        converter.convert('<p>Two</p>')
+        self.assertEqual(converter.get_statistics()['misses'], 4)
+
     def test_strip_whitespace(self) -> None:
         """Verify leading and trailing whitespace are removed when invoking method
         """
@@ -25,6 +74,14 @@ class TestRSSFeedParsers(unittest.TestCase):
         expected_result: str = '123'
         self.assertEqual(actual_result, expected_result)
 
+    def test_intern_stripped(self) -> None:
+        """Verify equal stripped text from different sources is the same object
+        """
+        first_link: str = _intern_stripped(' http://somelink.lnk/' + str(1)) #pylint: disable=protected-access
+        second_link: str = _intern_stripped('http://somelink.lnk/1 ') #pylint: disable=protected-access
+        self.assertEqual(first_link, 'http://somelink.lnk/1')
+        self.assertIs(first_link, second_link)
+
     def test_parse_rss_feed_by_url(self) -> None:
         """Verify calling _parse_rss_feed_by_url with empty string does not return None
         """
@@ -111,3 +168,599 @@ class TestRSSFeedParsers(unittest.TestCase):
             items=expected_result_items
         )
         self.assertEqual(actual_result, expected_result)
+
+    def test_load_rss_feed_not_modified_uses_cache(self) -> None:
+        """Verify cached content is used without conversion when the server responds
+        304 Not Modified to the conditional GET
+        """
+        feed_cache: FeedCache = FeedCache(':memory:')
+        cached_channel: RSSFeedChannel = RSSFeedChannel('Cached','','',list[RSSFeedItem]())
+        feed_cache.put('http://feed.lnk', '"etag"', None, cached_channel)
+        requested_validators: list = []
+        def mock_fetch(url: str, etag: Any=None, modified: Any=None) -> FetchedRSSFeed:
+            requested_validators.append((url, etag, modified))
+            return FetchedRSSFeed(b'', 304)
+        feedloader: FeedParserRSSFeedLoader = FeedParserRSSFeedLoader(
+            'http://feed.lnk', feed_cache=feed_cache)
+        feedloader._fetch_rss_feed_by_url = mock_fetch #pylint: disable=protected-access
+        feedloader.load_rss_feed()
+        self.assertEqual(feedloader.get_rss_feed_channel(), cached_channel)
+        self.assertEqual(requested_validators, [('http://feed.lnk', '"etag"', None)])
+        self.assertEqual(feed_cache.get_statistics()['hits'], 1)
+
+    def test_load_rss_feed_stores_validated_content(self) -> None:
+        """Verify content served with validators is stored in the feed cache
+        """
+        feed_cache: FeedCache = FeedCache(':memory:')
+        feedloader: FeedParserRSSFeedLoader = FeedParserRSSFeedLoader(
+            'http://feed.lnk', feed_cache=feed_cache)
+        feedloader._fetch_rss_feed_by_url = lambda url, etag=None, modified=None: FetchedRSSFeed( #pylint: disable=protected-access
+            b'<rss><channel><title>Fresh</title><ttl>5</ttl></channel></rss>', 200,
+            {'etag': '"new"'})
+        feedloader.load_rss_feed()
+        self.assertEqual(feedloader.get_rss_feed_channel().title, 'Fresh')
+        self.assertEqual(feed_cache.get('http://feed.lnk').etag, '"new"')
+        self.assertEqual(feedloader.get_refresh_interval(), 300)
+        feedloader.load_rss_feed()
+        self.assertEqual(feed_cache.get_statistics()['misses'], 2)
+
+    def test_load_rss_feed_adds_items_to_search_index(self) -> None:
+        """Verify loaded items are indexed under the feed URL, and a feed served 304 Not
+        Modified is not indexed again
+        """
+        search_index: SearchIndex = SearchIndex(':memory:')
+        feed_cache: FeedCache = FeedCache(':memory:')
+        responses: list[FetchedRSSFeed] = [FetchedRSSFeed(
+            b'<rss><channel><item><title>Indexed story</title><link>http://feed.lnk/1</link>'
+            b'</item></channel></rss>', 200, {'etag': '"1"'}), FetchedRSSFeed(b'', 304)]
+        feedloader: FeedParserRSSFeedLoader = FeedParserRSSFeedLoader(
+            'http://feed.lnk', feed_cache=feed_cache, search_index=search_index)
+        feedloader._fetch_rss_feed_by_url = lambda url, etag=None, modified=None: responses.pop(0) #pylint: disable=protected-access
+        feedloader.load_rss_feed()
+        feedloader.load_rss_feed()
+        self.assertEqual([(result.feed, result.link) for result in search_index.search('story')],
+            [('http://feed.lnk', 'http://feed.lnk/1')])
+        self.assertEqual(search_index.get_statistics()['indexed'], 1)
+        search_index.close()
+
+    def test_load_rss_feed_indexes_all_items(self) -> None:
+        """Verify items not shown, as they are outside the item window, are indexed too
+        """
+        search_index: SearchIndex = SearchIndex(':memory:')
+        feedloader: FeedParserRSSFeedLoader = FeedParserRSSFeedLoader(
+            'http://feed.lnk', search_index=search_index, item_window=ItemWindow(max_items=1))
+        feedloader._fetch_rss_feed_by_url = lambda url, etag=None, modified=None: FetchedRSSFeed( #pylint: disable=protected-access
+            b'<rss><channel><item><title>New story</title></item>'
+            b'<item><title>Old story</title></item></channel></rss>', 200)
+        feedloader.load_rss_feed()
+        self.assertEqual([item.title for item in feedloader.get_rss_feed_channel().items],
+            ['New story'])
+        self.assertEqual(sorted(result.title for result in search_index.search('story')),
+            ['New story', 'Old story'])
+        search_index.close()
+
+    def test_load_rss_feed_follows_fetch_policy(self) -> None:
+        """Verify a feed fetched over HTTP is retried by the fetch policy, and a feed whose
+        circuit is open is not fetched
+        """
+        fetch_policy: FetchPolicy = FetchPolicy(retries=1, wait=lambda seconds: None,
+            circuit_breaker=CircuitBreaker(failure_threshold=1))
+        statuses: list[int] = [503, 200, 503, 503]
+        feedloader: FeedParserRSSFeedLoader = FeedParserRSSFeedLoader(
+            'http://feed.lnk', fetch_policy=fetch_policy)
+        feedloader._fetch_rss_feed_by_url = lambda url, etag=None, modified=None: FetchedRSSFeed( #pylint: disable=protected-access
+            b'<rss><channel><title>Fresh</title></channel></rss>', statuses.pop(0))
+        feedloader.load_rss_feed()
+        self.assertEqual(feedloader.get_rss_feed_channel().title, 'Fresh')
+        feedloader.load_rss_feed()
+        self.assertRaises(CircuitOpenError, feedloader.load_rss_feed)
+        self.assertEqual(fetch_policy.get_statistics()['retries'], 2)
+        fetch_policy.close()
+
+    def test_load_rss_feed_drops_seen_items(self) -> None:
+        """Verify items seen before in any feed are dropped, and a feed served 304 Not Modified
+        has no new items
+        """
+        feed_cache: FeedCache = FeedCache(':memory:')
+        seen_index: SeenItemIndex = SeenItemIndex(':memory:')
+        content: bytes = (b'<rss><channel><title>Feed</title>'
+            b'<item><title>Old</title><link>http://a.lnk/1</link></item>'
+            b'<item><title>New</title><link>http://a.lnk/2</link></item></channel></rss>')
+        seen_index.check_and_add(['link:http://a.lnk/1'])
+        feedloader: FeedParserRSSFeedLoader = FeedParserRSSFeedLoader(
+            'http://feed.lnk', feed_cache=feed_cache, seen_index=seen_index)
+        feedloader._fetch_rss_feed_by_url = lambda url, etag=None, modified=None: FetchedRSSFeed( #pylint: disable=protected-access
+            content, 200, {'etag': '"1"'})
+        feedloader.load_rss_feed()
+        self.assertEqual([item.title for item in feedloader.get_rss_feed_channel().items],
+            ['New'])
+        feedloader._fetch_rss_feed_by_url = lambda url, etag=None, modified=None: FetchedRSSFeed( #pylint: disable=protected-access
+            b'', 304)
+        feedloader.load_rss_feed()
+        self.assertEqual(feedloader.get_rss_feed_channel(),
+            RSSFeedChannel('Feed', 'No description', 'No link', list[RSSFeedItem]()))
+        self.assertEqual(seen_index.get_statistics()['seen'], 3)
+        self.assertEqual([item.title for item in feedloader.get_loaded_rss_feed_channel().items],
+            ['Old', 'New'])
+        seen_index.close()
+
+    def test_load_rss_feed_keeps_all_items(self) -> None:
+        """Verify all items are loaded with keep_all_items, though items seen on the first
+        load are not shown, and only the items to show are loaded without it
+        """
+        seen_index: SeenItemIndex = SeenItemIndex(':memory:')
+        keep_all_items: bool
+        for keep_all_items in (False, False, True):
+            feedloader: FeedParserRSSFeedLoader = FeedParserRSSFeedLoader('http://feed.lnk',
+                seen_index=seen_index, keep_all_items=keep_all_items)
+            feedloader._fetch_rss_feed_by_url = lambda url, etag=None, modified=None: ( #pylint: disable=protected-access
+                FetchedRSSFeed(generate_feed(2, description_size=20), 200))
+            feedloader.load_rss_feed()
+            self.assertEqual(len(list(feedloader.get_loaded_rss_feed_channel().items)),
+                len(list(feedloader.get_rss_feed_channel().items)) + 2 * keep_all_items)
+        seen_index.close()
+
+    def test_load_rss_feed_caches_all_items(self) -> None:
+        """Verify a feed loaded with seen items dropped, here in a process pool, is cached
+        with all its items, so a later run without the seen item index is served all of
+        them on 304 Not Modified
+        """
+        content: bytes = generate_feed(5, description_size=20)
+        def mock_fetch(url: str, etag: Any=None, modified: Any=None) -> FetchedRSSFeed: #pylint: disable=unused-argument
+            return FetchedRSSFeed(b'', 304) if etag == '"1"' else FetchedRSSFeed(
+                content, 200, {'etag': '"1"'})
+        seen_index: SeenItemIndex = SeenItemIndex(':memory:')
+        feed_cache: FeedCache = FeedCache(':memory:')
+        feedloader: FeedParserRSSFeedLoader = FeedParserRSSFeedLoader('http://feed.lnk',
+            seen_index=seen_index)
+        feedloader._fetch_rss_feed_by_url = mock_fetch #pylint: disable=protected-access
+        feedloader.load_rss_feed()
+        self.assertEqual(len(list(feedloader.get_rss_feed_channel().items)), 5)
+        feedloader.feed_cache = feed_cache
+        with ProcessPoolExecutor(max_workers=1) as parse_executor:
+            feedloader.parse_executor = parse_executor
+            feedloader.load_rss_feed()
+        self.assertEqual(list(feedloader.get_rss_feed_channel().items), [])
+        feedloader = FeedParserRSSFeedLoader('http://feed.lnk', feed_cache=feed_cache)
+        feedloader._fetch_rss_feed_by_url = mock_fetch #pylint: disable=protected-access
+        feedloader.load_rss_feed()
+        self.assertEqual(len(list(feedloader.get_rss_feed_channel().items)), 5)
+        self.assertEqual(feed_cache.get_statistics()['hits'], 1)
+        seen_index.close()
+        feed_cache.close()
+
+    def test_load_rss_feed_applies_item_window_to_cached_feed(self) -> None:
+        """Verify a feed loaded with an item window is cached with all its items, and the
+        item window of a later run is applied to the cached feed served on 304 Not Modified
+        """
+        content: bytes = generate_feed(5, description_size=20)
+        def mock_fetch(url: str, etag: Any=None, modified: Any=None) -> FetchedRSSFeed: #pylint: disable=unused-argument
+            return FetchedRSSFeed(b'', 304) if etag == '"1"' else FetchedRSSFeed(
+                content, 200, {'etag': '"1"'})
+        feed_cache: FeedCache = FeedCache(':memory:')
+        actual_result: list[int] = []
+        item_window: Optional[ItemWindow]
+        for item_window in [ItemWindow(max_items=2), None, ItemWindow(max_items=1)]:
+            feedloader: FeedParserRSSFeedLoader = FeedParserRSSFeedLoader('http://feed.lnk',
+                feed_cache=feed_cache, item_window=item_window)
+            feedloader._fetch_rss_feed_by_url = mock_fetch #pylint: disable=protected-access
+            feedloader.load_rss_feed()
+            actual_result.append(len(list(feedloader.get_rss_feed_channel().items)))
+        self.assertEqual(actual_result, [2, 5, 1])
+        self.assertEqual(feed_cache.get_statistics()['hits'], 2)
+        feed_cache.close()
+
+    def test_load_rss_feed_drops_unchanged_items(self) -> None:
+        """Verify items unchanged since the feed was last loaded are dropped, in a thread
+        or in a process pool, and a feed served 304 Not Modified has no changed items
+        """
+        feed_cache: FeedCache = FeedCache(':memory:')
+        snapshot_store: FeedSnapshotStore = FeedSnapshotStore(':memory:')
+        responses: list[FetchedRSSFeed] = [FetchedRSSFeed(
+            b'<rss><channel><item><title>Kept</title><link>http://a.lnk/1</link></item>'
+            b'<item><title>Edited</title><link>http://a.lnk/2</link></item>'
+            b'</channel></rss>', 200, {'etag': '"1"'}), FetchedRSSFeed(b'', 304)]
+        feedloader: FeedParserRSSFeedLoader = FeedParserRSSFeedLoader(
+            'http://feed.lnk', feed_cache=feed_cache, snapshot_store=snapshot_store)
+        feedloader._fetch_rss_feed_by_url = lambda url, etag=None, modified=None: responses.pop(0) #pylint: disable=protected-access
+        feedloader.load_rss_feed()
+        self.assertEqual(len(list(feedloader.get_rss_feed_channel().items)), 2)
+        feedloader.load_rss_feed()
+        self.assertEqual(list(feedloader.get_rss_feed_channel().items), [])
+        content: bytes = (b'<rss><channel><item><title>Kept</title><link>http://a.lnk/1</link>'
+            b'</item><item><title>Edited again</title><link>http://a.lnk/2</link></item>'
+            b'<item><title>Added</title><link>http://a.lnk/3</link></item></channel></rss>')
+        feedloader = FeedParserRSSFeedLoader('http://feed.lnk', snapshot_store=snapshot_store)
+        feedloader._fetch_rss_feed_by_url = lambda url, etag=None, modified=None: FetchedRSSFeed( #pylint: disable=protected-access
+            content, 200)
+        feedloader.load_rss_feed()
+        self.assertEqual([item.title for item in feedloader.get_rss_feed_channel().items],
+            ['Edited again', 'Added'])
+        content = content.replace(b'Added', b'Added in process')
+        with ProcessPoolExecutor(max_workers=1) as parse_executor:
+            feedloader.parse_executor = parse_executor
+            feedloader.load_rss_feed()
+        self.assertEqual([item.title for item in feedloader.get_rss_feed_channel().items],
+            ['Added in process'])
+        self.assertEqual(snapshot_store.get_statistics(),
+            {'added': 3, 'updated': 2, 'unchanged': 5})
+        snapshot_store.close()
+
+    def test_load_rss_feed_failure_keeps_snapshot(self) -> None:
+        """Verify a feed failing to load, or malformed without any item, in a thread or in
+        a process pool, leaves its snapshot as is, so its items are not shown again as added
+        when it loads again
+        """
+        snapshot_store: FeedSnapshotStore = FeedSnapshotStore(':memory:')
+        content: bytes = (b'<rss><channel><item><title>Kept</title><link>http://a.lnk/1</link>'
+            b'</item></channel></rss>')
+        responses: list[FetchedRSSFeed] = [FetchedRSSFeed(content, 200),
+            FetchedRSSFeed(b'', 503), FetchedRSSFeed(b'<html><p>Maintenance', 200),
+            FetchedRSSFeed(content, 200)]
+        feedloader: FeedParserRSSFeedLoader = FeedParserRSSFeedLoader(
+            'http://feed.lnk', snapshot_store=snapshot_store)
+        feedloader._fetch_rss_feed_by_url = lambda url, etag=None, modified=None: responses.pop(0) #pylint: disable=protected-access
+        feedloader.load_rss_feed()
+        feedloader.load_rss_feed()
+        self.assertTrue(feedloader.has_failed())
+        with ProcessPoolExecutor(max_workers=1) as parse_executor:
+            feedloader.parse_executor = parse_executor
+            feedloader.load_rss_feed()
+        feedloader.parse_executor = None
+        feedloader.load_rss_feed()
+        self.assertEqual(list(feedloader.get_rss_feed_channel().items), [])
+        self.assertEqual(snapshot_store.get_statistics(),
+            {'added': 1, 'updated': 0, 'unchanged': 1})
+        snapshot_store.close()
+
+    def test_load_rss_feed_converts_item_window_only(self) -> None:
+        """Verify only items in the item window are converted, in a thread or in a process
+        pool, while the snapshot of the feed is of all its items
+        """
+        snapshot_store: FeedSnapshotStore = FeedSnapshotStore(':memory:')
+        content: bytes = (b'<rss><channel><item><title>Old</title><link>http://a.lnk/1</link>'
+            b'<pubDate>Mon, 01 Jan 2001 00:00:00 GMT</pubDate></item>'
+            b'<item><title>Undated</title><link>http://a.lnk/2</link>'
+            b'<description>&lt;b&gt;Undated&lt;/b&gt;</description></item>'
+            b'<item><title>New</title><link>http://a.lnk/3</link>'
+            b'<pubDate>Mon, 01 Jan 2024 00:00:00 GMT</pubDate></item></channel></rss>')
+        feedloader: FeedParserRSSFeedLoader = FeedParserRSSFeedLoader('http://feed.lnk',
+            snapshot_store=snapshot_store, item_window=ItemWindow(max_items=1))
+        feedloader._fetch_rss_feed_by_url = lambda url, etag=None, modified=None: FetchedRSSFeed( #pylint: disable=protected-access
+            content, 200)
+        converter_misses: int = html_to_text_converter.get_statistics()['misses']
+        feedloader.load_rss_feed()
+        self.assertEqual([item.title for item in feedloader.get_rss_feed_channel().items],
+            ['New'])
+        self.assertEqual(html_to_text_converter.get_statistics()['misses'], converter_misses)
+        content = content.replace(b'<title>New', b'<title>Edited')
+        feedloader.item_window = ItemWindow(max_items=2)
+        with ProcessPoolExecutor(max_workers=1) as parse_executor:
+            feedloader.parse_executor = parse_executor
+            feedloader.load_rss_feed()
+        self.assertEqual([item.title for item in feedloader.get_rss_feed_channel().items],
+            ['Edited'])
+        self.assertEqual(snapshot_store.get_statistics(),
+            {'added': 3, 'updated': 1, 'unchanged': 2})
+        snapshot_store.close()
+        processed_rss_feed: ProcessedRSSFeed = FeedParserRSSFeedLoader._process_fetched_rss_feed( #pylint: disable=protected-access
+            FetchedRSSFeed(content), False, True, False, ItemWindow(max_items=2))
+        self.assertEqual([item[0] for item in processed_rss_feed.items], ['Old', 'Edited'])
+        self.assertEqual(processed_rss_feed.item_indexes, [0, 2])
+        self.assertEqual(len(processed_rss_feed.item_keys.fingerprints), 3)
+
+    def test_load_rss_feed_reuses_converted_items(self) -> None:
+        """Verify items of entries unchanged since the feed was last loaded are reused, in a
+        thread or in a process pool, and only new or edited entries are converted
+        """
+        item_cache: ConvertedItemCache = ConvertedItemCache()
+        content: bytes = (b'<rss><channel><item><title>Kept</title><link>http://a.lnk/1</link>'
+            b'<description>&lt;b&gt;Kept&lt;/b&gt;</description></item>'
+            b'<item><title>Edited</title><link>http://a.lnk/2</link></item></channel></rss>')
+        feedloader: FeedParserRSSFeedLoader = FeedParserRSSFeedLoader('http://feed.lnk',
+            item_cache=item_cache)
+        feedloader._fetch_rss_feed_by_url = lambda url, etag=None, modified=None: FetchedRSSFeed( #pylint: disable=protected-access
+            content, 200)
+        feedloader.load_rss_feed()
+        kept_item: RSSFeedItem = list(feedloader.get_rss_feed_channel().items)[0]
+        content = content.replace(b'<title>Edited', b'<title>Edited again')
+        feedloader.load_rss_feed()
+        rss_feed_items: list[RSSFeedItem] = list(feedloader.get_rss_feed_channel().items)
+        self.assertIs(rss_feed_items[0], kept_item)
+        self.assertEqual(rss_feed_items[1].title, 'Edited again')
+        self.assertEqual(item_cache.get_statistics(),
+            {'reused': 1, 'converted': 3, 'feeds': 1, 'entries': 2})
+        fetch_rss_feed_by_url: Callable[..., FetchedRSSFeed] = feedloader._fetch_rss_feed_by_url #pylint: disable=protected-access
+        feedloader._fetch_rss_feed_by_url = lambda url, etag=None, modified=None: FetchedRSSFeed( #pylint: disable=protected-access
+            b'', 503)
+        feedloader.load_rss_feed()
+        self.assertEqual(item_cache.get_statistics()['entries'], 2)
+        feedloader._fetch_rss_feed_by_url = fetch_rss_feed_by_url #pylint: disable=protected-access
+        content = content.replace(b'</channel>',
+            b'<item><title>Added</title><link>http://a.lnk/3</link></item></channel>')
+        with ProcessPoolExecutor(max_workers=1) as parse_executor:
+            feedloader.parse_executor = parse_executor
+            feedloader.load_rss_feed()
+        rss_feed_items = list(feedloader.get_rss_feed_channel().items)
+        self.assertIs(rss_feed_items[0], kept_item)
+        self.assertEqual([item.title for item in rss_feed_items],
+            ['Kept', 'Edited again', 'Added'])
+        self.assertEqual(item_cache.get_statistics(),
+            {'reused': 3, 'converted': 4, 'feeds': 1, 'entries': 3})
+        processed_rss_feed: ProcessedRSSFeed = FeedParserRSSFeedLoader._process_fetched_rss_feed( #pylint: disable=protected-access
+            FetchedRSSFeed(content), False, True, False, ItemWindow(max_items=2),
+            frozenset(item_cache.get_items('http://feed.lnk')))
+        self.assertEqual(processed_rss_feed.items, [])
+        self.assertEqual(processed_rss_feed.item_indexes, [])
+
+    def test_process_fetched_rss_feed(self) -> None:
+        """Verify a fetched feed is parsed and converted into plain tuples with stage timings
+        """
+        processed_rss_feed: ProcessedRSSFeed = FeedParserRSSFeedLoader._process_fetched_rss_feed( #pylint: disable=protected-access
+            FetchedRSSFeed(b'<rss><channel><title>Feed</title><ttl>5</ttl><item><title>A</title>'
+                b'<link>http://a.lnk</link><description>&lt;b&gt;B&lt;/b&gt;</description>'
+                b'</item></channel></rss>'), True, True, True)
+        self.assertEqual(processed_rss_feed.channel, ('Feed', 'No description', 'No link'))
+        self.assertEqual(processed_rss_feed.items, [('A', '**B**', 'http://a.lnk')])
+        self.assertEqual(processed_rss_feed.item_keys.identities, [['link:http://a.lnk']])
+        self.assertEqual([identity for identity, _ in processed_rss_feed.item_keys.fingerprints],
+            ['link:http://a.lnk'])
+        self.assertEqual(processed_rss_feed.item_keys.timestamps, [None])
+        self.assertEqual(processed_rss_feed.refresh_interval, 300)
+        self.assertEqual(list(processed_rss_feed.seconds), ['parse', 'html2text', 'model'])
+
+    def test_load_rss_feed_in_process_pool(self) -> None:
+        """Verify a feed parsed and converted in a process pool loads as it does in a thread,
+        with seen items dropped and stages reported to hooks
+        """
+        content: bytes = generate_feed(3, description_size=20, html_density=0.5)
+        seen_index: SeenItemIndex = SeenItemIndex(':memory:')
+        seen_index.check_and_add(['link:http://example.com/feed/0'])
+        pipeline_stats: PipelineStats = PipelineStats()
+        feedloader: FeedParserRSSFeedLoader = FeedParserRSSFeedLoader('http://feed.lnk')
+        feedloader._fetch_rss_feed_by_url = lambda url, etag=None, modified=None: FetchedRSSFeed( #pylint: disable=protected-access
+            content, 200)
+        feedloader.load_rss_feed()
+        with ProcessPoolExecutor(max_workers=1) as parse_executor:
+            process_feedloader: FeedParserRSSFeedLoader = FeedParserRSSFeedLoader(
+                'http://feed.lnk', hooks=pipeline_stats, seen_index=seen_index,
+                parse_executor=parse_executor)
+            process_feedloader._fetch_rss_feed_by_url = feedloader._fetch_rss_feed_by_url #pylint: disable=protected-access
+            process_feedloader.load_rss_feed()
+        expected_result: RSSFeedChannel = feedloader.get_rss_feed_channel()
+        expected_result.items = list(expected_result.items)[1:]
+        self.assertEqual(process_feedloader.get_rss_feed_channel(), expected_result)
+        self.assertEqual(set(pipeline_stats.to_dict()['feeds']['http://feed.lnk']['seconds']),
+            {'fetch', 'parse', 'html2text', 'model'})
+        seen_index.close()
+
+    def test_load_rss_feed_reports_stages(self) -> None:
+        """Verify each loading stage and the loaded feed are reported to hooks
+        """
+        reported: list = []
+        class MockPipelineHooks:
+            """Mock implementation of the PipelineHooks protocol recording calls"""
+            @staticmethod
+            def on_stage(url: str, stage: str, seconds: float) -> None:
+                """Record completed stage"""
+                reported.append((url, stage, seconds >= 0))
+            @staticmethod
+            def on_feed_loaded(url: str, item_count: int, downloaded_bytes: int,
+            cache_outcome: Any) -> None:
+                """Record loaded feed"""
+                reported.append((url, item_count, downloaded_bytes, cache_outcome))
+        feedloader: FeedParserRSSFeedLoader = FeedParserRSSFeedLoader(
+            'http://feed.lnk', hooks=MockPipelineHooks())
+        feedloader._fetch_rss_feed_by_url = lambda url, etag=None, modified=None: FetchedRSSFeed( #pylint: disable=protected-access
+            b'<rss><channel><item><title>A</title></item></channel></rss>', 200, {}, 10)
+        feedloader.load_rss_feed()
+        self.assertEqual(reported, [
+            ('http://feed.lnk', 'fetch', True),
+            ('http://feed.lnk', 'parse', True),
+            ('http://feed.lnk', 'html2text', True),
+            ('http://feed.lnk', 'model', True),
+            ('http://feed.lnk', 1, 10, None)
+        ])
+
+    def test_get_refresh_interval(self) -> None:
+        """Verify the longest refresh hint of the feed and its HTTP headers is used
+        """
+        self.assertIsNone(_get_refresh_interval({}, {}))
+        self.assertIsNone(_get_refresh_interval({'ttl': 'soon', 'sy_updateperiod': 'never'}, {}))
+        self.assertEqual(_get_refresh_interval({'ttl': '30'}, {}), 1800)
+        self.assertEqual(_get_refresh_interval(
+            {'sy_updateperiod': 'hourly', 'sy_updatefrequency': '2'}, {}), 1800)
+        self.assertEqual(_get_refresh_interval(
+            {'sy_updateperiod': 'Daily', 'sy_updatefrequency': 'x'}, {}), 86400)
+        self.assertEqual(_get_refresh_interval(
+            {'ttl': '1'}, {'cache-control': 'public, max-age=600'}), 600)
+        self.assertEqual(_get_refresh_interval({}, {
+            'date': 'Mon, 01 Jan 2024 00:00:00 GMT',
+            'expires': 'Mon, 01 Jan 2024 01:00:00 GMT'}), 3600)
+        self.assertIsNone(_get_refresh_interval({}, {'date': 'x', 'expires': 'y'}))
+
+    def test_has_failed(self) -> None:
+        """Verify HTTP feeds that were not served are reported as failed, with the reason
+        """
+        feedloader: FeedParserRSSFeedLoader = FeedParserRSSFeedLoader('http://feed.lnk')
+        self.assertTrue(feedloader.has_failed())
+        self.assertEqual(feedloader.get_error(), 'Feed could not be loaded: server not reachable')
+        feedloader.status = 200
+        self.assertFalse(feedloader.has_failed())
+        self.assertIsNone(feedloader.get_error())
+        feedloader.status = 500
+        self.assertTrue(feedloader.has_failed())
+        self.assertEqual(feedloader.get_error(), 'Feed could not be loaded: HTTP status 500')
+        self.assertFalse(FeedParserRSSFeedLoader('testing').has_failed())
+
+    def test_fetch_rss_feed_by_url(self) -> None:
+        """Verify feeds are fetched over HTTP with validators, including 304 Not Modified
+        and servers that cannot be reached
+        """
+        with FeedFixtureServer() as server:
+            url: str = server.add_feed('/feed', b'<rss/>')
+            actual_result: FetchedRSSFeed = FeedParserRSSFeedLoader._fetch_rss_feed_by_url( #pylint: disable=protected-access
+                url, etag='"etag"', modified='Mon, 01 Jan 2024 00:00:00 GMT')
+            self.assertEqual(actual_result.status, 200)
+            self.assertEqual(actual_result.headers['content-location'], url)
+            missing_result: FetchedRSSFeed = FeedParserRSSFeedLoader._fetch_rss_feed_by_url( #pylint: disable=protected-access
+                url + '/missing')
+            self.assertEqual(missing_result.status, 404)
+        unreachable_result: FetchedRSSFeed = FeedParserRSSFeedLoader._fetch_rss_feed_by_url( #pylint: disable=protected-access
+            url)
+        self.assertEqual(unreachable_result, FetchedRSSFeed(b''))
+
+def _load_rss_feed_from_text(feed_text: str) -> StreamingRSSFeedLoader:
+    """Returns a StreamingRSSFeedLoader that loaded feed_text from a temporary file, with
+    the items of its channel read into a list
+    """
+    with tempfile.TemporaryDirectory() as feed_dir:
+        feed_path: str = os.path.join(feed_dir, 'feed.xml')
+        with open(feed_path, mode='w', encoding='utf-8') as feed_file:
+            feed_file.write(feed_text)
+        feedloader: StreamingRSSFeedLoader = StreamingRSSFeedLoader(feed_path)
+        feedloader.load_rss_feed()
+        rss_feed_channel: RSSFeedChannel = feedloader.get_rss_feed_channel()
+        rss_feed_channel.items = list(rss_feed_channel.items)
+    return feedloader
+
+class _BrokenOffStream(io.BytesIO):
+    """Binary stream of content whose download breaks off at its end"""
+    def read(self, size: Optional[int]=-1) -> bytes:
+        """Returns the next content, failing once all was read"""
+        content: bytes = super().read(size)
+        if not content:
+            raise TimeoutError('timed out')
+        return content
+
+class TestStreamingRSSFeedLoader(unittest.TestCase):
+    """Tests for class StreamingRSSFeedLoader
+    """
+
+    def test_load_rss_feed(self) -> None:
+        """Verify channel and items of an RSS 2.0 feed are read, ignoring nested image fields
+        """
+        actual_result: RSSFeedChannel = _load_rss_feed_from_text(
+            '<rss><channel><image><title>Logo</title></image>'
+            '<title> Some feed title </title><link>http://somefeedlink.lnk</link>'
+            '<description>&lt;p&gt;Some feed description here.&lt;/p&gt;</description>'
+            '<item><title>First</title><link>http://first.lnk</link>'
+            '<description>&lt;b&gt;One&lt;/b&gt;</description></item>'
+            '<item><title>Second</title></item></channel></rss>').get_rss_feed_channel()
+        expected_result: RSSFeedChannel = RSSFeedChannel(
+            title='Some feed title',
+            description='Some feed description here.',
+            link='http://somefeedlink.lnk',
+            items=[RSSFeedItem('First', '**One**', 'http://first.lnk'),
+                RSSFeedItem('Second', 'No description', 'No link')]
+        )
+        self.assertEqual(actual_result, expected_result)
+
+    def test_load_atom_feed(self) -> None:
+        """Verify channel and entries of an Atom feed are read, including XHTML content
+        """
+        actual_result: RSSFeedChannel = _load_rss_feed_from_text(
+            '<feed xmlns="http://www.w3.org/2005/Atom"><title>Atom title</title>'
+            '<link rel="self" href="http://self.lnk"/><link href="http://atom.lnk"/>'
+            '<subtitle>Atom subtitle</subtitle>'
+            '<entry><title>Entry</title><link href="http://entry.lnk"/>'
+            '<content type="xhtml"><div xmlns="http://www.w3.org/1999/xhtml">Body</div>'
+            '</content></entry></feed>').get_rss_feed_channel()
+        expected_result: RSSFeedChannel = RSSFeedChannel(
+            title='Atom title',
+            description='Atom subtitle',
+            link='http://atom.lnk',
+            items=[RSSFeedItem('Entry', 'Body', 'http://entry.lnk')]
+        )
+        self.assertEqual(actual_result, expected_result)
+
+    def test_load_generated_feeds(self) -> None:
+        """Verify generated RSS and Atom feeds load with all items, and the requested
+        share of descriptions marked up
+        """
+        feed_format: str
+        for feed_format in ('rss', 'atom'):
+            actual_result: RSSFeedChannel = _load_rss_feed_from_text(generate_feed(4, feed_format,
+                description_size=20, html_density=0.5).decode('utf-8')).get_rss_feed_channel()
+            self.assertEqual(actual_result.title, 'Feed feed')
+            self.assertEqual([item.description[:9] for item in actual_result.items],
+                ['Story **0', 'Story **1', 'Story 2 w', 'Story 3 w'])
+
+    def test_load_rss_feed_over_http(self) -> None:
+        """Verify a feed is requested from an HTTP server by load_rss_feed, following the
+        fetch policy, while its items are read as they are downloaded afterwards, the
+        connection being kept for reuse once they are all read, and a missing feed fails
+        """
+        fetch_policy: FetchPolicy = FetchPolicy(retries=0,
+            circuit_breaker=CircuitBreaker(':memory:', failure_threshold=1))
+        http_client: PooledHTTPClient = PooledHTTPClient()
+        with FeedFixtureServer(compress=True) as server, mock.patch(
+            'feedloaders.http_client', http_client):
+            feed_url: str = server.add_feed('/feed', generate_feed(3))
+            feedloader: StreamingRSSFeedLoader = StreamingRSSFeedLoader(
+                feed_url, fetch_policy=fetch_policy)
+            feedloader.load_rss_feed()
+            self.assertEqual(http_client.idle_connections, {})
+            actual_result: list[RSSFeedItem] = list(feedloader.get_rss_feed_channel().items)
+            self.assertEqual(len(http_client.idle_connections[('http', '127.0.0.1',
+                server.http_server.server_port)]), 1)
+            missing_feedloader: StreamingRSSFeedLoader = StreamingRSSFeedLoader(
+                feed_url.replace('/feed', '/missing'), fetch_policy=fetch_policy)
+            missing_feedloader.load_rss_feed()
+            with self.assertRaises(CircuitOpenError):
+                missing_feedloader.load_rss_feed()
+        http_client.close()
+        self.assertEqual([item.title for item in actual_result], ['Item 0', 'Item 1', 'Item 2'])
+        self.assertFalse(feedloader.has_failed())
+        self.assertEqual(missing_feedloader.get_error(), 'Feed could not be read: HTTP status 404')
+        fetch_policy.close()
+        unreachable_feedloader: StreamingRSSFeedLoader = StreamingRSSFeedLoader(
+            'http://127.0.0.1:1/feed')
+        unreachable_feedloader.load_rss_feed()
+        self.assertEqual(unreachable_feedloader.get_error(),
+            'Feed could not be read: server not reachable')
+
+    def test_load_malformed_feed(self) -> None:
+        """Verify items read before an XML syntax error are kept and the error is reported
+        once items were read
+        """
+        feedloader: StreamingRSSFeedLoader = _load_rss_feed_from_text(
+            '<rss><channel><title>T</title><item><title>Kept</title></item><item><oops></rss>')
+        self.assertEqual(feedloader.get_rss_feed_channel().items,
+            [RSSFeedItem('Kept', 'No description', 'No link')])
+        self.assertTrue(feedloader.has_failed())
+        self.assertIn('mismatched tag', feedloader.get_error())
+        self.assertIn('not well-formed XML', feedloader.get_error())
+        self.assertFalse(_load_rss_feed_from_text(
+            '<rss><channel><title>Fine</title></channel></rss>').has_failed())
+
+    def test_load_feed_broken_off(self) -> None:
+        """Verify items read before the download of a feed breaks off are kept and the error
+        is reported once items were read
+        """
+        feedloader: StreamingRSSFeedLoader = StreamingRSSFeedLoader('http://feed.lnk')
+        feedloader._open_rss_feed = lambda: _BrokenOffStream( #pylint: disable=protected-access
+            b'<rss><channel><title>T</title><item><title>Kept</title></item><item>')
+        feedloader.load_rss_feed()
+        self.assertEqual(list(feedloader.get_rss_feed_channel().items),
+            [RSSFeedItem('Kept', 'No description', 'No link')])
+        self.assertEqual(feedloader.get_error(), 'Feed could not be read completely, items '
+            'after the error are missing: timed out')
+
+    def test_load_feed_without_items(self) -> None:
+        """Verify a feed without items has its channel fields read
+        """
+        actual_result: RSSFeedChannel = _load_rss_feed_from_text(
+            '<rss><channel><title>Empty</title></channel></rss>').get_rss_feed_channel()
+        self.assertEqual(actual_result.title, 'Empty')
+        self.assertEqual(actual_result.items, [])
+
+    def test_load_missing_feed(self) -> None:
+        """Verify a feed that cannot be opened gives an empty channel
+        """
+        feedloader: StreamingRSSFeedLoader = StreamingRSSFeedLoader('')
+        feedloader.load_rss_feed()
+        expected_result: RSSFeedChannel = RSSFeedChannel(
+            'No title', 'No description', 'No link', list[RSSFeedItem]())
+        self.assertEqual(feedloader.get_rss_feed_channel(), expected_result)
+        self.assertTrue(feedloader.has_failed())
@@ -0,0 +1,201 @@
+"""feedpool: load many RSS feeds concurrently on a bounded pool of worker threads
+"""
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from threading import Condition, Event
+from time import monotonic
+from typing import Callable, Deque, Iterable, Iterator, Optional
+from urllib.parse import urlsplit
+from model import RSSFeedChannel, RSSFeedItem
+from rssfeedloader import RSSFeedLoader
+from fetchpolicy import holding_host_slot
+
+DEFAULT_MAX_WORKERS: int = 8
+DEFAULT_MAX_CONNECTIONS_PER_HOST: int = 2
+
+def _get_host(url: str) -> str:
+    """Return the lower case host name of url, or an empty string if it has none
+    """
+    return (urlsplit(url).hostname or '').lower()
+
+class UnavailableRSSFeedLoader:
+    """Implements the RSSFeedLoader protocol for a feed that could not be loaded,
+    so it is still rendered in its place in the output
+    """
+    def __init__(self, url: str, reason: str) -> None:
+        """Build an instance of UnavailableRSSFeedLoader
+        """
+        self.url: str = url
+        self.rss_feed_channel: RSSFeedChannel = RSSFeedChannel(
+            'No title', reason, url, list[RSSFeedItem]())
+
+    @staticmethod
+    def load_rss_feed() -> None:
+        """Nothing to load, the feed is unavailable"""
+        return None
+
+    def get_rss_feed_channel(self) -> RSSFeedChannel:
+        """Returns RSS feed channel content as an instance of RSSFeedChannel"""
+        return self.rss_feed_channel
+
+class _FeedLoadTask: # pylint: disable=too-few-public-methods
+    """Book-keeping for one feed submitted to the pool
+    """
+    def __init__(self, url: str, feedloader: RSSFeedLoader) -> None:
+        self.url: str = url
+        self.feedloader: RSSFeedLoader = feedloader
+        self.started: Event = Event()
+        self.started_at: float = 0.0
+        self.future: Future[RSSFeedLoader] = Future()
+
+class _HostScheduler:
+    """Runs feed loads on executor, at most max_loads_per_host of them against the same
+    host at once. Loads of a busy host wait here until one of its loads ends, rather than
+    in a worker thread, so they do not hold workers that feeds of other hosts could use.
+    A load waiting to retry a fetch gives up its slot meanwhile, and gets a slot back
+    before loads that have not started.
+    """
+    def __init__(self, executor: Executor, max_loads_per_host: int,
+    run: Callable[[_FeedLoadTask], RSSFeedLoader]) -> None:
+        """Build a _HostScheduler running tasks with run
+        """
+        self.executor: Executor = executor
+        self.max_loads_per_host: int = max_loads_per_host
+        self.run: Callable[[_FeedLoadTask], RSSFeedLoader] = run
+        self.condition: Condition = Condition()
+        self.running: dict[str, int] = {}
+        self.resuming: dict[str, int] = {}
+        self.waiting: dict[str, Deque[_FeedLoadTask]] = {}
+
+    def submit(self, task: _FeedLoadTask) -> None:
+        """Run task as soon as its host has fewer than max_loads_per_host loads running
+        """
+        host: str = _get_host(task.url)
+        with self.condition:
+            if self.running.get(host, 0) >= self.max_loads_per_host:
+                self.waiting.setdefault(host, deque()).append(task)
+                return
+            self.running[host] = self.running.get(host, 0) + 1
+        self.executor.submit(self._run_task, host, task)
+
+    def release(self, host: str) -> None:
+        """Give up a slot on host, starting the next task waiting for host unless loads
+        waiting to take a slot back need it
+        """
+        with self.condition:
+            self.running[host] -= 1
+            self.condition.notify_all()
+            waiting: Optional[Deque[_FeedLoadTask]] = self.waiting.get(host)
+            if not waiting or self.running[host] + self.resuming.get(host, 0) >= (
+                self.max_loads_per_host):
+                return
+            self.running[host] += 1
+            next_task: _FeedLoadTask = waiting.popleft()
+        self.executor.submit(self._run_task, host, next_task)
+
+    def acquire(self, host: str) -> None:
+        """Take a slot on host again, waiting until one is free
+        """
+        with self.condition:
+            self.resuming[host] = self.resuming.get(host, 0) + 1
+            while self.running[host] >= self.max_loads_per_host:
+                self.condition.wait()
+            self.resuming[host] -= 1
+            self.running[host] += 1
+
+    def _run_task(self, host: str, task: _FeedLoadTask) -> None:
+        """Run task unless it was cancelled, then give up its slot on host
+        """
+        try:
+            if task.future.set_running_or_notify_cancel():
+                try:
+                    with holding_host_slot(_HostSlot(self, host)):
+                        task.future.set_result(self.run(task))
+                except Exception as error: # pylint: disable=broad-except
+                    task.future.set_exception(error)
+        finally:
+            self.release(host)
+
+class _HostSlot:
+    """Implements the HostSlot protocol for the slot a load holds on its host
+    """
+    def __init__(self, host_scheduler: _HostScheduler, host: str) -> None:
+        self.host_scheduler: _HostScheduler = host_scheduler
+        self.host: str = host
+
+    def release(self) -> None:
+        """Give up the slot"""
+        self.host_scheduler.release(self.host)
+
+    def acquire(self) -> None:
+        """Take a slot again, waiting until one is free"""
+        self.host_scheduler.acquire(self.host)
+
+class FeedLoaderPool: # pylint: disable=too-few-public-methods
+    """Loads RSS feeds concurrently while keeping results in their original order.
+    At most max_workers feeds load at once, at most max_connections_per_host of them
+    against the same host, and a feed taking longer than timeout seconds is reported
+    as unavailable instead of holding back the feeds after it.
+    """
+    def __init__(self, feedloader_factory: Callable[[str], RSSFeedLoader],
+    max_workers: int=DEFAULT_MAX_WORKERS,
+    max_connections_per_host: int=DEFAULT_MAX_CONNECTIONS_PER_HOST,
+    timeout: Optional[float]=None) -> None:
+        """Build a FeedLoaderPool creating one RSSFeedLoader per URL with feedloader_factory
+        """
+        self.feedloader_factory: Callable[[str], RSSFeedLoader] = feedloader_factory
+        self.max_workers: int = max(1, max_workers)
+        self.max_connections_per_host: int = max(1, max_connections_per_host)
+        self.timeout: Optional[float] = timeout
+
+    @staticmethod
+    def _run_task(task: _FeedLoadTask) -> RSSFeedLoader:
+        """Load the feed of task, recording when loading started
+        """
+        task.started_at = monotonic()
+        task.started.set()
+        task.feedloader.load_rss_feed()
+        return task.feedloader
+
+    def _wait_for_task(self, task: _FeedLoadTask) -> tuple[str, RSSFeedLoader]:
+        """Returns the URL and loaded RSSFeedLoader of task, or an UnavailableRSSFeedLoader
+        if it failed or did not finish within the timeout measured from when loading started
+        """
+        try:
+            if self.timeout is None:
+                return task.url, task.future.result()
+            while not task.started.wait(self.timeout) and not task.future.done():
+                pass
+            remaining: float = task.started_at + self.timeout - monotonic()
+            return task.url, task.future.result(timeout=max(0.0, remaining))
+        except FutureTimeoutError:
+            task.future.cancel()
+            return task.url, UnavailableRSSFeedLoader(
+                task.url, f'Feed was not loaded within {self.timeout} seconds')
+        except Exception as error: # pylint: disable=broad-except
+            return task.url, UnavailableRSSFeedLoader(
+                task.url, f'Feed could not be loaded: {error}')
+
+    def load_rss_feeds(self,
+    rss_feed_urls: Iterable[str]) -> Iterator[tuple[str, RSSFeedLoader]]:
+        """Yields each URL in rss_feed_urls with its loaded RSSFeedLoader, in the same order.
+        URLs are consumed lazily so only a bounded window of feeds is in flight at once.
+        """
+        window: Deque[_FeedLoadTask] = deque()
+        executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=self.max_workers)
+        host_scheduler: _HostScheduler = _HostScheduler(
+            executor, self.max_connections_per_host, self._run_task)
+        try:
+            rss_feed_url: str
+            for rss_feed_url in rss_feed_urls:
+                task: _FeedLoadTask = _FeedLoadTask(
+                    rss_feed_url, self.feedloader_factory(rss_feed_url))
+                host_scheduler.submit(task)
+                window.append(task)
+                if len(window) >= 2 * self.max_workers:
+                    yield self._wait_for_task(window.popleft())
+            while window:
+                yield self._wait_for_task(window.popleft())
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
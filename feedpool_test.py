@@ -0,0 +1,178 @@
+"""Tests for module feedpool
+"""
+import unittest
+from threading import Event, Lock
+from time import sleep
+from types import SimpleNamespace
+from typing import Callable
+from model import RSSFeedChannel, RSSFeedItem
+from feedpool import FeedLoaderPool, UnavailableRSSFeedLoader, _get_host
+from fetchpolicy import FetchPolicy
+
+class MockRSSFeedLoader:
+    """Mock implementation of the RSSFeedLoader protocol recording how many loads
+    run at the same time. Used for testing purposes.
+    """
+    lock: Lock = Lock()
+    running: int = 0
+    max_running: int = 0
+
+    def __init__(self, url: str, delay: float=0.0) -> None:
+        self.url: str = url
+        self.delay: float = delay
+        self.rss_feed_channel: RSSFeedChannel = RSSFeedChannel('','','', list[RSSFeedItem]())
+
+    def load_rss_feed(self) -> None:
+        """Pretend to load the feed named by url"""
+        with MockRSSFeedLoader.lock:
+            MockRSSFeedLoader.running += 1
+            MockRSSFeedLoader.max_running = max(
+                MockRSSFeedLoader.max_running, MockRSSFeedLoader.running)
+        sleep(self.delay)
+        with MockRSSFeedLoader.lock:
+            MockRSSFeedLoader.running -= 1
+        if 'broken' in self.url:
+            raise ValueError('broken feed')
+        self.rss_feed_channel = RSSFeedChannel(self.url, '', self.url, list[RSSFeedItem]())
+
+    def get_rss_feed_channel(self) -> RSSFeedChannel:
+        """Returns RSS feed channel content as an instance of RSSFeedChannel"""
+        return self.rss_feed_channel
+
+class TestFeedLoaderPool(unittest.TestCase):
+    """Tests for module feedpool members including class FeedLoaderPool
+    """
+    def setUp(self) -> None:
+        MockRSSFeedLoader.running = 0
+        MockRSSFeedLoader.max_running = 0
+
+    def test_get_host(self) -> None:
+        """Verify host name is extracted from URL in lower case
+        """
+        self.assertEqual(_get_host('http://Example.COM:8080/feed'), 'example.com')
+        self.assertEqual(_get_host('testing'), '')
+
+    def test_load_rss_feeds_keeps_order(self) -> None:
+        """Verify feeds are yielded in the order given even when earlier feeds are slower
+        """
+        urls: list[str] = [f'http://host{index}.lnk/' for index in range(20)]
+        pool: FeedLoaderPool = FeedLoaderPool(
+            lambda url: MockRSSFeedLoader(url, 0.02 if url.endswith('0.lnk/') else 0.0),
+            max_workers=4)
+        actual_result: list[str] = [
+            feedloader.get_rss_feed_channel().title for _, feedloader in pool.load_rss_feeds(urls)]
+        self.assertEqual(actual_result, urls)
+
+    def test_load_rss_feeds_yields_urls(self) -> None:
+        """Verify each loaded feed is yielded together with its URL
+        """
+        pool: FeedLoaderPool = FeedLoaderPool(MockRSSFeedLoader)
+        actual_result: list[str] = [url for url, _ in pool.load_rss_feeds(['http://a.lnk'])]
+        self.assertEqual(actual_result, ['http://a.lnk'])
+
+    def test_load_rss_feeds_limits_connections_per_host(self) -> None:
+        """Verify no more than max_connections_per_host feeds load from one host at once
+        """
+        urls: list[str] = [f'http://samehost.lnk/{index}' for index in range(8)]
+        pool: FeedLoaderPool = FeedLoaderPool(
+            lambda url: MockRSSFeedLoader(url, 0.01), max_workers=8, max_connections_per_host=2)
+        self.assertEqual(len(list(pool.load_rss_feeds(urls))), 8)
+        self.assertEqual(MockRSSFeedLoader.max_running, 2)
+
+    def test_load_rss_feeds_busy_host_does_not_hold_workers(self) -> None:
+        """Verify feeds waiting for a busy host do not take the workers feeds of other
+        hosts need
+        """
+        started: list[str] = []
+        def factory(url: str) -> MockRSSFeedLoader:
+            feedloader: MockRSSFeedLoader = MockRSSFeedLoader(url, 0.05)
+            load_rss_feed: Callable[[], None] = feedloader.load_rss_feed
+            feedloader.load_rss_feed = lambda: started.append(url) or load_rss_feed() # type: ignore
+            return feedloader
+        urls: list[str] = [f'http://samehost.lnk/{index}' for index in range(3)]
+        pool: FeedLoaderPool = FeedLoaderPool(factory, max_workers=2, max_connections_per_host=1)
+        self.assertEqual(len(list(pool.load_rss_feeds([*urls, 'http://other.lnk']))), 4)
+        self.assertEqual(started[:2], ['http://samehost.lnk/0', 'http://other.lnk'])
+        self.assertEqual(MockRSSFeedLoader.max_running, 2)
+
+    def test_load_rss_feeds_retry_gives_up_host_slot(self) -> None:
+        """Verify a feed waiting to retry a fetch lets another feed of the same host load
+        meanwhile, with one connection per host, then retries before feeds not started yet
+        """
+        events: list[str] = []
+        other_loading: Event = Event()
+        statuses: list[int] = [503, 200]
+        def fetch_once() -> SimpleNamespace:
+            events.append('fetch 0')
+            return SimpleNamespace(status=statuses.pop(0), headers={})
+        def load_other() -> None:
+            events.append('load 1')
+            other_loading.set()
+            sleep(0.2)
+            events.append('loaded 1')
+        fetch_policy: FetchPolicy = FetchPolicy(retries=1,
+            wait=lambda seconds: events.append(f'waited {other_loading.wait(2)}'))
+        def factory(url: str) -> MockRSSFeedLoader:
+            feedloader: MockRSSFeedLoader = MockRSSFeedLoader(url)
+            if url.endswith('/0'):
+                feedloader.load_rss_feed = lambda: fetch_policy.fetch( # type: ignore
+                    url, fetch_once)
+            elif url.endswith('/1'):
+                feedloader.load_rss_feed = load_other # type: ignore
+            else:
+                feedloader.load_rss_feed = lambda: events.append('load 2') # type: ignore
+            return feedloader
+        urls: list[str] = [f'http://samehost.lnk/{index}' for index in range(3)]
+        pool: FeedLoaderPool = FeedLoaderPool(factory, max_workers=3, max_connections_per_host=1)
+        self.assertEqual(len(list(pool.load_rss_feeds(urls))), 3)
+        self.assertEqual(events,
+            ['fetch 0', 'load 1', 'waited True', 'loaded 1', 'fetch 0', 'load 2'])
+
+    def test_load_rss_feeds_reports_failed_feed(self) -> None:
+        """Verify a feed raising an error is replaced by an UnavailableRSSFeedLoader
+        """
+        pool: FeedLoaderPool = FeedLoaderPool(MockRSSFeedLoader)
+        urls: list[str] = ['http://broken.lnk', 'http://ok.lnk']
+        feedloaders: list = [feedloader for _, feedloader in pool.load_rss_feeds(urls)]
+        self.assertIsInstance(feedloaders[0], UnavailableRSSFeedLoader)
+        self.assertIn('broken feed', feedloaders[0].get_rss_feed_channel().description)
+        self.assertEqual(feedloaders[1].get_rss_feed_channel().title, 'http://ok.lnk')
+
+    def test_load_rss_feeds_timeout_does_not_stall_others(self) -> None:
+        """Verify a feed exceeding the timeout is reported unavailable and the feeds
+        after it are still returned
+        """
+        release: Event = Event()
+        def factory(url: str) -> MockRSSFeedLoader:
+            feedloader: MockRSSFeedLoader = MockRSSFeedLoader(url)
+            if 'slow' in url:
+                feedloader.load_rss_feed = lambda: release.wait(5) # type: ignore
+            return feedloader
+        pool: FeedLoaderPool = FeedLoaderPool(factory, max_workers=2, timeout=0.05)
+        urls: list[str] = ['http://slow.lnk', 'http://fast.lnk']
+        feedloaders: list = [feedloader for _, feedloader in pool.load_rss_feeds(urls)]
+        release.set()
+        self.assertIsInstance(feedloaders[0], UnavailableRSSFeedLoader)
+        self.assertEqual(feedloaders[0].get_rss_feed_channel().link, 'http://slow.lnk')
+        self.assertEqual(feedloaders[1].get_rss_feed_channel().title, 'http://fast.lnk')
+
+    def test_load_rss_feeds_timeout_excludes_waiting_for_host(self) -> None:
+        """Verify time spent waiting for a connection to the host does not count
+        towards the timeout
+        """
+        pool: FeedLoaderPool = FeedLoaderPool(
+            lambda url: MockRSSFeedLoader(url, 0.2 if 'slow' in url else 0.0),
+            max_workers=2, max_connections_per_host=1, timeout=0.05)
+        urls: list[str] = ['http://samehost.lnk/slow', 'http://samehost.lnk/fast']
+        feedloaders: list = [feedloader for _, feedloader in pool.load_rss_feeds(urls)]
+        self.assertIsInstance(feedloaders[0], UnavailableRSSFeedLoader)
+        self.assertEqual(feedloaders[1].get_rss_feed_channel().title, 'http://samehost.lnk/fast')
+
+    def test_unavailable_rss_feed_loader(self) -> None:
+        """Verify UnavailableRSSFeedLoader renders as an empty channel with the reason
+        """
+        feedloader: UnavailableRSSFeedLoader = UnavailableRSSFeedLoader('http://a.lnk', 'gone')
+        feedloader.load_rss_feed()
+        expected_result: RSSFeedChannel = RSSFeedChannel(
+            'No title', 'gone', 'http://a.lnk', list[RSSFeedItem]())
+        self.assertEqual(feedloader.get_rss_feed_channel(), expected_result)
@@ -0,0 +1,255 @@
+"""feedqueue: queue of feed URLs shared by several reader processes or hosts, each claiming
+due feeds with a lease, and feeds sharded by host across live workers with a consistent
+hash ring, so a host is only fetched by one worker at a time and per-host limits hold
+"""
+from bisect import bisect
+from contextlib import contextmanager
+from dataclasses import dataclass
+from hashlib import blake2b
+from time import time
+from typing import Callable, Iterable, Iterator, Optional, Protocol
+from urllib.parse import urlsplit
+from sqlitestore import SQLiteStore
+
+DEFAULT_LEASE_SECONDS: float = 5 * 60
+DEFAULT_WORKER_TIMEOUT: float = 2 * 60
+DEFAULT_REPLICAS: int = 64
+
+@dataclass
+class FeedLease:
+    """ A feed claimed by a worker, for it alone to load until expires, and the number of
+    times it was claimed since it was last loaded """
+    url: str
+    expires: float
+    attempts: int
+
+class FeedQueue(Protocol):
+    """Protocol for which all queues of feeds shared by workers will follow. A worker
+    claims due feeds, loads them and completes each with the time it is due again, or
+    releases it to be retried. A feed whose lease expired may be claimed by another worker.
+    """
+    def add_rss_feed_urls(self, urls: Iterable[str]) -> int:
+        """Queue feeds not queued yet, due straight away. Returns number of feeds added."""
+
+    def claim(self, limit: int) -> list[FeedLease]:
+        """Returns leases on up to limit due feeds of this worker's shard"""
+
+    def renew(self, urls: list[str]) -> int:
+        """Extend the leases on claimed feeds still loading. Returns number of leases renewed"""
+
+    def complete(self, url: str, next_due: float) -> bool:
+        """Release a claimed feed, due again at next_due. Returns False if the lease was lost"""
+
+    def release(self, url: str, retry_at: float) -> bool:
+        """Release a claimed feed that failed, to be retried from retry_at. Returns False if
+        the lease was lost"""
+
+    def count_due_feeds(self) -> int:
+        """Returns number of feeds due, of any shard, including feeds being loaded"""
+
+def _get_hash(key: str) -> int:
+    """Return a 64 bit hash of key, the same in every process"""
+    return int.from_bytes(blake2b(key.encode('utf-8', 'surrogatepass'), digest_size=8).digest(),
+        'big')
+
+class HashRing: # pylint: disable=too-few-public-methods
+    """Consistent hash ring placing every node at replicas points, so a key belongs to the
+    node at the first point after its hash and only about 1/n of keys move to another node
+    when one of n nodes joins or leaves
+    """
+    def __init__(self, nodes: Iterable[str], replicas: int=DEFAULT_REPLICAS) -> None:
+        """Build a HashRing of nodes
+        """
+        points: list[tuple[int, str]] = sorted(
+            (_get_hash(f'{node}#{replica}'), node)
+            for node in set(nodes) for replica in range(replicas))
+        self.hashes: list[int] = [point_hash for point_hash, _ in points]
+        self.nodes: list[str] = [node for _, node in points]
+
+    def get_node(self, key: str) -> Optional[str]:
+        """Returns the node key belongs to, or None if the ring has no nodes
+        """
+        if not self.nodes:
+            return None
+        return self.nodes[bisect(self.hashes, _get_hash(key)) % len(self.nodes)]
+
+class SQLiteFeedQueue(SQLiteStore): # pylint: disable=too-many-instance-attributes
+    """Implements the FeedQueue protocol with a SQLite database shared by all workers, for
+    processes on one host or hosts sharing a file system with working locks. Claims are
+    made in a write transaction, so two workers never claim the same feed. Every claim also
+    records that the worker is alive; workers not heard from for worker_timeout seconds
+    leave the ring, and feeds of a host leased by another worker are not claimed until the
+    lease ends, so a host changing shard is not fetched by two workers at once.
+    """
+    def __init__(self, path: str, worker_id: str, # pylint: disable=too-many-arguments
+    lease_seconds: float=DEFAULT_LEASE_SECONDS, worker_timeout: float=DEFAULT_WORKER_TIMEOUT,
+    now: Callable[[], float]=time) -> None:
+        """Build a SQLiteFeedQueue stored in the SQLite database file at path, claiming feeds
+        for worker_id. Optional parameter now replaces the system clock.
+        """
+        # transactions are begun explicitly, so claims take the write lock before reading
+        super().__init__(path, '''
+            BEGIN IMMEDIATE;
+            CREATE TABLE IF NOT EXISTS feed_queue (
+                url TEXT PRIMARY KEY, host TEXT NOT NULL, due_at REAL NOT NULL,
+                lease_owner TEXT, lease_expires REAL NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0);
+            CREATE INDEX IF NOT EXISTS feed_queue_due_at ON feed_queue (due_at);
+            CREATE INDEX IF NOT EXISTS feed_queue_lease_expires ON feed_queue (lease_expires);
+            CREATE TABLE IF NOT EXISTS queue_workers (
+                worker_id TEXT PRIMARY KEY, heartbeat_at REAL NOT NULL);
+            COMMIT;
+        ''', timeout=30, isolation_level=None)
+        self.worker_id: str = worker_id
+        self.lease_seconds: float = lease_seconds
+        self.worker_timeout: float = worker_timeout
+        self.now: Callable[[], float] = now
+        self.claimed: int = 0
+        self.completed: int = 0
+        self.released: int = 0
+        self.lost: int = 0
+
+    @contextmanager
+    def _write_transaction(self) -> Iterator[None]:
+        """Runs the enclosed statements in a transaction holding the write lock of the
+        database from the start, rolled back if an error is raised
+        """
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        self.connection.execute('COMMIT')
+
+    def add_rss_feed_urls(self, urls: Iterable[str]) -> int:
+        """Queue feeds not queued yet, due straight away. Returns number of feeds added.
+        urls are all read, and their hosts found, before the write lock is taken, so other
+        workers are not held up while they are read from files.
+        """
+        current_time: float = self.now()
+        rows: list[tuple[str, str, float]] = [
+            (url, (urlsplit(url).hostname or '').lower(), current_time) for url in urls]
+        with self.lock, self._write_transaction():
+            added: int = self.connection.executemany(
+                'INSERT OR IGNORE INTO feed_queue (url, host, due_at) VALUES (?, ?, ?)',
+                rows).rowcount
+        return max(0, added)
+
+    def _get_live_workers(self, current_time: float) -> list[str]:
+        """Record this worker is alive, forget workers not heard from for worker_timeout
+        seconds and return the live ones, within a transaction
+        """
+        self.connection.execute('INSERT OR REPLACE INTO queue_workers VALUES (?, ?)',
+            (self.worker_id, current_time))
+        self.connection.execute('DELETE FROM queue_workers WHERE heartbeat_at < ?',
+            (current_time - self.worker_timeout,))
+        return [row[0] for row in self.connection.execute('SELECT worker_id FROM queue_workers')]
+
+    def claim(self, limit: int) -> list[FeedLease]:
+        """Returns leases on up to limit due feeds whose host belongs to this worker,
+        earliest due first. Due feeds are read a page at a time, as many as this worker
+        would claim if feeds were spread evenly across live workers, until limit feeds are
+        claimed, so a worker claiming a few feeds of a long queue reads few of them.
+        """
+        current_time: float = self.now()
+        leases: list[FeedLease] = []
+        with self.lock, self._write_transaction():
+            live_workers: list[str] = self._get_live_workers(current_time)
+            hash_ring: HashRing = HashRing(live_workers)
+            busy_hosts: set[str] = {row[0] for row in self.connection.execute(
+                'SELECT DISTINCT host FROM feed_queue '
+                'WHERE lease_expires > ? AND lease_owner != ?', (current_time, self.worker_id))}
+            page_size: int = max(1, limit * len(live_workers))
+            last_due_at: float = float('-inf')
+            last_rowid: int = 0
+            while len(leases) < limit:
+                rows: list[tuple[int, float, str, str, int]] = self.connection.execute(
+                    'SELECT rowid, due_at, url, host, attempts FROM feed_queue '
+                    'WHERE due_at <= ? AND lease_expires <= ? AND (due_at, rowid) > (?, ?) '
+                    'ORDER BY due_at, rowid LIMIT ?',
+                    (current_time, current_time, last_due_at, last_rowid, page_size)).fetchall()
+                url: str
+                host: str
+                attempts: int
+                for last_rowid, last_due_at, url, host, attempts in rows:
+                    if host not in busy_hosts and hash_ring.get_node(host) == self.worker_id:
+                        leases.append(
+                            FeedLease(url, current_time + self.lease_seconds, attempts + 1))
+                        if len(leases) >= limit:
+                            break
+                if len(rows) < page_size:
+                    break
+            self.connection.executemany(
+                'UPDATE feed_queue SET lease_owner = ?, lease_expires = ?, attempts = ? '
+                'WHERE url = ?',
+                [(self.worker_id, lease.expires, lease.attempts, lease.url) for lease in leases])
+            self.claimed += len(leases)
+        return leases
+
+    def renew(self, urls: list[str]) -> int:
+        """Extend the leases this worker still holds on the feeds at urls to lease_seconds
+        from now, and record this worker is alive. Returns number of leases renewed
+        """
+        current_time: float = self.now()
+        with self.lock, self._write_transaction():
+            self._get_live_workers(current_time)
+            renewed: int = self.connection.executemany(
+                'UPDATE feed_queue SET lease_expires = ? '
+                'WHERE url = ? AND lease_owner = ? AND lease_expires > ?',
+                [(current_time + self.lease_seconds, url, self.worker_id, current_time)
+                    for url in urls]).rowcount
+        return max(0, renewed)
+
+    def _end_lease(self, url: str, due_at: float, succeeded: bool) -> bool:
+        """Make the feed at url due at due_at, forgetting its attempts if loading succeeded,
+        provided this worker still holds its lease
+        """
+        with self.lock, self._write_transaction():
+            ended: bool = self.connection.execute(
+                'UPDATE feed_queue SET due_at = ?, lease_owner = NULL, lease_expires = 0, '
+                'attempts = CASE WHEN ? THEN 0 ELSE attempts END '
+                'WHERE url = ? AND lease_owner = ? AND lease_expires > ?',
+                (due_at, succeeded, url, self.worker_id, self.now())).rowcount > 0
+            if not ended:
+                self.lost += 1
+            elif succeeded:
+                self.completed += 1
+            else:
+                self.released += 1
+        return ended
+
+    def complete(self, url: str, next_due: float) -> bool:
+        """Release a claimed feed, due again at next_due. Returns False if the lease was lost,
+        because it expired and the feed may have been claimed by another worker
+        """
+        return self._end_lease(url, next_due, True)
+
+    def release(self, url: str, retry_at: float) -> bool:
+        """Release a claimed feed that failed, to be retried from retry_at. Returns False if
+        the lease was lost
+        """
+        return self._end_lease(url, retry_at, False)
+
+    def count_due_feeds(self) -> int:
+        """Returns number of feeds due, of any shard, including feeds being loaded
+        """
+        with self.lock:
+            return self.connection.execute('SELECT COUNT(*) FROM feed_queue WHERE due_at <= ?',
+                (self.now(),)).fetchone()[0]
+
+    def get_statistics(self) -> dict[str, int]:
+        """Returns counters of feeds claimed, completed, released and whose lease was lost
+        by this worker, and the number of feeds queued
+        """
+        with self.lock:
+            queued: int = self.connection.execute('SELECT COUNT(*) FROM feed_queue').fetchone()[0]
+            return {'claimed': self.claimed, 'completed': self.completed,
+                'released': self.released, 'lost': self.lost, 'queued': queued}
+
+    def close(self) -> None:
+        """Forget this worker, so its hosts move to other workers, and close the database"""
+        with self.lock:
+            self.connection.execute('DELETE FROM queue_workers WHERE worker_id = ?',
+                (self.worker_id,))
+        super().close()
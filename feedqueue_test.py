@@ -0,0 +1,157 @@
+"""Tests for module feedqueue
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from feedqueue import FeedLease, HashRing, SQLiteFeedQueue
+
+class TestFeedQueue(unittest.TestCase):
+    """Tests for module feedqueue members including classes HashRing and SQLiteFeedQueue
+    """
+    def setUp(self) -> None:
+        self.now: float = 1000.0
+        self.queue_dir: str = tempfile.mkdtemp()
+        self.path: str = os.path.join(self.queue_dir, 'queue.db')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.queue_dir)
+
+    def _open_queue(self, worker_id: str, lease_seconds: float=60) -> SQLiteFeedQueue:
+        """Returns a SQLiteFeedQueue for worker_id on the shared file, using the test clock
+        """
+        return SQLiteFeedQueue(self.path, worker_id, lease_seconds=lease_seconds,
+            worker_timeout=120, now=lambda: self.now)
+
+    def test_hash_ring(self) -> None:
+        """Verify keys are spread across nodes and only keys of a node leaving the ring move
+        """
+        keys: list[str] = [f'host{index}.lnk' for index in range(300)]
+        hash_ring: HashRing = HashRing(['a', 'b', 'c'])
+        nodes: dict[str, str] = {key: hash_ring.get_node(key) for key in keys}
+        self.assertEqual(set(nodes.values()), {'a', 'b', 'c'})
+        self.assertGreater(min(list(nodes.values()).count(node) for node in 'abc'), 50)
+        smaller_ring: HashRing = HashRing(['a', 'b'])
+        self.assertTrue(all(smaller_ring.get_node(key) == node
+            for key, node in nodes.items() if node != 'c'))
+        self.assertIsNone(HashRing([]).get_node('host.lnk'))
+
+    def test_claim_complete_release(self) -> None:
+        """Verify due feeds are claimed once until completed or released, and are due again
+        at the time given
+        """
+        feed_queue: SQLiteFeedQueue = self._open_queue('a')
+        self.assertEqual(feed_queue.add_rss_feed_urls(['http://a.lnk/1', 'http://b.lnk/1']), 2)
+        self.assertEqual(feed_queue.add_rss_feed_urls(['http://a.lnk/1']), 0)
+        with self.assertRaises(AttributeError):
+            feed_queue.add_rss_feed_urls(['http://c.lnk/1', 42])
+        with self.assertRaises(ValueError), feed_queue._write_transaction(): #pylint: disable=protected-access
+            feed_queue.connection.execute(
+                "INSERT INTO feed_queue (url, host, due_at) VALUES ('http://c.lnk/1', 'c.lnk', 0)")
+            raise ValueError('rolled back')
+        leases: list[FeedLease] = feed_queue.claim(1)
+        self.assertEqual(leases, [FeedLease('http://a.lnk/1', 1060, 1)])
+        self.assertEqual([lease.url for lease in feed_queue.claim(5)], ['http://b.lnk/1'])
+        self.assertEqual(feed_queue.claim(5), [])
+        self.assertTrue(feed_queue.complete('http://a.lnk/1', 2000))
+        self.assertTrue(feed_queue.release('http://b.lnk/1', 1500))
+        self.now = 1500
+        self.assertEqual(feed_queue.claim(5), [FeedLease('http://b.lnk/1', 1560, 2)])
+        self.assertTrue(feed_queue.complete('http://b.lnk/1', 3000))
+        self.now = 2000
+        self.assertEqual(feed_queue.claim(5), [FeedLease('http://a.lnk/1', 2060, 1)])
+        self.assertEqual(feed_queue.get_statistics(),
+            {'claimed': 4, 'completed': 2, 'released': 1, 'lost': 0, 'queued': 2})
+        feed_queue.close()
+
+    def test_expired_lease_is_lost(self) -> None:
+        """Verify a feed whose lease expired may be claimed again, and the worker that held
+        the lease cannot complete it any more
+        """
+        feed_queue: SQLiteFeedQueue = self._open_queue('a')
+        feed_queue.add_rss_feed_urls(['http://a.lnk/1'])
+        feed_queue.claim(1)
+        self.now += 61
+        self.assertEqual(feed_queue.claim(1), [FeedLease('http://a.lnk/1', 1121, 2)])
+        self.now += 61
+        self.assertFalse(feed_queue.complete('http://a.lnk/1', 5000))
+        self.assertEqual(feed_queue.get_statistics()['lost'], 1)
+        feed_queue.close()
+
+    def test_feeds_sharded_by_host(self) -> None:
+        """Verify live workers sharing a queue claim disjoint shares of the feeds, all feeds
+        of a host going to the same worker, and that a worker not heard from leaves the ring
+        """
+        worker_a: SQLiteFeedQueue = self._open_queue('a')
+        worker_b: SQLiteFeedQueue = self._open_queue('b')
+        urls: list[str] = [f'http://host{host}.lnk/{path}'
+            for host in range(20) for path in range(3)]
+        worker_a.add_rss_feed_urls(urls)
+        worker_b.claim(0)
+        claimed_a: list[str] = [lease.url for lease in worker_a.claim(100)]
+        claimed_b: list[str] = [lease.url for lease in worker_b.claim(100)]
+        self.assertEqual(sorted(claimed_a + claimed_b), sorted(urls))
+        self.assertTrue(claimed_a and claimed_b)
+        hosts_a: set[str] = {url.split('/')[2] for url in claimed_a}
+        hosts_b: set[str] = {url.split('/')[2] for url in claimed_b}
+        self.assertFalse(hosts_a & hosts_b)
+        url: str
+        for url in claimed_a + claimed_b:
+            (worker_a if url in claimed_a else worker_b).complete(url, self.now + 1000)
+        self.now += 1000
+        worker_b.claim(0)
+        claimed_a = [lease.url for lease in worker_a.claim(100)]
+        self.assertEqual(len(claimed_a), len(hosts_a) * 3)
+        for url in claimed_a:
+            worker_a.complete(url, self.now + 1000)
+        self.now += 121
+        self.assertEqual(len(worker_a.claim(100)), len(claimed_b))
+        worker_a.close()
+        worker_b.close()
+
+    def test_claim_reads_further_pages(self) -> None:
+        """Verify a worker claiming one feed at a time reads past due feeds of other shards,
+        claiming all feeds of its shard earliest due first
+        """
+        worker_a: SQLiteFeedQueue = self._open_queue('a')
+        worker_b: SQLiteFeedQueue = self._open_queue('b')
+        urls: list[str] = [f'http://host{host}.lnk/' for host in range(20)]
+        worker_a.add_rss_feed_urls(urls)
+        worker_b.claim(0)
+        hash_ring: HashRing = HashRing(['a', 'b'])
+        claimed_a: list[str] = []
+        for _ in urls:
+            claimed_a.extend(lease.url for lease in worker_a.claim(1))
+        self.assertEqual(claimed_a,
+            [url for url in urls if hash_ring.get_node(url.split('/')[2]) == 'a'])
+        worker_a.close()
+        worker_b.close()
+
+    def test_renew(self) -> None:
+        """Verify a renewed lease is held lease_seconds longer, and a lease already lost is
+        not renewed
+        """
+        feed_queue: SQLiteFeedQueue = self._open_queue('a')
+        feed_queue.add_rss_feed_urls(['http://a.lnk/1', 'http://b.lnk/1'])
+        feed_queue.claim(2)
+        self.now += 50
+        self.assertEqual(feed_queue.renew(['http://a.lnk/1']), 1)
+        self.now += 50
+        self.assertEqual(feed_queue.renew(['http://a.lnk/1', 'http://b.lnk/1']), 1)
+        self.assertTrue(feed_queue.complete('http://a.lnk/1', 5000))
+        self.assertFalse(feed_queue.complete('http://b.lnk/1', 5000))
+        feed_queue.close()
+
+    def test_host_leased_by_other_worker_is_not_claimed(self) -> None:
+        """Verify feeds of a host leased by another worker are not claimed until its lease
+        ends, even once the host belongs to this worker
+        """
+        worker_a: SQLiteFeedQueue = self._open_queue('a')
+        worker_a.add_rss_feed_urls(['http://a.lnk/1', 'http://a.lnk/2'])
+        self.assertEqual(len(worker_a.claim(1)), 1)
+        worker_a.close()
+        worker_b: SQLiteFeedQueue = self._open_queue('b')
+        self.assertEqual(worker_b.claim(5), [])
+        self.now += 61
+        self.assertEqual(len(worker_b.claim(5)), 2)
+        worker_b.close()
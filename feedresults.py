@@ -0,0 +1,58 @@
+"""feedresults: persistent store of the latest content loaded for every feed, shared by
+the workers of a feed queue so the results of all of them can be read in one place
+"""
+import pickle
+from dataclasses import dataclass
+from time import time
+from typing import Optional
+from model import RSSFeedChannel
+from sqlitestore import SQLiteStore
+
+@dataclass
+class FeedResult:
+    """ Representation of the latest content loaded for a feed, by which worker and when """
+    rss_feed_channel: RSSFeedChannel
+    worker_id: str
+    loaded_at: float
+
+class FeedResultStore(SQLiteStore):
+    """SQLite backed store of the latest RSSFeedChannel loaded for every feed, keyed by feed
+    URL, which several worker processes may write to at once
+    """
+    def __init__(self, path: str) -> None:
+        """Build a FeedResultStore stored in the SQLite database file at path
+        """
+        super().__init__(path,
+            'CREATE TABLE IF NOT EXISTS feed_results ('
+            'url TEXT PRIMARY KEY, rss_feed_channel BLOB NOT NULL, '
+            'worker_id TEXT NOT NULL, loaded_at REAL NOT NULL)', timeout=30)
+        self.stored: int = 0
+
+    def put(self, url: str, rss_feed_channel: RSSFeedChannel, worker_id: str) -> None:
+        """Store the content just loaded for url by worker_id, replacing earlier content.
+        Items of rss_feed_channel must be a list, as an iterator cannot be stored.
+        """
+        data: bytes = pickle.dumps(rss_feed_channel, protocol=pickle.HIGHEST_PROTOCOL)
+        with self.lock, self.connection:
+            self.stored += 1
+            self.connection.execute('INSERT OR REPLACE INTO feed_results VALUES (?, ?, ?, ?)',
+                (url, data, worker_id, time()))
+
+    def get(self, url: str) -> Optional[FeedResult]:
+        """Returns the latest content stored for url, or None if it was never loaded
+        """
+        with self.lock:
+            row: Optional[tuple] = self.connection.execute(
+                'SELECT rss_feed_channel, worker_id, loaded_at FROM feed_results WHERE url = ?',
+                (url,)).fetchone()
+        if row is None:
+            return None
+        return FeedResult(pickle.loads(row[0]), row[1], row[2])
+
+    def get_statistics(self) -> dict[str, int]:
+        """Returns counters of results stored by this process and the current entry count
+        """
+        with self.lock:
+            entries: int = self.connection.execute(
+                'SELECT COUNT(*) FROM feed_results').fetchone()[0]
+            return {'stored': self.stored, 'entries': entries}
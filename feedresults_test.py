@@ -0,0 +1,31 @@
+"""Tests for module feedresults
+"""
+import os
+import tempfile
+import unittest
+from typing import Optional
+from model import RSSFeedChannel, RSSFeedItem
+from feedresults import FeedResult, FeedResultStore
+
+class TestFeedResults(unittest.TestCase):
+    """Tests for module feedresults members including class FeedResultStore
+    """
+    def test_put_and_get(self) -> None:
+        """Verify the latest content stored for a feed is read back by another store
+        sharing the file, with the worker that loaded it
+        """
+        rss_feed_channel: RSSFeedChannel = RSSFeedChannel('Feed', 'Description', 'http://a.lnk',
+            [RSSFeedItem('Title', 'Description', 'http://a.lnk/1')])
+        with tempfile.TemporaryDirectory() as results_dir:
+            path: str = os.path.join(results_dir, 'results.db')
+            result_store: FeedResultStore = FeedResultStore(path)
+            result_store.put('http://a.lnk', RSSFeedChannel('Old', '', '', []), 'a')
+            result_store.put('http://a.lnk', rss_feed_channel, 'b')
+            self.assertEqual(result_store.get_statistics(), {'stored': 2, 'entries': 1})
+            result_store.close()
+            result_store = FeedResultStore(path)
+            actual_result: Optional[FeedResult] = result_store.get('http://a.lnk')
+            self.assertEqual(actual_result.rss_feed_channel, rss_feed_channel)
+            self.assertEqual(actual_result.worker_id, 'b')
+            self.assertIsNone(result_store.get('http://b.lnk'))
+            result_store.close()
@@ -0,0 +1,63 @@
+"""feedsnapshots: persistent snapshots of the items of every feed, identity and content
+hash of each, so a feed loaded again can be reduced to the items added or changed since
+"""
+from hashlib import blake2b
+from typing import Any
+from seenindex import get_parsed_rss_feed_item_identities
+from sqlitestore import SQLiteStore
+
+ItemFingerprint = tuple[str, bytes]
+
+def get_parsed_rss_feed_item_fingerprint(parsed_rss_feed_item: dict[str, Any]) -> ItemFingerprint:
+    """Return the identity of a parsed feed item and a digest of the raw content it is
+    shown with, so an item is recognised when it comes back unchanged or edited
+    """
+    content: str = (f"{parsed_rss_feed_item.get('title', '')}\n"
+        f"{parsed_rss_feed_item.get('link', '')}\n"
+        f"{parsed_rss_feed_item.get('description', '')}")
+    return (get_parsed_rss_feed_item_identities(parsed_rss_feed_item)[0],
+        blake2b(content.encode('utf-8', 'surrogatepass'), digest_size=16).digest())
+
+class FeedSnapshotStore(SQLiteStore):
+    """SQLite backed store of the item fingerprints of every feed as last loaded. Each load
+    is compared against the stored snapshot, which is then replaced, so items removed from
+    a feed are forgotten and shown again as added should they come back.
+    """
+    def __init__(self, path: str) -> None:
+        """Build a FeedSnapshotStore stored in the SQLite database file at path
+        """
+        super().__init__(path,
+            'CREATE TABLE IF NOT EXISTS feed_snapshots ('
+            'url TEXT NOT NULL, identity TEXT NOT NULL, content_hash BLOB NOT NULL, '
+            'PRIMARY KEY (url, identity, content_hash)) WITHOUT ROWID')
+        self.added: int = 0
+        self.updated: int = 0
+        self.unchanged: int = 0
+
+    def compare_and_store(self, url: str, fingerprints: list[ItemFingerprint]) -> list[bool]:
+        """Returns for each item of the feed at url, given by its fingerprint, True if it was
+        added or changed since the stored snapshot, which is then replaced by fingerprints
+        """
+        snapshot: set[ItemFingerprint] = set(fingerprints)
+        with self.lock:
+            stored_snapshot: set[ItemFingerprint] = set(self.connection.execute(
+                'SELECT identity, content_hash FROM feed_snapshots WHERE url = ?', (url,)))
+            stored_identities: set[str] = {identity for identity, _ in stored_snapshot}
+            changed_items: list[bool] = [
+                fingerprint not in stored_snapshot for fingerprint in fingerprints]
+            added: int = sum(identity not in stored_identities for identity, _ in fingerprints)
+            self.added += added
+            self.updated += sum(changed_items) - added
+            self.unchanged += len(changed_items) - sum(changed_items)
+            if snapshot != stored_snapshot:
+                with self.connection:
+                    self.connection.execute('DELETE FROM feed_snapshots WHERE url = ?', (url,))
+                    self.connection.executemany('INSERT INTO feed_snapshots VALUES (?, ?, ?)',
+                        [(url, identity, content_hash) for identity, content_hash in snapshot])
+        return changed_items
+
+    def get_statistics(self) -> dict[str, int]:
+        """Returns counters of items added, updated and unchanged since their snapshots
+        """
+        with self.lock:
+            return {'added': self.added, 'updated': self.updated, 'unchanged': self.unchanged}
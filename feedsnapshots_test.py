@@ -0,0 +1,73 @@
+"""Tests for module feedsnapshots
+"""
+import os
+import tempfile
+import unittest
+from feedsnapshots import FeedSnapshotStore, ItemFingerprint
+from feedsnapshots import get_parsed_rss_feed_item_fingerprint
+
+def _fingerprint(link: str, description: str) -> ItemFingerprint:
+    """Returns the fingerprint of a parsed item with link and description"""
+    return get_parsed_rss_feed_item_fingerprint(
+        {'title': 'Title', 'link': link, 'description': description})
+
+class TestFeedSnapshots(unittest.TestCase):
+    """Tests for module feedsnapshots members including class FeedSnapshotStore
+    """
+    def test_get_parsed_rss_feed_item_fingerprint(self) -> None:
+        """Verify an item is identified by its link and its content digest changes with
+        its content
+        """
+        identity: str
+        content_hash: bytes
+        identity, content_hash = _fingerprint('http://a.lnk/1', 'Old')
+        self.assertEqual(identity, 'link:http://a.lnk/1')
+        self.assertEqual(len(content_hash), 16)
+        self.assertEqual(_fingerprint('http://a.lnk/1', 'Old'), (identity, content_hash))
+        self.assertNotEqual(_fingerprint('http://a.lnk/1', 'New')[1], content_hash)
+
+    def test_compare_and_store(self) -> None:
+        """Verify items are reported changed when added or edited since the last snapshot
+        of the same feed, and unchanged otherwise
+        """
+        snapshot_store: FeedSnapshotStore = FeedSnapshotStore(':memory:')
+        first: list[ItemFingerprint] = [_fingerprint('http://a.lnk/1', 'One'),
+            _fingerprint('http://a.lnk/2', 'Two')]
+        self.assertEqual(snapshot_store.compare_and_store('http://a.lnk', first), [True, True])
+        self.assertEqual(snapshot_store.compare_and_store('http://b.lnk', first), [True, True])
+        second: list[ItemFingerprint] = [_fingerprint('http://a.lnk/1', 'One'),
+            _fingerprint('http://a.lnk/2', 'Two, edited'), _fingerprint('http://a.lnk/3', 'New')]
+        self.assertEqual(snapshot_store.compare_and_store('http://a.lnk', second),
+            [False, True, True])
+        self.assertEqual(snapshot_store.compare_and_store('http://a.lnk', second),
+            [False, False, False])
+        self.assertEqual(snapshot_store.get_statistics(),
+            {'added': 5, 'updated': 1, 'unchanged': 4})
+        snapshot_store.close()
+
+    def test_compare_and_store_forgets_removed_items(self) -> None:
+        """Verify an item removed from a feed is reported added should it come back, and
+        items sharing an identity are each recognised
+        """
+        snapshot_store: FeedSnapshotStore = FeedSnapshotStore(':memory:')
+        item: ItemFingerprint = _fingerprint('http://a.lnk/1', 'One')
+        twin: ItemFingerprint = _fingerprint('http://a.lnk/1', 'Other')
+        snapshot_store.compare_and_store('http://a.lnk', [item, twin])
+        self.assertEqual(snapshot_store.compare_and_store('http://a.lnk', [item, twin]),
+            [False, False])
+        snapshot_store.compare_and_store('http://a.lnk', [])
+        self.assertEqual(snapshot_store.compare_and_store('http://a.lnk', [item]), [True])
+        snapshot_store.close()
+
+    def test_snapshots_persist(self) -> None:
+        """Verify snapshots stored in a file are compared against in a later run
+        """
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            path: str = os.path.join(snapshot_dir, 'snapshots.db')
+            item: ItemFingerprint = _fingerprint('http://a.lnk/1', 'One')
+            snapshot_store: FeedSnapshotStore = FeedSnapshotStore(path)
+            snapshot_store.compare_and_store('http://a.lnk', [item])
+            snapshot_store.close()
+            snapshot_store = FeedSnapshotStore(path)
+            self.assertEqual(snapshot_store.compare_and_store('http://a.lnk', [item]), [False])
+            snapshot_store.close()
@@ -0,0 +1,90 @@
+"""feedsources: read feed URLs from subscription lists, such as OPML exports or text files
+with one URL per line, one at a time so long lists need not be held in memory
+"""
+import re
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional, Pattern
+from urllib.parse import urlsplit, urlunsplit
+from xml.etree import ElementTree
+
+# path, query and fragment of a URL: anything but whitespace and control characters
+_URL_PATTERN: Pattern[str] = re.compile(r'(https?)://([^/?#\s]+)([^\s\x00-\x1f\x7f]*)',
+    re.IGNORECASE)
+
+def normalize_feed_url(url: str) -> str:
+    """Return url without surrounding whitespace or fragment and with scheme and host in
+    lower case, so that the same feed listed twice is loaded once
+    """
+    parts = urlsplit(url.strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/',
+        parts.query, ''))
+
+def iter_opml_urls(source: BinaryIO) -> Iterator[str]:
+    """Yields the xmlUrl of every outline in an OPML document, including outlines nested
+    in categories. Stops at the first XML syntax error, keeping what was read before it.
+    """
+    try:
+        event: str
+        element: ElementTree.Element
+        for event, element in ElementTree.iterparse(source, events=('start', 'end')):
+            if element.tag != 'outline':
+                continue
+            if event == 'start':
+                url: str = element.get('xmlUrl', '')
+                if url:
+                    yield url
+            else:
+                element.clear()
+    except ElementTree.ParseError:
+        return
+
+def iter_text_urls(source: BinaryIO) -> Iterator[str]:
+    """Yields every URL of a UTF-8 text file with one URL per line, skipping blank lines
+    and comments starting with #
+    """
+    line: bytes
+    for line in source:
+        url: str = line.decode('utf-8', 'replace').strip()
+        if url and not url.startswith('#'):
+            yield url
+
+class FeedURLValidator: # pylint: disable=too-few-public-methods
+    """Checks URLs with a compiled pattern, and checks each distinct host only once
+    with the validators library
+    """
+    def __init__(self) -> None:
+        self.valid_hosts: dict[str, bool] = {}
+
+    def is_valid(self, url: str) -> bool:
+        """Returns True if url is a valid HTTP(S) URL
+        """
+        match = _URL_PATTERN.fullmatch(url)
+        if match is None:
+            return False
+        scheme_and_host: str = f'{match.group(1)}://{match.group(2)}'.lower()
+        valid: bool
+        if scheme_and_host in self.valid_hosts:
+            valid = self.valid_hosts[scheme_and_host]
+        else:
+            import validators # pylint: disable=import-outside-toplevel
+            valid = validators.url(scheme_and_host) is True
+            self.valid_hosts[scheme_and_host] = valid
+        return valid
+
+def iter_unique_feed_urls(urls: Iterable[str], seen_urls: set[str],
+validator: Optional[FeedURLValidator]=None,
+on_invalid: Callable[[str], None]=lambda url: None) -> Iterator[str]:
+    """Yields urls not in seen_urls, adding their normalized form to seen_urls. With a
+    validator, urls are yielded normalized and invalid urls are passed to on_invalid instead.
+    """
+    url: str
+    for url in urls:
+        normalized_url: str = normalize_feed_url(url)
+        if normalized_url in seen_urls:
+            continue
+        seen_urls.add(normalized_url)
+        if validator is None:
+            yield url
+        elif validator.is_valid(normalized_url):
+            yield normalized_url
+        else:
+            on_invalid(url)
@@ -0,0 +1,55 @@
+"""Tests for module feedsources
+"""
+import io
+import unittest
+from feedsources import FeedURLValidator, iter_opml_urls, iter_text_urls
+from feedsources import iter_unique_feed_urls, normalize_feed_url
+
+class TestFeedSources(unittest.TestCase):
+    """Tests for module feedsources members including class FeedURLValidator
+    """
+    def test_normalize_feed_url(self) -> None:
+        """Verify scheme and host are lower cased and fragments dropped, keeping path and query
+        """
+        self.assertEqual(normalize_feed_url(' HTTP://Example.COM/Feed?Format=RSS#top '),
+            'http://example.com/Feed?Format=RSS')
+        self.assertEqual(normalize_feed_url('http://example.com'), 'http://example.com/')
+
+    def test_iter_opml_urls(self) -> None:
+        """Verify feed URLs of nested outlines are read, up to an XML syntax error
+        """
+        source: io.BytesIO = io.BytesIO(b'<?xml version="1.0"?><opml version="2.0"><body>'
+            b'<outline text="Tech"><outline type="rss" xmlUrl="http://a.lnk/rss"/></outline>'
+            b'<outline text="No feed"/><outline xmlUrl="http://b.lnk/rss"/><oops></body>')
+        self.assertEqual(list(iter_opml_urls(source)), ['http://a.lnk/rss', 'http://b.lnk/rss'])
+
+    def test_iter_text_urls(self) -> None:
+        """Verify blank lines and comments are skipped
+        """
+        source: io.BytesIO = io.BytesIO(b'# feeds\n http://a.lnk \n\nhttp://b.lnk')
+        self.assertEqual(list(iter_text_urls(source)), ['http://a.lnk', 'http://b.lnk'])
+
+    def test_feed_url_validator(self) -> None:
+        """Verify URLs are checked by pattern and each host is checked once
+        """
+        validator: FeedURLValidator = FeedURLValidator()
+        self.assertTrue(validator.is_valid('http://example.com/feed?a=1'))
+        self.assertTrue(validator.is_valid('https://127.0.0.1:8080/feed'))
+        self.assertTrue(validator.is_valid('http://example.com/other'))
+        self.assertFalse(validator.is_valid('http://example.com/with space'))
+        self.assertFalse(validator.is_valid('ftp://example.com/feed'))
+        self.assertFalse(validator.is_valid('http://not_a_host/feed'))
+        self.assertEqual(validator.valid_hosts, {'http://example.com': True,
+            'https://127.0.0.1:8080': True, 'http://not_a_host': False})
+
+    def test_iter_unique_feed_urls(self) -> None:
+        """Verify urls are yielded once each, normalized and validated only with a validator
+        """
+        seen_urls: set[str] = set()
+        invalid_urls: list[str] = []
+        self.assertEqual(list(iter_unique_feed_urls(['testing', 'testing'], seen_urls)),
+            ['testing'])
+        self.assertEqual(list(iter_unique_feed_urls(
+            ['http://A.lnk', 'http://a.lnk/', 'testing', 'bad url'], seen_urls,
+            FeedURLValidator(), invalid_urls.append)), ['http://a.lnk/'])
+        self.assertEqual(invalid_urls, ['bad url'])
@@ -0,0 +1,169 @@
+"""feedwatcher: keep loading RSS feeds, each on its own adaptive refresh schedule,
+showing only items not shown before
+"""
+import heapq
+from dataclasses import dataclass, field
+from random import random
+from time import monotonic, sleep
+from typing import Callable, Optional
+from model import RSSFeedChannel, RSSFeedItem
+from seenindex import get_item_identity
+from rssfeedloader import RSSFeedLoader
+from rssfeedreader import RSSFeedReader
+from feedpool import FeedLoaderPool, UnavailableRSSFeedLoader
+
+DEFAULT_REFRESH_INTERVAL: float = 15 * 60
+DEFAULT_MIN_INTERVAL: float = 60
+DEFAULT_MAX_INTERVAL: float = 24 * 60 * 60
+# growth of the refresh interval each time a feed is found unchanged
+UNCHANGED_BACKOFF: float = 1.5
+# random spread of refresh times, so feeds added together do not stay in lockstep
+JITTER: float = 0.1
+
+@dataclass
+class WatchedFeed:
+    """ Refresh state of a watched feed """
+    url: str
+    interval: float
+    failures: int = 0
+    seen_item_identities: set[str] = field(default_factory=set)
+
+class FeedWatcher: # pylint: disable=too-many-instance-attributes
+    """Loads feeds again and again, scheduling every feed in one priority queue by the time
+    it is next due. A feed is refreshed after the interval given by its ttl, sy:updatePeriod
+    or HTTP caching hints, or the default interval; the interval grows while the feed is
+    unchanged and doubles with every consecutive failure, up to max_interval.
+    """
+    def __init__(self, feedloader_pool: FeedLoaderPool, rss_feed_reader: RSSFeedReader, # pylint: disable=too-many-arguments
+    default_interval: float=DEFAULT_REFRESH_INTERVAL, min_interval: float=DEFAULT_MIN_INTERVAL,
+    max_interval: float=DEFAULT_MAX_INTERVAL, now: Callable[[], float]=monotonic,
+    wait: Callable[[float], None]=sleep) -> None:
+        """Build a FeedWatcher loading feeds with feedloader_pool and showing new items with
+        rss_feed_reader. Optional parameters now and wait replace the system clock.
+        """
+        self.feedloader_pool: FeedLoaderPool = feedloader_pool
+        self.rss_feed_reader: RSSFeedReader = rss_feed_reader
+        self.min_interval: float = min_interval
+        self.max_interval: float = max(min_interval, max_interval)
+        self.default_interval: float = self._clamp(default_interval)
+        self.now: Callable[[], float] = now
+        self.wait: Callable[[float], None] = wait
+        self.queue: list[tuple[float, int, str]] = []
+        self.queue_counter: int = 0
+        self.watched_feeds: dict[str, WatchedFeed] = {}
+
+    def _clamp(self, interval: float) -> float:
+        """Return interval limited to between min_interval and max_interval
+        """
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _schedule(self, url: str, due: float) -> None:
+        """Queue the feed at url to be loaded at time due
+        """
+        self.queue_counter += 1
+        heapq.heappush(self.queue, (due, self.queue_counter, url))
+
+    def add_rss_feed_url(self, url: str) -> None:
+        """Start watching the feed at url, loading it straight away
+        """
+        if url not in self.watched_feeds:
+            self.watched_feeds[url] = WatchedFeed(url, self.default_interval)
+            self._schedule(url, self.now())
+
+    def _pop_due_urls(self) -> list[str]:
+        """Remove and return URLs of all feeds that are due now
+        """
+        current_time: float = self.now()
+        due_urls: list[str] = []
+        while self.queue and self.queue[0][0] <= current_time:
+            due_urls.append(heapq.heappop(self.queue)[2])
+        return due_urls
+
+    def _show_new_items(self, watched_feed: WatchedFeed,
+    rss_feed_channel: RSSFeedChannel) -> bool:
+        """Show items of rss_feed_channel not shown before, returning True if there were any.
+        Only identities of items currently in the feed are remembered.
+        """
+        items: list[RSSFeedItem] = list(rss_feed_channel.items)
+        item_identities: list[str] = [get_item_identity(item) for item in items]
+        new_items: list[RSSFeedItem] = [
+            item for item, item_identity in zip(items, item_identities)
+            if item_identity not in watched_feed.seen_item_identities
+        ]
+        watched_feed.seen_item_identities = set(item_identities)
+        if new_items:
+            self.rss_feed_reader.show_rss_feed_content(RSSFeedChannel(
+                rss_feed_channel.title, rss_feed_channel.description, rss_feed_channel.link,
+                new_items))
+        return len(new_items) > 0
+
+    @staticmethod
+    def _has_failed(feedloader: RSSFeedLoader) -> bool:
+        """Returns True if feedloader could not load its feed
+        """
+        if isinstance(feedloader, UnavailableRSSFeedLoader):
+            return True
+        return hasattr(feedloader, 'has_failed') and feedloader.has_failed()
+
+    def _reschedule(self, watched_feed: WatchedFeed, feedloader: RSSFeedLoader,
+    failed: bool, changed: bool) -> None:
+        """Schedule the next load of watched_feed according to how loading went
+        """
+        refresh_interval: Optional[float] = None
+        if hasattr(feedloader, 'get_refresh_interval'):
+            refresh_interval = feedloader.get_refresh_interval()
+        base_interval: float = self._clamp(refresh_interval or self.default_interval)
+        if failed:
+            watched_feed.failures += 1
+            watched_feed.interval = self._clamp(
+                base_interval * 2 ** min(watched_feed.failures, 32))
+        elif changed:
+            watched_feed.failures = 0
+            watched_feed.interval = base_interval
+        else:
+            watched_feed.failures = 0
+            watched_feed.interval = self._clamp(
+                max(watched_feed.interval, base_interval) * UNCHANGED_BACKOFF)
+        jitter: float = 1 + JITTER * (2 * random() - 1)
+        self._schedule(watched_feed.url, self.now() + watched_feed.interval * jitter)
+
+    def refresh_due_feeds(self) -> int:
+        """Load all feeds that are due, show their new items and schedule their next load.
+        A feed that failed to load keeps the identities of items seen before and backs off.
+        Returns number of feeds loaded.
+        """
+        due_urls: list[str] = self._pop_due_urls()
+        url: str
+        feedloader: RSSFeedLoader
+        for url, feedloader in self.feedloader_pool.load_rss_feeds(due_urls):
+            watched_feed: WatchedFeed = self.watched_feeds[url]
+            loaded_channel: RSSFeedChannel = feedloader.get_rss_feed_channel()
+            # items streamed as they are read are all read first, so a feed read only in
+            # part is known to have failed
+            rss_feed_channel: RSSFeedChannel = RSSFeedChannel(loaded_channel.title,
+                loaded_channel.description, loaded_channel.link, list(loaded_channel.items))
+            failed: bool = self._has_failed(feedloader)
+            changed: bool = not failed and self._show_new_items(watched_feed, rss_feed_channel)
+            self._reschedule(watched_feed, feedloader, failed, changed)
+        return len(due_urls)
+
+    def get_seconds_until_due(self) -> Optional[float]:
+        """Returns seconds until the next feed is due, or None if no feeds are watched
+        """
+        if not self.queue:
+            return None
+        return max(0.0, self.queue[0][0] - self.now())
+
+    def run(self, max_refreshes: Optional[int]=None) -> None:
+        """Keep refreshing feeds as they become due, stopping after max_refreshes rounds
+        if given or when no feeds are watched
+        """
+        refreshes: int = 0
+        while max_refreshes is None or refreshes < max_refreshes:
+            seconds_until_due: Optional[float] = self.get_seconds_until_due()
+            if seconds_until_due is None:
+                return
+            if seconds_until_due > 0:
+                self.wait(seconds_until_due)
+            self.refresh_due_feeds()
+            refreshes += 1
@@ -0,0 +1,165 @@
+"""Tests for module feedwatcher
+"""
+import unittest
+from typing import Iterator, Optional
+from model import RSSFeedChannel, RSSFeedItem
+from feedpool import FeedLoaderPool
+from feedwatcher import FeedWatcher, WatchedFeed, UNCHANGED_BACKOFF
+
+class MockRSSFeedLoader:
+    """Mock implementation of the RSSFeedLoader protocol serving items from a shared
+    dict of feeds. Used for testing purposes.
+    """
+    feeds: dict[str, list[RSSFeedItem]] = {}
+    failing_urls: set[str] = set()
+    refresh_interval: Optional[float] = None
+
+    def __init__(self, url: str) -> None:
+        self.url: str = url
+
+    def load_rss_feed(self) -> None:
+        """Nothing to load"""
+        if self.url not in MockRSSFeedLoader.feeds:
+            raise ValueError('missing feed')
+
+    def get_rss_feed_channel(self) -> RSSFeedChannel:
+        """Returns RSS feed channel content as an instance of RSSFeedChannel"""
+        if self.has_failed():
+            return RSSFeedChannel(self.url, '', self.url, iter([]))
+        return RSSFeedChannel(self.url, '', self.url, iter(MockRSSFeedLoader.feeds[self.url]))
+
+    @staticmethod
+    def get_refresh_interval() -> Optional[float]:
+        """Returns seconds the feed asked to wait before it is loaded again"""
+        return MockRSSFeedLoader.refresh_interval
+
+    def has_failed(self) -> bool:
+        """Returns True if the feed is set to fail, as a server error would"""
+        return self.url in MockRSSFeedLoader.failing_urls
+
+class MockRSSFeedReader:
+    """Mock implementation of the RSSFeedReader protocol recording shown items
+    """
+    def __init__(self) -> None:
+        self.shown: list[tuple[str, list[str]]] = []
+
+    @staticmethod
+    def initialise() -> None:
+        """Prepare the RSS Feed Reader instance"""
+
+    def show_rss_feed_content(self, content: RSSFeedChannel) -> None:
+        """Record titles of shown items"""
+        self.shown.append((content.title, [item.title for item in content.items]))
+
+class TestFeedWatcher(unittest.TestCase):
+    """Tests for module feedwatcher members including class FeedWatcher
+    """
+    def setUp(self) -> None:
+        self.now: float = 1000.0
+        MockRSSFeedLoader.feeds = {
+            'http://a.lnk': [RSSFeedItem('A1', '', 'http://a.lnk/1')],
+            'http://b.lnk': [RSSFeedItem('B1', '', 'http://b.lnk/1')]
+        }
+        MockRSSFeedLoader.failing_urls = set()
+        MockRSSFeedLoader.refresh_interval = None
+        self.reader: MockRSSFeedReader = MockRSSFeedReader()
+        self.waits: list[float] = []
+        self.watcher: FeedWatcher = FeedWatcher(
+            FeedLoaderPool(MockRSSFeedLoader), self.reader, default_interval=100,
+            min_interval=10, max_interval=1000, now=lambda: self.now, wait=self.wait)
+
+    def wait(self, seconds: float) -> None:
+        """Mock sleep advancing the clock"""
+        self.waits.append(seconds)
+        self.now += seconds
+
+    def test_shows_only_new_items(self) -> None:
+        """Verify all items are shown on the first load and only new items after that
+        """
+        self.watcher.add_rss_feed_url('http://a.lnk')
+        self.watcher.add_rss_feed_url('http://b.lnk')
+        self.watcher.add_rss_feed_url('http://a.lnk')
+        self.assertEqual(self.watcher.refresh_due_feeds(), 2)
+        MockRSSFeedLoader.feeds['http://a.lnk'].append(RSSFeedItem('A2', '', 'http://a.lnk/2'))
+        self.watcher.run(max_refreshes=2)
+        self.assertEqual(self.reader.shown, [
+            ('http://a.lnk', ['A1']), ('http://b.lnk', ['B1']), ('http://a.lnk', ['A2'])])
+
+    def test_unchanged_feed_backs_off(self) -> None:
+        """Verify the interval grows while a feed is unchanged and resets when it changes
+        """
+        self.watcher.add_rss_feed_url('http://a.lnk')
+        self.watcher.run(max_refreshes=2)
+        watched_feed: WatchedFeed = self.watcher.watched_feeds['http://a.lnk']
+        self.assertEqual(watched_feed.interval, 100 * UNCHANGED_BACKOFF)
+        MockRSSFeedLoader.feeds['http://a.lnk'] = [RSSFeedItem('A2', '', 'http://a.lnk/2')]
+        self.watcher.run(max_refreshes=1)
+        self.assertEqual(watched_feed.interval, 100)
+        self.assertEqual(len(self.waits), 2)
+        self.assertAlmostEqual(self.waits[0], 100, delta=100 * 0.1)
+
+    def test_refresh_interval_hint(self) -> None:
+        """Verify the refresh interval requested by the feed is used within limits
+        """
+        MockRSSFeedLoader.refresh_interval = 5000
+        self.watcher.add_rss_feed_url('http://a.lnk')
+        self.watcher.refresh_due_feeds()
+        self.assertEqual(self.watcher.watched_feeds['http://a.lnk'].interval, 1000)
+
+    def test_failing_feed_backs_off(self) -> None:
+        """Verify the interval doubles with every consecutive failure
+        """
+        self.watcher.add_rss_feed_url('http://missing.lnk')
+        self.watcher.run(max_refreshes=2)
+        watched_feed: WatchedFeed = self.watcher.watched_feeds['http://missing.lnk']
+        self.assertEqual(watched_feed.failures, 2)
+        self.assertEqual(watched_feed.interval, 400)
+        self.assertEqual(self.reader.shown, [])
+
+    def test_failed_load_keeps_seen_items(self) -> None:
+        """Verify a load failing with an empty channel backs off and does not forget items
+        seen before, so they are not shown again once the feed recovers
+        """
+        self.watcher.add_rss_feed_url('http://a.lnk')
+        self.watcher.refresh_due_feeds()
+        MockRSSFeedLoader.failing_urls.add('http://a.lnk')
+        self.watcher.run(max_refreshes=1)
+        watched_feed: WatchedFeed = self.watcher.watched_feeds['http://a.lnk']
+        self.assertEqual(watched_feed.failures, 1)
+        self.assertEqual(watched_feed.seen_item_identities, {'http://a.lnk/1'})
+        MockRSSFeedLoader.failing_urls.clear()
+        MockRSSFeedLoader.feeds['http://a.lnk'].append(RSSFeedItem('A2', '', 'http://a.lnk/2'))
+        self.watcher.run(max_refreshes=1)
+        self.assertEqual(watched_feed.failures, 0)
+        self.assertEqual(self.reader.shown, [('http://a.lnk', ['A1']), ('http://a.lnk', ['A2'])])
+
+    def test_run_without_feeds(self) -> None:
+        """Verify run returns straight away when no feeds are watched
+        """
+        self.watcher.run()
+        self.assertIsNone(self.watcher.get_seconds_until_due())
+        self.assertEqual(self.waits, [])
+
+    def test_feed_read_in_part_fails(self) -> None:
+        """Verify a feed whose items are streamed and that fails only once they are read is
+        not shown and backs off
+        """
+        watcher: FeedWatcher = FeedWatcher(FeedLoaderPool(_PartlyReadRSSFeedLoader),
+            self.reader, default_interval=100, min_interval=10, max_interval=1000,
+            now=lambda: self.now, wait=self.wait)
+        watcher.add_rss_feed_url('http://a.lnk')
+        watcher.refresh_due_feeds()
+        self.assertEqual(watcher.watched_feeds['http://a.lnk'].failures, 1)
+        self.assertEqual(self.reader.shown, [])
+
+class _PartlyReadRSSFeedLoader(MockRSSFeedLoader):
+    """Mock implementation of the RSSFeedLoader protocol streaming its items, failing once
+    they have been read"""
+    def get_rss_feed_channel(self) -> RSSFeedChannel:
+        """Returns a channel whose items are read as they are iterated"""
+        return RSSFeedChannel(self.url, '', self.url, self._iter_items())
+
+    def _iter_items(self) -> Iterator[RSSFeedItem]:
+        """Yields the items of the feed, then sets the feed to fail"""
+        yield from MockRSSFeedLoader.feeds[self.url]
+        MockRSSFeedLoader.failing_urls.add(self.url)
@@ -0,0 +1,67 @@
+"""feedwriters: implementations of the RSSFeedReader protocol writing feed items as
+machine-readable records, one per item, for other programs to read
+"""
+import csv
+from json import JSONEncoder
+from typing import Any, Callable, TextIO
+from model import RSSFeedChannel, RSSFeedItem
+
+OUTPUT_FORMATS: tuple[str, ...] = ('text', 'ndjson', 'csv')
+RECORD_FIELDS: tuple[str, ...] = ('channel_title', 'channel_link', 'title', 'link', 'description')
+
+class NDJSONWriter:
+    """Implements the RSSFeedReader protocol by writing every item as a JSON object on a line
+    of its own, with the title and link of its channel. Items are written one at a time as
+    they are read from the channel, and the output stream is flushed after every channel.
+    """
+    def __init__(self, file: TextIO) -> None:
+        """Build an NDJSONWriter
+        """
+        self.output_stream: TextIO = file
+        self.encode: Callable[[str], str] = JSONEncoder(ensure_ascii=False).encode
+        NDJSONWriter.initialise()
+
+    @staticmethod
+    def initialise() -> None:
+        """Prepare the RSS Feed Reader instance"""
+        return None
+
+    def show_rss_feed_content(self, content: RSSFeedChannel) -> None:
+        """Write a record for every item of RSSFeedChannel
+        """
+        encode: Callable[[str], str] = self.encode
+        write: Callable[[str], int] = self.output_stream.write
+        # the channel fields are the same for every item, so they are encoded once
+        channel_fields: str = (f'{{"channel_title":{encode(content.title)},'
+            f'"channel_link":{encode(content.link)}')
+        item: RSSFeedItem
+        for item in content.items:
+            write(f'{channel_fields},"title":{encode(item.title)},"link":{encode(item.link)},'
+                f'"description":{encode(item.description)}}}\n')
+        self.output_stream.flush()
+
+class CSVWriter:
+    """Implements the RSSFeedReader protocol by writing every item as a CSV row, with the
+    title and link of its channel, after a header row written even if no channel is shown.
+    Items are written one at a time as they are read from the channel, and the output
+    stream is flushed after every channel.
+    """
+    def __init__(self, file: TextIO) -> None:
+        """Build a CSVWriter, writing the header row
+        """
+        self.output_stream: TextIO = file
+        self.csv_writer: Any = csv.writer(file)
+        self.csv_writer.writerow(RECORD_FIELDS)
+        CSVWriter.initialise()
+
+    @staticmethod
+    def initialise() -> None:
+        """Prepare the RSS Feed Reader instance"""
+        return None
+
+    def show_rss_feed_content(self, content: RSSFeedChannel) -> None:
+        """Write a row for every item of RSSFeedChannel
+        """
+        self.csv_writer.writerows((content.title, content.link, item.title, item.link,
+            item.description) for item in content.items)
+        self.output_stream.flush()
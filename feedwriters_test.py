@@ -0,0 +1,61 @@
+"""Tests for module feedwriters
+"""
+import csv
+import io
+import json
+import unittest
+from typing import Any, Iterator
+from model import RSSFeedChannel, RSSFeedItem
+from feedwriters import CSVWriter, NDJSONWriter, RECORD_FIELDS
+
+def _build_channel(*titles: str) -> RSSFeedChannel:
+    """Returns a channel with an item for each of titles, whose items can be read once
+    """
+    items: Iterator[RSSFeedItem] = iter([
+        RSSFeedItem(title, f'Description of {title},\nwith "quotes"', f'http://a.lnk/{index}')
+        for index, title in enumerate(titles)])
+    return RSSFeedChannel('Channel, "quoted"', 'Channel description', 'http://a.lnk', items)
+
+class TestFeedWriters(unittest.TestCase):
+    """Tests for module feedwriters members including classes NDJSONWriter and CSVWriter
+    """
+    def test_ndjson_writer(self) -> None:
+        """Verify every item is written as a JSON object on a line of its own
+        """
+        output_stream: io.StringIO = io.StringIO()
+        feedreader: NDJSONWriter = NDJSONWriter(output_stream)
+        feedreader.show_rss_feed_content(_build_channel('First', 'Ünïcode'))
+        feedreader.show_rss_feed_content(_build_channel())
+        lines: list[str] = output_stream.getvalue().splitlines()
+        actual_result: list[dict[str, Any]] = [json.loads(line) for line in lines]
+        self.assertEqual(actual_result, [
+            {'channel_title': 'Channel, "quoted"', 'channel_link': 'http://a.lnk',
+                'title': 'First', 'link': 'http://a.lnk/0',
+                'description': 'Description of First,\nwith "quotes"'},
+            {'channel_title': 'Channel, "quoted"', 'channel_link': 'http://a.lnk',
+                'title': 'Ünïcode', 'link': 'http://a.lnk/1',
+                'description': 'Description of Ünïcode,\nwith "quotes"'}
+        ])
+        self.assertIn('Ünïcode', lines[1])
+
+    def test_csv_writer(self) -> None:
+        """Verify a header row and a row for every item are written, readable by the csv
+        module
+        """
+        output_stream: io.StringIO = io.StringIO()
+        feedreader: CSVWriter = CSVWriter(output_stream)
+        feedreader.show_rss_feed_content(_build_channel('First'))
+        feedreader.show_rss_feed_content(_build_channel('Second', 'Third'))
+        actual_result: list[list[str]] = list(
+            csv.reader(io.StringIO(output_stream.getvalue(), newline='')))
+        self.assertEqual(actual_result[0], list(RECORD_FIELDS))
+        self.assertEqual(actual_result[1], ['Channel, "quoted"', 'http://a.lnk', 'First',
+            'http://a.lnk/0', 'Description of First,\nwith "quotes"'])
+        self.assertEqual([row[2] for row in actual_result[2:]], ['Second', 'Third'])
+
+    def test_csv_writer_header_without_channels(self) -> None:
+        """Verify the header row is written even if no channel is shown
+        """
+        output_stream: io.StringIO = io.StringIO()
+        CSVWriter(output_stream)
+        self.assertEqual(output_stream.getvalue(), ','.join(RECORD_FIELDS) + '\r\n')
@@ -0,0 +1,260 @@
+"""fetchpolicy: rules for fetching feeds from hosts that throttle or fail, limiting the
+request rate per host, retrying failed fetches and skipping feeds that keep failing
+"""
+from contextlib import contextmanager
+from random import uniform
+from threading import Lock, local
+from time import monotonic, sleep, time
+from typing import Callable, Iterator, Optional, Protocol, TypeVar
+from urllib.parse import urlsplit
+from sqlitestore import SQLiteStore
+
+DEFAULT_RETRIES: int = 2
+DEFAULT_BACKOFF: float = 0.5
+DEFAULT_MAX_BACKOFF: float = 10.0
+DEFAULT_FAILURE_THRESHOLD: int = 3
+DEFAULT_COOLDOWN: float = 60 * 60
+DEFAULT_MAX_COOLDOWN: float = 24 * 60 * 60
+# statuses worth trying again: rate limited or a temporary server failure
+RETRYABLE_STATUSES: frozenset[int] = frozenset((429, 500, 502, 503, 504))
+
+class FetchResult(Protocol): # pylint: disable=too-few-public-methods
+    """Outcome of a fetch, with status None if the server could not be reached"""
+    status: Optional[int]
+    headers: dict[str, str]
+
+Fetched = TypeVar('Fetched', bound=FetchResult)
+
+class CircuitOpenError(Exception):
+    """Raised instead of fetching a feed that failed repeatedly, until its cooldown ends"""
+
+class HostSlot(Protocol):
+    """Protocol for the slot a fetch holds on its host while it runs, which it gives up
+    while waiting to retry so other feeds of the host can be fetched meanwhile"""
+    def release(self) -> None:
+        """Give up the slot"""
+
+    def acquire(self) -> None:
+        """Take a slot again, waiting until one is free"""
+
+_held_host_slots: local = local()
+
+@contextmanager
+def holding_host_slot(host_slot: HostSlot) -> Iterator[None]:
+    """Runs the enclosed fetches of the calling thread as holding host_slot
+    """
+    _held_host_slots.host_slot = host_slot
+    try:
+        yield
+    finally:
+        _held_host_slots.host_slot = None
+
+class TokenBucket: # pylint: disable=too-few-public-methods
+    """Allows rate requests per second on average, and bursts of up to burst requests
+    """
+    def __init__(self, rate: float, burst: float=1.0, now: Callable[[], float]=monotonic,
+    wait: Callable[[float], None]=sleep) -> None:
+        """Build a full TokenBucket. Optional parameters now and wait replace the system clock.
+        """
+        self.rate: float = rate
+        self.burst: float = max(1.0, burst)
+        self.now: Callable[[], float] = now
+        self.wait: Callable[[float], None] = wait
+        self.lock: Lock = Lock()
+        self.tokens: float = self.burst
+        self.updated_at: float = now()
+
+    def acquire(self) -> float:
+        """Take a token, waiting until one is available. Returns seconds waited.
+        """
+        with self.lock:
+            current_time: float = self.now()
+            self.tokens = min(self.burst,
+                self.tokens + (current_time - self.updated_at) * self.rate)
+            self.updated_at = current_time
+            self.tokens -= 1
+            # a negative balance reserves the next tokens for this caller
+            seconds: float = max(0.0, -self.tokens / self.rate)
+        if seconds > 0:
+            self.wait(seconds)
+        return seconds
+
+class CircuitBreaker(SQLiteStore): # pylint: disable=too-many-instance-attributes
+    """Tracks consecutive failures of each feed in a SQLite database, so that a feed that
+    failed failure_threshold times in a row is skipped for a cooldown, doubling with each
+    further failure up to max_cooldown, also in later runs. After the cooldown the feed is
+    tried once more, and a success forgets its failures. Failures are read from the database
+    and counted in it every time, so processes sharing the database add up their failures.
+    """
+    def __init__(self, path: str=':memory:', failure_threshold: int=DEFAULT_FAILURE_THRESHOLD, # pylint: disable=too-many-arguments
+    cooldown: float=DEFAULT_COOLDOWN, max_cooldown: float=DEFAULT_MAX_COOLDOWN,
+    now: Callable[[], float]=time) -> None:
+        """Build a CircuitBreaker stored in the SQLite database file at path
+        """
+        super().__init__(path,
+            'CREATE TABLE IF NOT EXISTS circuit_breaker ('
+            'url TEXT PRIMARY KEY, failures INTEGER NOT NULL, open_until REAL NOT NULL)')
+        self.failure_threshold: int = failure_threshold
+        self.cooldown: float = cooldown
+        self.max_cooldown: float = max_cooldown
+        self.now: Callable[[], float] = now
+        self.skipped: int = 0
+
+    def _get_failures(self, url: str) -> tuple[int, float]:
+        """Returns failures in a row of the feed at url and the time its circuit is open
+        until, called holding the lock
+        """
+        row: Optional[tuple[int, float]] = self.connection.execute(
+            'SELECT failures, open_until FROM circuit_breaker WHERE url = ?', (url,)).fetchone()
+        return (0, 0.0) if row is None else row
+
+    def check(self, url: str) -> None:
+        """Returns if the feed at url may be fetched
+        CircuitOpenError: If the feed failed repeatedly and its cooldown has not ended
+        """
+        with self.lock:
+            failures: int
+            open_until: float
+            failures, open_until = self._get_failures(url)
+            if open_until <= self.now():
+                return
+            self.skipped += 1
+        raise CircuitOpenError(f'Skipped after {failures} failures in a row, '
+            f'until {open_until - self.now():.0f} seconds from now')
+
+    def record_success(self, url: str) -> None:
+        """Forget failures of the feed at url"""
+        with self.lock:
+            if self._get_failures(url)[0] > 0:
+                with self.connection:
+                    self.connection.execute('DELETE FROM circuit_breaker WHERE url = ?', (url,))
+
+    def record_failure(self, url: str) -> None:
+        """Count a failure of the feed at url, opening its circuit beyond failure_threshold.
+        The count is incremented in the database, in a transaction holding its write lock,
+        so failures recorded meanwhile by other processes are kept.
+        """
+        with self.lock, self.connection:
+            self.connection.execute('INSERT INTO circuit_breaker VALUES (?, 1, 0) '
+                'ON CONFLICT (url) DO UPDATE SET failures = failures + 1', (url,))
+            failures: int = self._get_failures(url)[0]
+            if failures >= self.failure_threshold:
+                self.connection.execute(
+                    'UPDATE circuit_breaker SET open_until = ? WHERE url = ?',
+                    (self.now() + min(self.max_cooldown,
+                        self.cooldown * 2 ** min(failures - self.failure_threshold, 32)), url))
+
+    def get_statistics(self) -> dict[str, int]:
+        """Returns counters of fetches skipped and of feeds failing now or skipped for now
+        """
+        with self.lock:
+            failing: int
+            open_circuits: int
+            failing, open_circuits = self.connection.execute(
+                'SELECT COUNT(*), COUNT(CASE WHEN open_until > ? THEN 1 END) '
+                'FROM circuit_breaker', (self.now(),)).fetchone()
+            return {'skipped': self.skipped, 'failing': failing, 'open': open_circuits}
+
+class FetchPolicy: # pylint: disable=too-many-instance-attributes
+    """Fetches feeds with at most rate_limit requests per second to each host, retrying
+    unreachable feeds and temporary server failures up to retries times after an
+    exponential backoff with full jitter, or the delay asked for with Retry-After, never
+    longer than max_backoff. With a circuit_breaker, feeds that keep failing are skipped.
+    """
+    def __init__(self, rate_limit: Optional[float]=None, retries: int=DEFAULT_RETRIES, # pylint: disable=too-many-arguments
+    backoff: float=DEFAULT_BACKOFF, max_backoff: float=DEFAULT_MAX_BACKOFF,
+    circuit_breaker: Optional[CircuitBreaker]=None,
+    wait: Callable[[float], None]=sleep) -> None:
+        """Build a FetchPolicy. Optional parameter wait replaces sleeping.
+        """
+        self.rate_limit: Optional[float] = rate_limit
+        self.retries: int = retries
+        self.backoff: float = backoff
+        self.max_backoff: float = max_backoff
+        self.circuit_breaker: Optional[CircuitBreaker] = circuit_breaker
+        self.wait: Callable[[float], None] = wait
+        self.lock: Lock = Lock()
+        self.token_buckets: dict[str, TokenBucket] = {}
+        self.counters: dict[str, float] = {'retries': 0, 'failures': 0, 'rate_limited_seconds': 0}
+
+    def _get_token_bucket(self, url: str) -> Optional[TokenBucket]:
+        """Returns the token bucket of the host of url, or None without a rate limit
+        """
+        if self.rate_limit is None:
+            return None
+        host: str = (urlsplit(url).hostname or '').lower()
+        with self.lock:
+            if host not in self.token_buckets:
+                self.token_buckets[host] = TokenBucket(self.rate_limit, wait=self.wait)
+            return self.token_buckets[host]
+
+    def _get_retry_delay(self, fetched: FetchResult, attempt: int) -> float:
+        """Returns seconds to wait before fetching again after attempt failed
+        """
+        try:
+            return min(self.max_backoff, max(0.0, float(fetched.headers['retry-after'])))
+        except (KeyError, ValueError):
+            return uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _count(self, counter: str, amount: float=1) -> None:
+        """Add amount to counter"""
+        with self.lock:
+            self.counters[counter] += amount
+
+    def _wait_for_retry(self, seconds: float) -> None:
+        """Wait seconds before fetching again, giving up meanwhile the slot on the host that
+        the calling thread holds, if any
+        """
+        host_slot: Optional[HostSlot] = getattr(_held_host_slots, 'host_slot', None)
+        if host_slot is None:
+            self.wait(seconds)
+            return
+        host_slot.release()
+        try:
+            self.wait(seconds)
+        finally:
+            host_slot.acquire()
+
+    def fetch(self, url: str, fetch_once: Callable[[], Fetched]) -> Fetched:
+        """Returns the result of fetch_once for the feed at url, following the policy
+        CircuitOpenError: If the feed is skipped by the circuit breaker
+        """
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.check(url)
+        token_bucket: Optional[TokenBucket] = self._get_token_bucket(url)
+        attempt: int = 0
+        while True:
+            if token_bucket is not None:
+                self._count('rate_limited_seconds', token_bucket.acquire())
+            fetched: Fetched = fetch_once()
+            failed: bool = fetched.status is None or fetched.status >= 400
+            if not failed or attempt >= self.retries or (
+                fetched.status is not None and fetched.status not in RETRYABLE_STATUSES):
+                break
+            self._wait_for_retry(self._get_retry_delay(fetched, attempt))
+            self._count('retries')
+            attempt += 1
+        if self.circuit_breaker is not None:
+            if failed:
+                self.circuit_breaker.record_failure(url)
+            else:
+                self.circuit_breaker.record_success(url)
+        if failed:
+            self._count('failures')
+        return fetched
+
+    def get_statistics(self) -> dict[str, float]:
+        """Returns counters of retries, failed fetches and seconds waited for rate limits,
+        and of the circuit breaker if any
+        """
+        with self.lock:
+            statistics: dict[str, float] = dict(self.counters)
+        statistics['rate_limited_seconds'] = round(statistics['rate_limited_seconds'], 3)
+        if self.circuit_breaker is not None:
+            statistics.update(self.circuit_breaker.get_statistics())
+        return statistics
+
+    def close(self) -> None:
+        """Close the circuit breaker if any"""
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.close()
@@ -0,0 +1,233 @@
+"""Tests for module fetchpolicy
+"""
+import os
+import tempfile
+import unittest
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from fetchpolicy import CircuitBreaker, CircuitOpenError, FetchPolicy, TokenBucket
+from fetchpolicy import holding_host_slot
+
+@dataclass
+class MockFetchResult:
+    """ Implementation of the FetchResult protocol. Used for testing purposes. """
+    status: Optional[int]
+    headers: dict[str, str] = field(default_factory=dict)
+
+class MockClock:
+    """Clock advanced by hand, and by waiting. Used for testing purposes.
+    """
+    def __init__(self) -> None:
+        self.now: float = 1000.0
+        self.waits: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def wait(self, seconds: float) -> None:
+        """Record seconds waited and advance the clock by them"""
+        self.waits.append(seconds)
+        self.now += seconds
+
+def _fetch_results(*statuses: Optional[int]) -> Callable[[], MockFetchResult]:
+    """Returns a fetch function returning results with each of statuses in turn
+    """
+    results: list[MockFetchResult] = [MockFetchResult(status) for status in statuses]
+    return lambda: results.pop(0)
+
+class TestTokenBucket(unittest.TestCase):
+    """Tests for class TokenBucket
+    """
+    def test_acquire_waits_for_tokens(self) -> None:
+        """Verify a burst is allowed without waiting and later requests wait for the rate
+        """
+        clock: MockClock = MockClock()
+        token_bucket: TokenBucket = TokenBucket(2.0, burst=2, now=clock, wait=clock.wait)
+        actual_result: list[float] = [token_bucket.acquire() for _ in range(4)]
+        self.assertEqual(actual_result, [0.0, 0.0, 0.5, 0.5])
+        clock.now += 10
+        self.assertEqual(token_bucket.acquire(), 0.0)
+
+    def test_acquire_reserves_tokens_for_concurrent_callers(self) -> None:
+        """Verify callers taking tokens before the clock moves wait in turn
+        """
+        clock: MockClock = MockClock()
+        token_bucket: TokenBucket = TokenBucket(1.0, now=clock, wait=lambda seconds: None)
+        actual_result: list[float] = [token_bucket.acquire() for _ in range(3)]
+        self.assertEqual(actual_result, [0.0, 1.0, 2.0])
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Tests for class CircuitBreaker
+    """
+    def test_circuit_opens_after_failure_threshold(self) -> None:
+        """Verify a feed is skipped after failing failure_threshold times in a row, until
+        its cooldown ends
+        """
+        clock: MockClock = MockClock()
+        circuit_breaker: CircuitBreaker = CircuitBreaker(
+            failure_threshold=2, cooldown=60, now=clock)
+        circuit_breaker.record_failure('http://a.lnk')
+        circuit_breaker.check('http://a.lnk')
+        circuit_breaker.record_failure('http://a.lnk')
+        with self.assertRaises(CircuitOpenError):
+            circuit_breaker.check('http://a.lnk')
+        circuit_breaker.check('http://b.lnk')
+        self.assertEqual(circuit_breaker.get_statistics(), {'skipped': 1, 'failing': 1, 'open': 1})
+        clock.now += 60
+        circuit_breaker.check('http://a.lnk')
+        self.assertEqual(circuit_breaker.get_statistics()['open'], 0)
+        circuit_breaker.close()
+
+    def test_cooldown_doubles_up_to_max_cooldown(self) -> None:
+        """Verify each further failure doubles the cooldown, up to max_cooldown
+        """
+        clock: MockClock = MockClock()
+        circuit_breaker: CircuitBreaker = CircuitBreaker(
+            failure_threshold=1, cooldown=60, max_cooldown=200, now=clock)
+        actual_result: list[float] = []
+        for _ in range(4):
+            circuit_breaker.record_failure('http://a.lnk')
+            actual_result.append(circuit_breaker._get_failures('http://a.lnk')[1] - clock.now) #pylint: disable=protected-access
+        self.assertEqual(actual_result, [60, 120, 200, 200])
+        circuit_breaker.close()
+
+    def test_record_success_forgets_failures(self) -> None:
+        """Verify a success resets the count of failures in a row
+        """
+        circuit_breaker: CircuitBreaker = CircuitBreaker(failure_threshold=2)
+        circuit_breaker.record_failure('http://a.lnk')
+        circuit_breaker.record_success('http://a.lnk')
+        circuit_breaker.record_success('http://b.lnk')
+        circuit_breaker.record_failure('http://a.lnk')
+        circuit_breaker.check('http://a.lnk')
+        self.assertEqual(circuit_breaker.get_statistics()['failing'], 1)
+        circuit_breaker.close()
+
+    def test_failures_persist_across_instances(self) -> None:
+        """Verify an open circuit stored in a file is still open in a later run
+        """
+        with tempfile.TemporaryDirectory() as breaker_dir:
+            path: str = os.path.join(breaker_dir, 'breaker.db')
+            circuit_breaker: CircuitBreaker = CircuitBreaker(path, failure_threshold=1)
+            circuit_breaker.record_failure('http://a.lnk')
+            circuit_breaker.close()
+            circuit_breaker = CircuitBreaker(path, failure_threshold=1)
+            with self.assertRaises(CircuitOpenError):
+                circuit_breaker.check('http://a.lnk')
+            circuit_breaker.close()
+
+    def test_failures_shared_between_instances(self) -> None:
+        """Verify failures recorded by instances sharing a file add up, so a feed failing in
+        two processes at once has its circuit opened, and a success in either forgets them
+        """
+        with tempfile.TemporaryDirectory() as breaker_dir:
+            path: str = os.path.join(breaker_dir, 'breaker.db')
+            circuit_breakers: list[CircuitBreaker] = [
+                CircuitBreaker(path, failure_threshold=2) for _ in range(2)]
+            circuit_breakers[0].record_failure('http://a.lnk')
+            circuit_breakers[1].record_failure('http://a.lnk')
+            circuit_breakers[0].record_failure('http://b.lnk')
+            with self.assertRaises(CircuitOpenError):
+                circuit_breakers[0].check('http://a.lnk')
+            self.assertEqual(circuit_breakers[1].get_statistics(),
+                {'skipped': 0, 'failing': 2, 'open': 1})
+            circuit_breakers[1].record_success('http://b.lnk')
+            self.assertEqual(circuit_breakers[0].get_statistics()['failing'], 1)
+            circuit_breaker: CircuitBreaker
+            for circuit_breaker in circuit_breakers:
+                circuit_breaker.close()
+
+class TestFetchPolicy(unittest.TestCase):
+    """Tests for class FetchPolicy
+    """
+    def test_fetch_retries_temporary_failures(self) -> None:
+        """Verify unreachable feeds and retryable statuses are fetched again after a backoff
+        no longer than max_backoff
+        """
+        clock: MockClock = MockClock()
+        fetch_policy: FetchPolicy = FetchPolicy(retries=3, backoff=1, max_backoff=1.5,
+            wait=clock.wait)
+        actual_result: MockFetchResult = fetch_policy.fetch(
+            'http://a.lnk', _fetch_results(None, 503, 500, 200))
+        self.assertEqual(actual_result.status, 200)
+        self.assertEqual(len(clock.waits), 3)
+        self.assertTrue(all(0 <= seconds <= 1.5 for seconds in clock.waits))
+        self.assertEqual(fetch_policy.get_statistics(),
+            {'retries': 3, 'failures': 0, 'rate_limited_seconds': 0})
+
+    def test_fetch_gives_up_after_retries(self) -> None:
+        """Verify the last failed result is returned once retries are used up
+        """
+        fetch_policy: FetchPolicy = FetchPolicy(retries=1, wait=lambda seconds: None)
+        actual_result: MockFetchResult = fetch_policy.fetch(
+            'http://a.lnk', _fetch_results(502, 504))
+        self.assertEqual(actual_result.status, 504)
+        self.assertEqual(fetch_policy.get_statistics()['failures'], 1)
+
+    def test_fetch_does_not_retry_permanent_failures(self) -> None:
+        """Verify a status that is not temporary is returned without retrying
+        """
+        fetch_policy: FetchPolicy = FetchPolicy(wait=lambda seconds: None)
+        actual_result: MockFetchResult = fetch_policy.fetch('http://a.lnk', _fetch_results(404))
+        self.assertEqual(actual_result.status, 404)
+        self.assertEqual(fetch_policy.get_statistics()['retries'], 0)
+
+    def test_fetch_honours_retry_after(self) -> None:
+        """Verify the delay asked for with Retry-After is waited, capped at max_backoff
+        """
+        clock: MockClock = MockClock()
+        fetch_policy: FetchPolicy = FetchPolicy(retries=2, max_backoff=5, wait=clock.wait)
+        results: list[MockFetchResult] = [MockFetchResult(429, {'retry-after': '2'}),
+            MockFetchResult(429, {'retry-after': '60'}), MockFetchResult(200)]
+        fetch_policy.fetch('http://a.lnk', lambda: results.pop(0))
+        self.assertEqual(clock.waits, [2.0, 5.0])
+
+    def test_fetch_gives_up_host_slot_while_waiting_to_retry(self) -> None:
+        """Verify the host slot held by the calling thread is given up while waiting to retry
+        and taken again before fetching
+        """
+        calls: list[str] = []
+        class MockHostSlot:
+            """Implementation of the HostSlot protocol recording calls"""
+            @staticmethod
+            def release() -> None:
+                """Record the slot was given up"""
+                calls.append('release')
+
+            @staticmethod
+            def acquire() -> None:
+                """Record the slot was taken again"""
+                calls.append('acquire')
+        fetch_policy: FetchPolicy = FetchPolicy(retries=1,
+            wait=lambda seconds: calls.append('wait'))
+        results: Callable[[], MockFetchResult] = _fetch_results(503, 200)
+        def fetch_once() -> MockFetchResult:
+            calls.append('fetch')
+            return results()
+        with holding_host_slot(MockHostSlot()):
+            fetch_policy.fetch('http://a.lnk', fetch_once)
+        self.assertEqual(calls, ['fetch', 'release', 'wait', 'acquire', 'fetch'])
+
+    def test_fetch_limits_rate_per_host(self) -> None:
+        """Verify requests to the same host wait for the rate limit and other hosts do not
+        """
+        fetch_policy: FetchPolicy = FetchPolicy(rate_limit=1000, wait=lambda seconds: None)
+        url: str
+        for url in ('http://a.lnk/1', 'http://A.lnk/2', 'http://b.lnk/1'):
+            fetch_policy.fetch(url, _fetch_results(200))
+        self.assertEqual(sorted(fetch_policy.token_buckets), ['a.lnk', 'b.lnk'])
+        self.assertGreater(fetch_policy.get_statistics()['rate_limited_seconds'], 0)
+
+    def test_fetch_skips_feed_with_open_circuit(self) -> None:
+        """Verify a feed that keeps failing is skipped without fetching, and a success
+        is recorded with the circuit breaker
+        """
+        fetch_policy: FetchPolicy = FetchPolicy(retries=0,
+            circuit_breaker=CircuitBreaker(failure_threshold=1))
+        fetch_policy.fetch('http://ok.lnk', _fetch_results(200))
+        fetch_policy.fetch('http://down.lnk', _fetch_results(None))
+        with self.assertRaises(CircuitOpenError):
+            fetch_policy.fetch('http://down.lnk', _fetch_results())
+        self.assertEqual(fetch_policy.get_statistics(), {'retries': 0, 'failures': 1,
+            'rate_limited_seconds': 0, 'skipped': 1, 'failing': 1, 'open': 1})
+        fetch_policy.close()
@@ -0,0 +1,329 @@
+"""httpclient: HTTP client keeping connections open between requests to the same host,
+negotiating compressed responses, which can also be read as they are downloaded
+"""
+import socket
+import ssl
+import zlib
+from dataclasses import dataclass, field
+from functools import partial
+from gzip import decompress as gzip_decompress
+from http.client import HTTPConnection, HTTPException, HTTPResponse, HTTPSConnection
+from io import RawIOBase
+from threading import Lock
+from typing import Any, Callable, Optional
+from urllib.parse import urljoin, urlsplit
+
+DEFAULT_MAX_IDLE_CONNECTIONS_PER_HOST: int = 2
+MAX_REDIRECTS: int = 5
+REDIRECT_STATUSES: frozenset[int] = frozenset((301, 302, 303, 307, 308))
+ACCEPT_ENCODING: str = 'gzip, deflate'
+
+ConnectionKey = tuple[str, str, int]
+
+def decode_content(content: bytes, content_encoding: str) -> bytes:
+    """Return content decompressed according to content_encoding, or as it is if it
+    is not compressed or cannot be decompressed
+    """
+    try:
+        if content_encoding == 'gzip':
+            return gzip_decompress(content)
+        if content_encoding == 'deflate':
+            try:
+                return zlib.decompress(content)
+            except zlib.error:
+                return zlib.decompress(content, -zlib.MAX_WBITS)
+    except (OSError, EOFError, zlib.error):
+        pass
+    return content
+
+def _get_response_headers(response: HTTPResponse) -> dict[str, str]:
+    """Return the headers of response, with names in lower case
+    """
+    return {name.lower(): value for name, value in response.getheaders()}
+
+class HTTPClientStream(RawIOBase): # pylint: disable=too-many-instance-attributes
+    """Binary stream of the content of an HTTP response, decompressed as it is downloaded,
+    with the status, final url and headers of the response, header names in lower case.
+    release is called once the content has been read to the end, to keep the connection
+    for reuse, while the connection is closed if the stream is closed before.
+    """
+    def __init__(self, response: HTTPResponse, url: str, connection: HTTPConnection,
+    release: Callable[[], None]) -> None:
+        """Build an HTTPClientStream reading the content of response, received for url
+        over connection
+        """
+        super().__init__()
+        self.response: HTTPResponse = response
+        self.status: int = response.status
+        self.url: str = url
+        self.headers: dict[str, str] = _get_response_headers(response)
+        self.content_encoding: str = self.headers.pop('content-encoding', '')
+        self.connection: Optional[HTTPConnection] = connection
+        self.release: Callable[[], None] = release
+        self.decompressor: Any = None
+        if self.content_encoding == 'gzip':
+            self.decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif self.content_encoding == 'deflate':
+            self.decompressor = zlib.decompressobj()
+        self.pending: bytes = b''
+        self.downloaded_bytes: int = 0
+
+    def readable(self) -> bool:
+        """Returns True as the stream can be read"""
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        """Read content into buffer, downloading more as needed, and return the number of
+        bytes read, 0 at the end of the content
+        OSError: If the content cannot be downloaded or decompressed
+        """
+        while not self.pending and self.connection is not None:
+            self.pending = self._download(len(buffer))
+        size: int = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+    def _download(self, size: int) -> bytes:
+        """Returns the next decompressed part of the content, which may be empty, from at
+        most size bytes downloaded, keeping the connection for reuse at the end of the content
+        """
+        try:
+            content: bytes = self.response.read1(size)
+            if not content:
+                # the response is done with, so the connection can send another request
+                self.response.close()
+                self.connection = None
+                self.release()
+                return b'' if self.decompressor is None else self.decompressor.flush()
+            self.downloaded_bytes += len(content)
+            if self.decompressor is None:
+                return content
+            try:
+                return self.decompressor.decompress(content)
+            except zlib.error:
+                # some servers send deflate content without its zlib header
+                if self.content_encoding != 'deflate' or self.downloaded_bytes != len(content):
+                    raise
+                self.decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                return self.decompressor.decompress(content)
+        except (HTTPException, zlib.error) as error:
+            self.close()
+            raise OSError(f'Content could not be read: {error!r}') from error
+        except OSError:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """Close the stream, and its connection unless the content was read to the end"""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+        super().close()
+
+@dataclass
+class HTTPClientResponse:
+    """ Representation of a complete HTTP response, with content decompressed and
+    header names in lower case """
+    status: int
+    url: str
+    headers: dict[str, str] = field(default_factory=dict)
+    content: bytes = b''
+    downloaded_bytes: int = 0
+
+class PooledHTTPClient: # pylint: disable=too-many-instance-attributes
+    """HTTP/1.1 client shared by all loading threads. Connections are kept open after each
+    response and reused by the next request to the same host, up to
+    max_idle_connections_per_host idle connections per host. Redirects are followed.
+    """
+    def __init__(self,
+    max_idle_connections_per_host: int=DEFAULT_MAX_IDLE_CONNECTIONS_PER_HOST,
+    timeout: Optional[float]=None) -> None:
+        """Build a PooledHTTPClient, with optional parameter timeout in seconds for
+        connecting and each read, or the socket default timeout if None
+        """
+        self.max_idle_connections_per_host: int = max_idle_connections_per_host
+        self.timeout: Optional[float] = timeout
+        self.lock: Lock = Lock()
+        self.idle_connections: dict[ConnectionKey, list[HTTPConnection]] = {}
+        self.ssl_context: Optional[ssl.SSLContext] = None
+        self.opened: int = 0
+        self.reused: int = 0
+        self.requests: int = 0
+
+    @staticmethod
+    def _get_connection_key(url: str) -> ConnectionKey:
+        """Returns scheme, host and port of url
+        ValueError: If url is not an HTTP(S) URL
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError(f'Not an HTTP URL: {url}')
+        return parts.scheme, parts.hostname, parts.port or (
+            443 if parts.scheme == 'https' else 80)
+
+    def _open_connection(self, connection_key: ConnectionKey) -> HTTPConnection:
+        """Returns a new connection to the host of connection_key
+        """
+        timeout: Optional[float] = (
+            socket.getdefaulttimeout() if self.timeout is None else self.timeout)
+        scheme: str
+        host: str
+        port: int
+        scheme, host, port = connection_key
+        with self.lock:
+            self.opened += 1
+        if scheme == 'https':
+            return HTTPSConnection(host, port, timeout=timeout, context=self._get_ssl_context())
+        return HTTPConnection(host, port, timeout=timeout)
+
+    def _get_ssl_context(self) -> ssl.SSLContext:
+        """Returns the SSL context of HTTPS connections, created when first needed as loading
+        the trusted certificates takes a while
+        """
+        with self.lock:
+            if self.ssl_context is None:
+                self.ssl_context = ssl.create_default_context()
+            return self.ssl_context
+
+    def _take_idle_connection(self, connection_key: ConnectionKey) -> Optional[HTTPConnection]:
+        """Returns an idle connection to the host of connection_key, or None
+        """
+        with self.lock:
+            idle_connections: list[HTTPConnection] = self.idle_connections.get(connection_key, [])
+            if not idle_connections:
+                return None
+            self.reused += 1
+            return idle_connections.pop()
+
+    def _release_connection(self, connection_key: ConnectionKey, connection: HTTPConnection,
+    response: HTTPResponse) -> None:
+        """Keep connection for reuse unless the server closes it or enough are kept already
+        """
+        with self.lock:
+            idle_connections: list[HTTPConnection] = self.idle_connections.setdefault(
+                connection_key, [])
+            if not response.will_close and (
+                len(idle_connections) < self.max_idle_connections_per_host):
+                idle_connections.append(connection)
+                return
+        connection.close()
+
+    def _send_request(self, url: str,
+    headers: dict[str, str]) -> tuple[ConnectionKey, HTTPConnection, HTTPResponse]:
+        """Returns the connection key, connection and response to a GET request for url,
+        without reading the content of the response or following redirects.
+        A kept connection the server has since closed is replaced by a new one.
+        """
+        connection_key: ConnectionKey = PooledHTTPClient._get_connection_key(url)
+        parts = urlsplit(url)
+        target: str = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        connection: Optional[HTTPConnection] = self._take_idle_connection(connection_key)
+        while True:
+            reused: bool = connection is not None
+            if connection is None:
+                connection = self._open_connection(connection_key)
+            try:
+                connection.request('GET', target, headers=headers)
+                response: HTTPResponse = connection.getresponse()
+                break
+            except (HTTPException, ConnectionError):
+                connection.close()
+                if not reused:
+                    raise
+                connection = None
+            except OSError:
+                connection.close()
+                raise
+        with self.lock:
+            self.requests += 1
+        return connection_key, connection, response
+
+    def _read_content(self, connection_key: ConnectionKey, connection: HTTPConnection,
+    response: HTTPResponse) -> bytes:
+        """Returns the whole content of response, as downloaded, then keeps connection for
+        reuse
+        """
+        try:
+            content: bytes = response.read()
+        except (HTTPException, OSError):
+            connection.close()
+            raise
+        self._release_connection(connection_key, connection, response)
+        return content
+
+    def _request(self, url: str, headers: dict[str, str]) -> HTTPClientResponse:
+        """Returns the response to a GET request for url, without following redirects
+        """
+        connection_key: ConnectionKey
+        connection: HTTPConnection
+        response: HTTPResponse
+        connection_key, connection, response = self._send_request(url, headers)
+        content: bytes = self._read_content(connection_key, connection, response)
+        response_headers: dict[str, str] = _get_response_headers(response)
+        return HTTPClientResponse(response.status, url, response_headers,
+            decode_content(content, response_headers.pop('content-encoding', '')), len(content))
+
+    @staticmethod
+    def _get_request_headers(headers: Optional[dict[str, str]]) -> dict[str, str]:
+        """Returns the headers of every request with the extra request headers
+        """
+        request_headers: dict[str, str] = {'Accept-Encoding': ACCEPT_ENCODING}
+        request_headers.update(headers or {})
+        return request_headers
+
+    def get(self, url: str, headers: Optional[dict[str, str]]=None) -> HTTPClientResponse:
+        """Returns the response to a GET request for url with extra request headers,
+        following redirects
+        ValueError: If url is not an HTTP(S) URL
+        OSError, HTTPException: If the server cannot be reached or its response is invalid
+        """
+        request_headers: dict[str, str] = PooledHTTPClient._get_request_headers(headers)
+        response: HTTPClientResponse = self._request(url, request_headers)
+        redirects: int = 0
+        while response.status in REDIRECT_STATUSES and 'location' in response.headers and (
+            redirects < MAX_REDIRECTS):
+            redirects += 1
+            response = self._request(urljoin(response.url, response.headers['location']),
+                request_headers)
+        return response
+
+    def open(self, url: str, headers: Optional[dict[str, str]]=None) -> HTTPClientStream:
+        """Returns the response to a GET request for url with extra request headers,
+        following redirects, as a stream of its content read as it is downloaded. The
+        connection is kept for reuse once the stream has been read to the end.
+        ValueError: If url is not an HTTP(S) URL
+        OSError, HTTPException: If the server cannot be reached or its response is invalid
+        """
+        request_headers: dict[str, str] = PooledHTTPClient._get_request_headers(headers)
+        redirects: int = 0
+        connection_key: ConnectionKey
+        connection: HTTPConnection
+        response: HTTPResponse
+        while True:
+            connection_key, connection, response = self._send_request(url, request_headers)
+            location: Optional[str] = response.getheader('location')
+            if response.status not in REDIRECT_STATUSES or location is None or (
+                redirects >= MAX_REDIRECTS):
+                return HTTPClientStream(response, url, connection, partial(
+                    self._release_connection, connection_key, connection, response))
+            self._read_content(connection_key, connection, response)
+            redirects += 1
+            url = urljoin(url, location)
+
+    def get_statistics(self) -> dict[str, int]:
+        """Returns counters of requests sent and connections opened and reused
+        """
+        with self.lock:
+            return {'requests': self.requests, 'opened': self.opened, 'reused': self.reused}
+
+    def close(self) -> None:
+        """Close all idle connections"""
+        with self.lock:
+            connections: list[HTTPConnection] = [connection
+                for idle_connections in self.idle_connections.values()
+                for connection in idle_connections]
+            self.idle_connections.clear()
+        connection: HTTPConnection
+        for connection in connections:
+            connection.close()
@@ -0,0 +1,194 @@
+"""Tests for module httpclient
+"""
+import gzip
+import unittest
+import zlib
+from functools import partial
+from http.client import HTTPConnection, HTTPSConnection, IncompleteRead
+from typing import Optional
+from feedfixtures import FeedFixtureServer, generate_feed
+from httpclient import HTTPClientResponse, HTTPClientStream, PooledHTTPClient, decode_content
+
+class BrokenConnection:
+    """Mock of a kept connection failing when used, as when the server has closed it.
+    Used for testing purposes.
+    """
+    def __init__(self, error: OSError) -> None:
+        self.error: OSError = error
+        self.closed: bool = False
+
+    def request(self, *args: object, **kwargs: object) -> None:
+        """Fail to send a request"""
+        raise self.error
+
+    def close(self) -> None:
+        """Pretend to close the connection"""
+        self.closed = True
+
+class MockResponse:
+    """Mock of an HTTP response whose content is downloaded in parts, then raising error
+    if any. Used for testing purposes.
+    """
+    def __init__(self, parts: list[bytes], content_encoding: str,
+    error: Optional[Exception]=None) -> None:
+        self.status: int = 200
+        self.parts: list[bytes] = parts
+        self.content_encoding: str = content_encoding
+        self.error: Optional[Exception] = error
+
+    def getheaders(self) -> list[tuple[str, str]]:
+        """Returns the headers of the response"""
+        return [('Content-Encoding', self.content_encoding)]
+
+    @staticmethod
+    def close() -> None:
+        """Nothing to close"""
+
+    def read1(self, size: int) -> bytes: # pylint: disable=unused-argument
+        """Returns the next part of the content"""
+        if not self.parts and self.error is not None:
+            raise self.error
+        return self.parts.pop(0) if self.parts else b''
+
+    def read(self) -> bytes:
+        """Returns the whole content"""
+        return b''.join(iter(partial(self.read1, -1), b''))
+
+def _open_stream(response: MockResponse) -> tuple[HTTPClientStream, BrokenConnection, list[bool]]:
+    """Returns a stream of response, its connection and a list recording its release"""
+    connection: BrokenConnection = BrokenConnection(BrokenPipeError())
+    released: list[bool] = []
+    stream: HTTPClientStream = HTTPClientStream(response, 'http://a.lnk', connection, # type: ignore
+        lambda: released.append(True))
+    return stream, connection, released
+
+class TestPooledHTTPClient(unittest.TestCase):
+    """Tests for module httpclient members including class PooledHTTPClient
+    """
+    def test_decode_content(self) -> None:
+        """Verify gzip and deflate content is decompressed and other content kept as is
+        """
+        self.assertEqual(decode_content(gzip.compress(b'feed'), 'gzip'), b'feed')
+        self.assertEqual(decode_content(zlib.compress(b'feed'), 'deflate'), b'feed')
+        self.assertEqual(decode_content(zlib.compress(b'feed')[2:-4], 'deflate'), b'feed')
+        self.assertEqual(decode_content(b'feed', 'gzip'), b'feed')
+        self.assertEqual(decode_content(b'feed', ''), b'feed')
+        self.assertEqual(decode_content(b'feed', 'br'), b'feed')
+
+    def test_get_reuses_connections(self) -> None:
+        """Verify requests to the same host reuse one kept connection and compressed
+        content is decompressed
+        """
+        http_client: PooledHTTPClient = PooledHTTPClient()
+        content: bytes = generate_feed(5)
+        with FeedFixtureServer(compress=True) as server:
+            url: str = server.add_feed('/feed', content)
+            responses: list[HTTPClientResponse] = [http_client.get(url) for _ in range(3)]
+            http_client.close()
+        self.assertEqual([response.content for response in responses], [content] * 3)
+        self.assertLess(responses[0].downloaded_bytes, len(content))
+        self.assertNotIn('content-encoding', responses[0].headers)
+        self.assertEqual(http_client.get_statistics(), {'requests': 3, 'opened': 1, 'reused': 2})
+
+    def test_get_follows_redirects(self) -> None:
+        """Verify redirects are followed and the final URL is reported
+        """
+        http_client: PooledHTTPClient = PooledHTTPClient()
+        with FeedFixtureServer() as server:
+            url: str = server.add_feed('/feed', b'<rss/>')
+            response: HTTPClientResponse = http_client.get(server.add_redirect('/old', '/feed'))
+            missing_response: HTTPClientResponse = http_client.get(url + '/missing')
+            http_client.close()
+        self.assertEqual((response.status, response.url, response.content), (200, url, b'<rss/>'))
+        self.assertEqual(missing_response.status, 404)
+
+    def test_get_replaces_closed_connection(self) -> None:
+        """Verify a kept connection closed by the server is replaced by a new one, while
+        other errors are raised
+        """
+        http_client: PooledHTTPClient = PooledHTTPClient(max_idle_connections_per_host=0)
+        with FeedFixtureServer() as server:
+            url: str = server.add_feed('/feed', b'<rss/>')
+            broken_connection: BrokenConnection = BrokenConnection(BrokenPipeError())
+            http_client.idle_connections[
+                PooledHTTPClient._get_connection_key(url)] = [broken_connection] # type: ignore #pylint: disable=protected-access
+            self.assertEqual(http_client.get(url).content, b'<rss/>')
+            self.assertTrue(broken_connection.closed)
+            timed_out_connection: BrokenConnection = BrokenConnection(TimeoutError())
+            http_client.idle_connections[
+                PooledHTTPClient._get_connection_key(url)] = [timed_out_connection] # type: ignore #pylint: disable=protected-access
+            self.assertRaises(TimeoutError, http_client.get, url)
+        self.assertRaises(ConnectionError, http_client.get, url)
+        self.assertRaises(ValueError, http_client.get, 'file:///feed.xml')
+        self.assertEqual(http_client.get_statistics(), {'requests': 1, 'opened': 2, 'reused': 2})
+
+    def test_open_streams_content(self) -> None:
+        """Verify content is streamed decompressed as it is downloaded, after following
+        redirects, and the connection is kept for reuse only if the content was read to the end
+        """
+        http_client: PooledHTTPClient = PooledHTTPClient()
+        content: bytes = generate_feed(5)
+        with FeedFixtureServer(compress=True) as server:
+            url: str = server.add_feed('/feed', content)
+            with http_client.open(server.add_redirect('/old', '/feed')) as stream:
+                self.assertEqual((stream.status, stream.url), (200, url))
+                self.assertNotIn('content-encoding', stream.headers)
+                parts: list[bytes] = list(iter(partial(stream.read, 100), b''))
+            with http_client.open(url) as stream:
+                self.assertTrue(content.startswith(stream.read(100)))
+            with http_client.open(url) as stream:
+                self.assertEqual(stream.read(), content)
+            http_client.close()
+        self.assertEqual(b''.join(parts), content)
+        self.assertLessEqual(max(len(part) for part in parts), 100)
+        self.assertLess(stream.downloaded_bytes, len(content))
+        self.assertEqual(http_client.get_statistics(), {'requests': 4, 'opened': 2, 'reused': 2})
+
+    def test_stream_decompresses_content(self) -> None:
+        """Verify streamed content is decompressed from parts, including deflate content
+        without its zlib header, and the connection is released at the end of the content
+        """
+        compressed: bytes = zlib.compress(b'feed' * 100)
+        content_encoding: str
+        parts: list[bytes]
+        for content_encoding, parts in (('deflate', [compressed[:5], compressed[5:]]),
+            ('deflate', [compressed[2:-4]]), ('gzip', [gzip.compress(b'feed' * 100)]),
+            ('', [b'feed' * 50, b'feed' * 50])):
+            stream: HTTPClientStream
+            released: list[bool]
+            stream, _, released = _open_stream(MockResponse(parts, content_encoding))
+            self.assertTrue(stream.readable())
+            self.assertEqual(stream.read(), b'feed' * 100)
+            self.assertEqual(released, [True])
+
+    def test_stream_errors(self) -> None:
+        """Verify content that cannot be downloaded or decompressed raises OSError and
+        closes the connection, which is not released
+        """
+        response: MockResponse
+        for response in (MockResponse([b'feed'], 'gzip'),
+            MockResponse([], '', IncompleteRead(b'')), MockResponse([], '', TimeoutError())):
+            stream: HTTPClientStream
+            connection: BrokenConnection
+            released: list[bool]
+            stream, connection, released = _open_stream(response)
+            with self.assertRaises(OSError):
+                stream.read()
+            self.assertTrue(connection.closed)
+            self.assertEqual(released, [])
+            self.assertTrue(stream.closed)
+        connection = BrokenConnection(BrokenPipeError())
+        with self.assertRaises(IncompleteRead):
+            PooledHTTPClient()._read_content(('http', 'a.lnk', 80), connection, # type: ignore #pylint: disable=protected-access
+                MockResponse([], '', IncompleteRead(b''))) # type: ignore
+        self.assertTrue(connection.closed)
+
+    def test_open_connection(self) -> None:
+        """Verify HTTPS connections are opened with TLS and given timeout
+        """
+        http_client: PooledHTTPClient = PooledHTTPClient(timeout=5)
+        self.assertIsNone(http_client.ssl_context)
+        connection: HTTPConnection = http_client._open_connection(('https', 'a.lnk', 443)) #pylint: disable=protected-access
+        self.assertIsInstance(connection, HTTPSConnection)
+        self.assertEqual(connection.timeout, 5)
+        self.assertIsNotNone(http_client.ssl_context)
@@ -0,0 +1,98 @@
+"""Benchmark of startup time, from import times reported by python -X importtime and the
+wall time of trivial invocations of the application.
+
+Each measurement runs in a fresh interpreter. The import time of app and of its slowest
+imports is reported, together with whether feedparser, html2text and validators were
+imported, which trivial invocations should not need.
+
+Usage: python importtime_benchmark.py --repeat 10
+"""
+import json
+import subprocess
+import sys
+from argparse import ArgumentParser, Namespace
+from statistics import median
+from time import perf_counter
+from typing import Any, Optional, Sequence
+
+HEAVY_MODULES: tuple[str, ...] = ('feedparser', 'html2text', 'validators')
+INVOCATIONS: dict[str, list[str]] = {
+    'app.py --help': ['app.py', '--help'],
+    'app.py (no URLs)': ['app.py']
+}
+
+def parse_import_times(importtime_output: str) -> dict[str, int]:
+    """Returns cumulative microseconds taken to import each module, from the report written
+    by python -X importtime
+    """
+    import_times: dict[str, int] = {}
+    line: str
+    for line in importtime_output.splitlines():
+        fields: list[str] = line.split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        import_times[fields[2].strip()] = int(fields[1])
+    return import_times
+
+def measure_import_times() -> dict[str, int]:
+    """Returns cumulative microseconds taken to import each module imported by app
+    """
+    completed: subprocess.CompletedProcess = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        capture_output=True, text=True, check=True)
+    return parse_import_times(completed.stderr)
+
+def measure_invocation_seconds(args: list[str]) -> float:
+    """Returns wall seconds taken by the application run with args in a new interpreter
+    """
+    start: float = perf_counter()
+    subprocess.run([sys.executable] + args, capture_output=True, check=True)
+    return perf_counter() - start
+
+def run_benchmark(options: Namespace) -> dict[str, Any]:
+    """Returns median import and invocation times over options.repeat runs
+    """
+    runs: list[dict[str, int]] = [measure_import_times() for _ in range(options.repeat)]
+    module_microseconds: dict[str, float] = {
+        module: median(run.get(module, 0) for run in runs) for module in runs[0]}
+    slowest: list[str] = sorted(
+        (module for module in module_microseconds if module != 'app'),
+        key=lambda module: module_microseconds[module], reverse=True)[:options.top]
+    return {
+        'app_import_ms': module_microseconds['app'] / 1000,
+        'slowest_imports_ms': {
+            module: module_microseconds[module] / 1000 for module in slowest},
+        'heavy_modules_imported': [module for module in HEAVY_MODULES if module in runs[0]],
+        'invocation_seconds': {
+            name: median(measure_invocation_seconds(args) for _ in range(options.repeat))
+            for name, args in INVOCATIONS.items()}
+    }
+
+def print_report(report: dict[str, Any]) -> None:
+    """Print report as a table"""
+    print(f"import app: {report['app_import_ms']:8.1f} ms")
+    module: str
+    milliseconds: float
+    for module, milliseconds in report['slowest_imports_ms'].items():
+        print(f'  {module:<30}{milliseconds:8.1f} ms')
+    print(f"heavy modules imported: {', '.join(report['heavy_modules_imported']) or 'none'}")
+    name: str
+    seconds: float
+    for name, seconds in report['invocation_seconds'].items():
+        print(f'{name:<20}{seconds * 1000:8.1f} ms')
+
+def main(args: Optional[Sequence[str]]=None) -> None:
+    """Run the benchmark with options from the command line"""
+    parser: ArgumentParser = ArgumentParser(description=__doc__.split('\n', 1)[0])
+    parser.add_argument('--repeat', type=int, default=10, help='runs of each measurement')
+    parser.add_argument('--top', type=int, default=10, help='slowest imports shown')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    options: Namespace = parser.parse_args(args)
+    report: dict[str, Any] = run_benchmark(options)
+    if options.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""itemcache: the items converted from every feed as last loaded, by fingerprint of the
+entry each was converted from, so entries unchanged since are reused and only new or
+edited entries are converted again
+"""
+from collections import OrderedDict
+from threading import Lock
+from model import RSSFeedItem
+from feedsnapshots import ItemFingerprint
+
+DEFAULT_MAX_FEEDS: int = 1024
+
+class ConvertedItemCache:
+    """In-memory cache of the RSSFeedItem converted from each entry of the max_feeds feeds
+    loaded most recently, keyed by feed URL then by entry fingerprint. Each load replaces
+    the items of its feed, so entries removed from a feed are forgotten.
+    """
+    def __init__(self, max_feeds: int=DEFAULT_MAX_FEEDS) -> None:
+        """Build a ConvertedItemCache
+        """
+        self.max_feeds: int = max_feeds
+        self.feed_items: OrderedDict[str, dict[ItemFingerprint, RSSFeedItem]] = OrderedDict()
+        self.lock: Lock = Lock()
+        self.reused: int = 0
+        self.converted: int = 0
+
+    def get_items(self, url: str) -> dict[ItemFingerprint, RSSFeedItem]:
+        """Returns the items converted when the feed at url was last loaded, by fingerprint
+        of their entries, empty if it was not loaded before
+        """
+        with self.lock:
+            if url not in self.feed_items:
+                return {}
+            self.feed_items.move_to_end(url)
+            return self.feed_items[url]
+
+    def put_items(self, url: str, items: dict[ItemFingerprint, RSSFeedItem]) -> None:
+        """Replace the items of the feed at url by items just loaded, counting those of
+        entries found in the items replaced as reused and others as converted
+        """
+        with self.lock:
+            cached_items: dict[ItemFingerprint, RSSFeedItem] = self.feed_items.pop(url, {})
+            reused: int = sum(fingerprint in cached_items for fingerprint in items)
+            self.reused += reused
+            self.converted += len(items) - reused
+            self.feed_items[url] = items
+            if len(self.feed_items) > self.max_feeds:
+                self.feed_items.popitem(last=False)
+
+    def get_statistics(self) -> dict[str, int]:
+        """Returns counters of items reused and items converted, and the number of feeds
+        and items currently cached
+        """
+        with self.lock:
+            return {
+                'reused': self.reused,
+                'converted': self.converted,
+                'feeds': len(self.feed_items),
+                'entries': sum(len(items) for items in self.feed_items.values())
+            }
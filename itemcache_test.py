@@ -0,0 +1,28 @@
+"""Tests for module itemcache
+"""
+import unittest
+from model import RSSFeedItem
+from itemcache import ConvertedItemCache
+
+class TestItemCache(unittest.TestCase):
+    """Tests for module itemcache members including class ConvertedItemCache
+    """
+    def test_put_items_replaces_items_of_feed(self) -> None:
+        """Verify items of a feed are replaced on every load, counting those loaded before
+        as reused, and the feeds loaded least recently are forgotten beyond max_feeds
+        """
+        item_cache: ConvertedItemCache = ConvertedItemCache(max_feeds=2)
+        first_item: RSSFeedItem = RSSFeedItem('First', '', 'http://a.lnk/1')
+        second_item: RSSFeedItem = RSSFeedItem('Second', '', 'http://a.lnk/2')
+        self.assertEqual(item_cache.get_items('http://a.lnk'), {})
+        item_cache.put_items('http://a.lnk', {('link:http://a.lnk/1', b'1'): first_item})
+        item_cache.put_items('http://a.lnk', {('link:http://a.lnk/1', b'1'): first_item,
+            ('link:http://a.lnk/2', b'2'): second_item})
+        self.assertEqual(item_cache.get_items('http://a.lnk'),
+            {('link:http://a.lnk/1', b'1'): first_item, ('link:http://a.lnk/2', b'2'): second_item})
+        self.assertEqual(item_cache.get_statistics(),
+            {'reused': 1, 'converted': 2, 'feeds': 1, 'entries': 2})
+        item_cache.put_items('http://b.lnk', {})
+        item_cache.get_items('http://a.lnk')
+        item_cache.put_items('http://c.lnk', {})
+        self.assertEqual(list(item_cache.feed_items), ['http://a.lnk', 'http://c.lnk'])
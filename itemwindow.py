@@ -0,0 +1,65 @@
+"""itemwindow: selection of the items of a feed to be shown, the newest few or those
+published since a given time, made before items are converted so conversion work and
+memory are proportional to the items shown rather than to the length of the feed
+"""
+import heapq
+from calendar import timegm
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Optional
+
+# feedparser fields holding the publication time of an item as a UTC time.struct_time
+_DATE_FIELDS: tuple[str, ...] = ('published_parsed', 'updated_parsed', 'created_parsed')
+
+def get_parsed_rss_feed_item_timestamp(parsed_rss_feed_item: dict[str, Any]) -> Optional[float]:
+    """Return the time a parsed feed item was published, or last updated if it has no
+    publication time, in seconds since the epoch, or None if it is not dated
+    """
+    date_field: str
+    for date_field in _DATE_FIELDS:
+        parsed_date: Any = parsed_rss_feed_item.get(date_field)
+        if parsed_date:
+            try:
+                return float(timegm(parsed_date))
+            except (TypeError, ValueError, OverflowError):
+                continue
+    return None
+
+@dataclass
+class ItemWindow:
+    """Selection of the items of a feed published since a time, with since, and of the
+    max_items newest of those. Items that are not dated are kept by since and come after
+    dated items for max_items, in the order of the feed, which is usually newest first.
+    """
+    max_items: Optional[int] = None
+    since: Optional[float] = None
+
+    def _iter_candidates(self,
+    timestamps: Iterable[Optional[float]]) -> Iterator[tuple[float, int]]:
+        """Yields the publication time and negated index of every item published since, or
+        minus infinity for undated items, so that undated items come after dated ones and
+        earlier items in the feed win ties
+        """
+        item_index: int
+        timestamp: Optional[float]
+        for item_index, timestamp in enumerate(timestamps):
+            if timestamp is None:
+                yield float('-inf'), -item_index
+            elif self.since is None or timestamp >= self.since:
+                yield timestamp, -item_index
+
+    def select(self, parsed_rss_feed_items: list[dict[str, Any]]) -> list[int]:
+        """Returns the indexes of the selected parsed feed items, in the order of the feed.
+        Only the max_items newest items are kept while reading the feed, in a bounded heap,
+        so selecting from a feed of n items takes O(n log max_items) time.
+        """
+        return self.select_timestamps(get_parsed_rss_feed_item_timestamp(parsed_rss_feed_item)
+            for parsed_rss_feed_item in parsed_rss_feed_items)
+
+    def select_timestamps(self, timestamps: Iterable[Optional[float]]) -> list[int]:
+        """Returns the indexes of the selected items of a feed given by their publication
+        times, None for undated items, such as those of a feed loaded before
+        """
+        if self.max_items is None:
+            return [-negated_index for _, negated_index in self._iter_candidates(timestamps)]
+        return sorted(-negated_index for _, negated_index in heapq.nlargest(
+            self.max_items, self._iter_candidates(timestamps)))
@@ -0,0 +1,48 @@
+"""Tests for module itemwindow
+"""
+import time
+import unittest
+from typing import Any
+from itemwindow import ItemWindow, get_parsed_rss_feed_item_timestamp
+
+def _build_items(*timestamps: Any) -> list[dict[str, Any]]:
+    """Returns parsed feed items published at timestamps, undated where a timestamp is None
+    """
+    return [{'title': f'Item {index}'} if timestamp is None else
+        {'title': f'Item {index}', 'published_parsed': time.gmtime(timestamp)}
+        for index, timestamp in enumerate(timestamps)]
+
+class TestItemWindow(unittest.TestCase):
+    """Tests for module itemwindow members including class ItemWindow
+    """
+    def test_get_parsed_rss_feed_item_timestamp(self) -> None:
+        """Verify the publication time is preferred to the update time, and items without
+        either or with an invalid one are not dated
+        """
+        self.assertEqual(get_parsed_rss_feed_item_timestamp(
+            {'published_parsed': time.gmtime(100), 'updated_parsed': time.gmtime(200)}), 100)
+        self.assertEqual(get_parsed_rss_feed_item_timestamp(
+            {'published_parsed': None, 'updated_parsed': time.gmtime(200)}), 200)
+        self.assertIsNone(get_parsed_rss_feed_item_timestamp({'published_parsed': 'Monday'}))
+        self.assertIsNone(get_parsed_rss_feed_item_timestamp({}))
+
+    def test_select_max_items(self) -> None:
+        """Verify the newest items are selected in the order of the feed, with undated items
+        after dated ones and earlier items winning ties
+        """
+        items: list[dict[str, Any]] = _build_items(300, None, 100, 500, 300, None)
+        self.assertEqual(ItemWindow(max_items=2).select(items), [0, 3])
+        self.assertEqual(ItemWindow(max_items=4).select(items), [0, 2, 3, 4])
+        self.assertEqual(ItemWindow(max_items=5).select(items), [0, 1, 2, 3, 4])
+        self.assertEqual(ItemWindow(max_items=10).select(items), [0, 1, 2, 3, 4, 5])
+
+    def test_select_since(self) -> None:
+        """Verify items published before since are dropped, alone or before max_items
+        """
+        items: list[dict[str, Any]] = _build_items(300, None, 100, 500, 300)
+        self.assertEqual(ItemWindow(since=300).select(items), [0, 1, 3, 4])
+        self.assertEqual(ItemWindow(max_items=2, since=400).select(items), [1, 3])
+        self.assertEqual(ItemWindow().select(items), [0, 1, 2, 3, 4])
+        self.assertEqual(ItemWindow(max_items=3).select([]), [])
+        self.assertEqual(ItemWindow(max_items=2, since=400).select_timestamps(
+            [300, None, 100, 500, 300]), [1, 3])
@@ -1,9 +1,14 @@
 """model: Defined data structures for rss-feed-reader"""
 from dataclasses import dataclass
+from typing import Iterable
+
+# Slotted classes have no per-instance __dict__, which keeps many loaded items small.
+# Fields have no defaults as class attributes would clash with the slot descriptors.
 
 @dataclass
 class RSSFeedItem:
     """ Representation of an RSS Feed Item """
+    __slots__ = ('title', 'description', 'link')
     title: str
     description: str
     link: str
@@ -11,7 +16,9 @@ class RSSFeedItem:
 @dataclass
 class RSSFeedChannel:
     """ Representation of an RSS Feed Channel """
+    __slots__ = ('title', 'description', 'link', 'items')
     title: str
     description: str
     link: str
-    items: list[RSSFeedItem]
+    # a list, or a one-shot iterator when items are loaded as they are displayed
+    items: Iterable[RSSFeedItem]
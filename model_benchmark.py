@@ -0,0 +1,57 @@
+"""Benchmark of the memory used per loaded RSSFeedItem.
+Compares the slotted model against an equivalent dataclass with a per-instance __dict__,
+for items loaded from several feeds syndicating the same stories.
+
+Usage: python model_benchmark.py [item count] [feed count]
+"""
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable
+from model import RSSFeedItem
+from feedloaders import _intern_stripped
+
+@dataclass
+class DictRSSFeedItem:
+    """ RSSFeedItem as defined before slots were added, for comparison """
+    title: str
+    description: str
+    link: str
+
+def _build_items(item_factory: Callable[[str, str, str], object],
+text_factory: Callable[[str], str], item_count: int, feed_count: int) -> list[object]:
+    """Build item_count items spread over feed_count feeds carrying the same stories
+    """
+    descriptions: list[str] = [f'Description of story {index}' for index in range(item_count)]
+    return [
+        item_factory(
+            text_factory(f' Story {index % (item_count // feed_count)} '),
+            descriptions[index],
+            text_factory(f' http://news.example.com/story/{index % (item_count // feed_count)} ')
+        )
+        for index in range(item_count)
+    ]
+
+def measure_bytes_per_item(item_factory: Callable[[str, str, str], object],
+text_factory: Callable[[str], str], item_count: int, feed_count: int) -> float:
+    """Returns traced bytes allocated per item, excluding the shared descriptions
+    """
+    tracemalloc.start()
+    baseline: int = tracemalloc.get_traced_memory()[0]
+    items: list[object] = _build_items(item_factory, text_factory, item_count, feed_count)
+    used: int = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    description_bytes: int = sum(sys.getsizeof(item.description) for item in items) # type: ignore
+    return (used - description_bytes) / len(items)
+
+def main(item_count: int=100000, feed_count: int=4) -> None:
+    """Print per-item memory footprint before and after"""
+    before: float = measure_bytes_per_item(DictRSSFeedItem, str.strip, item_count, feed_count)
+    after: float = measure_bytes_per_item(RSSFeedItem, _intern_stripped, item_count, feed_count)
+    print(f'{item_count} items across {feed_count} feeds')
+    print(f'dict dataclass, no interning: {before:8.1f} bytes per item')
+    print(f'slotted dataclass, interned:  {after:8.1f} bytes per item')
+    print(f'saving:                       {100 * (before - after) / before:8.1f} %')
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,160 @@
+"""Benchmark of the fetch, parse, convert and render pipeline against generated feeds
+served from a local HTTP server.
+
+Each stage is timed on its own over all feeds: fetch (HTTP download), parse
+(feedparser.parse), html2text (description conversion with an empty memo cache),
+model (conversion to RSSFeedChannel once descriptions are memoized) and render
+(CLIWriter to the null device). The end to end run of app.main is then timed,
+with the stage durations it reports to its hooks, and run again under tracemalloc
+for its peak memory.
+
+Usage: python pipeline_benchmark.py --feeds 20 --items 200 --latency 0.05
+"""
+import json
+import os
+import sys
+import tracemalloc
+from argparse import ArgumentParser, Namespace
+from time import perf_counter
+from typing import Any, Callable, Optional, Sequence, TypeVar
+import feedparser
+import feedloaders
+import app
+from cli import CLIWriter
+from feedfixtures import FeedFixtureServer, generate_feed
+from feedloaders import FeedParserRSSFeedLoader, HTMLToTextConverter
+from httpclient import PooledHTTPClient
+from model import RSSFeedChannel
+from pipelinestats import PipelineStats
+
+Result = TypeVar('Result')
+
+def _time_stage(stage: Callable[[], Result]) -> tuple[Result, float]:
+    """Returns result of stage and seconds taken to run it
+    """
+    start: float = perf_counter()
+    result: Result = stage()
+    return result, perf_counter() - start
+
+def _fetch(urls: list[str]) -> list[bytes]:
+    """Returns downloaded content of each URL, fetched over kept connections
+    """
+    http_client: PooledHTTPClient = PooledHTTPClient()
+    content_list: list[bytes] = [http_client.get(url).content for url in urls]
+    http_client.close()
+    return content_list
+
+def _convert_descriptions(parsed_feeds: list[dict[str, Any]]) -> int:
+    """Convert every item description to text, returning the number converted
+    """
+    count: int = 0
+    parsed_feed: dict[str, Any]
+    for parsed_feed in parsed_feeds:
+        entry: dict[str, Any]
+        for entry in parsed_feed.get('entries', []):
+            feedloaders.html_to_text_converter.convert(entry.get('description', 'No description'))
+            count += 1
+    return count
+
+def _render(channels: list[RSSFeedChannel]) -> None:
+    """Render channels to the null device
+    """
+    with open(os.devnull, mode='w', encoding='utf-8') as output_stream:
+        cli_writer: CLIWriter = CLIWriter(file=output_stream)
+        channel: RSSFeedChannel
+        for channel in channels:
+            cli_writer.show_rss_feed_content(channel)
+
+def _run_main(urls: list[str], extra_args: list[str]) -> PipelineStats:
+    """Run the application on urls writing to the null device, returning the
+    statistics it reported to its hooks
+    """
+    args: list[str] = [arg for url in urls for arg in ('--url', url)] + extra_args
+    pipeline_stats: PipelineStats = PipelineStats()
+    with open(os.devnull, mode='w', encoding='utf-8') as output_stream:
+        app.main(output_stream=output_stream, args=args, hooks=pipeline_stats)
+    return pipeline_stats
+
+def run_benchmark(options: Namespace) -> dict[str, Any]:
+    """Returns stage timings, throughput and peak memory for the given options
+    """
+    timings: dict[str, float] = {}
+    with FeedFixtureServer(latency=options.latency) as server:
+        urls: list[str] = [
+            server.add_feed(f'/feed/{index}', generate_feed(
+                options.items, options.format, options.description_size,
+                options.html_density, str(index)), options.format)
+            for index in range(options.feeds)
+        ]
+        content_list, timings['fetch'] = _time_stage(lambda: _fetch(urls))
+        parsed_feeds, timings['parse'] = _time_stage(
+            lambda: [feedparser.parse(content) for content in content_list])
+        feedloaders.html_to_text_converter = HTMLToTextConverter(
+            max_entries=options.feeds * options.items)
+        item_count, timings['html2text'] = _time_stage(lambda: _convert_descriptions(parsed_feeds))
+        feedloader: FeedParserRSSFeedLoader = FeedParserRSSFeedLoader('')
+        channels, timings['model'] = _time_stage(lambda: [
+            feedloader._convert_parsed_rss_feed_to_rss_feed_channel(parsed_feed) #pylint: disable=protected-access
+            for parsed_feed in parsed_feeds])
+        _, timings['render'] = _time_stage(lambda: _render(channels))
+
+        feedloaders.html_to_text_converter = HTMLToTextConverter()
+        pipeline_stats, timings['end_to_end'] = _time_stage(
+            lambda: _run_main(urls, options.app_args))
+        feedloaders.html_to_text_converter = HTMLToTextConverter()
+        tracemalloc.start()
+        _run_main(urls, options.app_args)
+        peak_memory: int = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    downloaded: int = sum(len(content) for content in content_list)
+    return {
+        'options': {key: value for key, value in vars(options).items() if key != 'json'},
+        'feeds': options.feeds,
+        'items': item_count,
+        'bytes': downloaded,
+        'seconds': timings,
+        'end_to_end_stage_seconds': pipeline_stats.get_totals().seconds,
+        'items_per_second': item_count / timings['end_to_end'],
+        'megabytes_per_second': downloaded / timings['end_to_end'] / 1e6,
+        'peak_memory_bytes': peak_memory
+    }
+
+def print_report(report: dict[str, Any]) -> None:
+    """Print report as a table"""
+    print(f"{report['feeds']} feeds, {report['items']} items, {report['bytes']} bytes")
+    print(f"{'stage':<12}{'seconds':>10}")
+    stage: str
+    seconds: float
+    for stage, seconds in report['seconds'].items():
+        print(f'{stage:<12}{seconds:>10.3f}')
+    print('end to end, summed over feeds: ' + ', '.join(
+        f'{stage} {seconds:.3f}' for stage, seconds in report['end_to_end_stage_seconds'].items()))
+    print(f"throughput  {report['items_per_second']:>10.0f} items/s"
+        f" {report['megabytes_per_second']:.2f} MB/s")
+    print(f"peak memory {report['peak_memory_bytes'] / 1e6:>10.1f} MB")
+
+def main(args: Optional[Sequence[str]]=None) -> None:
+    """Run the benchmark with options from the command line"""
+    parser: ArgumentParser = ArgumentParser(description=__doc__.split('\n', 1)[0])
+    parser.add_argument('--feeds', type=int, default=10, help='number of feeds served')
+    parser.add_argument('--items', type=int, default=100, help='items per feed')
+    parser.add_argument('--format', choices=('rss', 'atom'), default='rss')
+    parser.add_argument('--description-size', type=int, default=500,
+        help='approximate characters per item description')
+    parser.add_argument('--html-density', type=float, default=1.0,
+        help='fraction of item descriptions containing HTML markup')
+    parser.add_argument('--latency', type=float, default=0.0,
+        help='seconds the server waits before each response')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('app_args', nargs='*', default=[],
+        help='extra arguments for the end to end run, after --')
+    options: Namespace = parser.parse_args(args)
+    report: dict[str, Any] = run_benchmark(options)
+    if options.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(report)
+
+if __name__ == '__main__':
+    main()
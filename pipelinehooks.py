@@ -0,0 +1,18 @@
+"""Define the protocol for which all hooks observing the feed loading pipeline will follow
+"""
+from typing import Optional, Protocol
+
+class PipelineHooks(Protocol):
+    """Protocol for which all hooks observing the feed loading pipeline will follow.
+    Stages are 'fetch' (download), 'parse' (feedparser), 'html2text' (conversion of
+    HTML content to text), 'model' (building the RSSFeedChannel) and 'render' (output).
+    Hooks may be called from several threads at once.
+    """
+    def on_stage(self, url: str, stage: str, seconds: float) -> None:
+        """Called when a pipeline stage has completed for the feed at url"""
+
+    def on_feed_loaded(self, url: str, item_count: int, downloaded_bytes: int,
+    cache_outcome: Optional[str]) -> None:
+        """Called when the feed at url has been loaded. cache_outcome is 'hit' if cached
+        content was reused, 'miss' if it was loaded again, or None if no cache is used.
+        """
@@ -0,0 +1,135 @@
+"""pipelinestats: implementation of the PipelineHooks protocol collecting per-feed and
+per-stage statistics, reported as a summary table or as JSON
+"""
+from dataclasses import asdict, dataclass, field
+from threading import Lock
+from time import perf_counter
+from typing import Any, Optional
+from pipelinehooks import PipelineHooks
+
+STAGES: tuple[str, ...] = ('fetch', 'parse', 'html2text', 'model', 'render')
+
+@dataclass
+class FeedStats:
+    """ Statistics of loading and rendering one feed """
+    seconds: dict[str, float] = field(default_factory=dict)
+    item_count: int = 0
+    downloaded_bytes: int = 0
+    cache_outcome: Optional[str] = None
+
+class PipelineStats:
+    """Implements the PipelineHooks protocol by collecting statistics for every feed.
+    Counters from other components, such as cache statistics, can be added for reporting.
+    """
+    def __init__(self) -> None:
+        """Build a PipelineStats, measuring wall time from now
+        """
+        self.feed_stats: dict[str, FeedStats] = {}
+        self.counters: dict[str, dict[str, float]] = {}
+        self.lock: Lock = Lock()
+        self.start: float = perf_counter()
+
+    def _get_feed_stats(self, url: str) -> FeedStats:
+        """Returns statistics of the feed at url, adding them if not collected yet
+        """
+        if url not in self.feed_stats:
+            self.feed_stats[url] = FeedStats()
+        return self.feed_stats[url]
+
+    def on_stage(self, url: str, stage: str, seconds: float) -> None:
+        """Add seconds to the time taken by stage for the feed at url"""
+        with self.lock:
+            stage_seconds: dict[str, float] = self._get_feed_stats(url).seconds
+            stage_seconds[stage] = stage_seconds.get(stage, 0.0) + seconds
+
+    def on_feed_loaded(self, url: str, item_count: int, downloaded_bytes: int,
+    cache_outcome: Optional[str]) -> None:
+        """Record the item count, downloaded bytes and cache outcome for the feed at url"""
+        with self.lock:
+            feed_stats: FeedStats = self._get_feed_stats(url)
+            feed_stats.item_count = item_count
+            feed_stats.downloaded_bytes += downloaded_bytes
+            feed_stats.cache_outcome = cache_outcome
+
+    def add_counters(self, name: str, counters: dict[str, float]) -> None:
+        """Add counters reported by another component under name"""
+        with self.lock:
+            self.counters[name] = dict(counters)
+
+    def get_totals(self) -> FeedStats:
+        """Returns statistics summed over all feeds, with the cache outcome left unset
+        """
+        totals: FeedStats = FeedStats()
+        with self.lock:
+            feed_stats: FeedStats
+            for feed_stats in self.feed_stats.values():
+                stage: str
+                seconds: float
+                for stage, seconds in feed_stats.seconds.items():
+                    totals.seconds[stage] = totals.seconds.get(stage, 0.0) + seconds
+                totals.item_count += feed_stats.item_count
+                totals.downloaded_bytes += feed_stats.downloaded_bytes
+        return totals
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns all statistics as a dict of JSON serializable values
+        """
+        totals: FeedStats = self.get_totals()
+        with self.lock:
+            return {
+                'wall_seconds': perf_counter() - self.start,
+                'totals': asdict(totals),
+                'feeds': {url: asdict(feed_stats) for url, feed_stats in self.feed_stats.items()},
+                'counters': dict(self.counters)
+            }
+
+    @staticmethod
+    def _format_row(name: str, feed_stats: FeedStats) -> str:
+        """Return one row of the summary table
+        """
+        seconds: str = ''.join(f'{feed_stats.seconds.get(stage, 0.0):>10.3f}' for stage in STAGES)
+        return (f'{name[-40:]:<40}{seconds}{feed_stats.downloaded_bytes:>12}'
+            f'{feed_stats.item_count:>8}  {feed_stats.cache_outcome or "-"}')
+
+    def format_summary_table(self) -> str:
+        """Returns statistics as a table of seconds per stage for every feed and in total
+        """
+        totals: FeedStats = self.get_totals()
+        lines: list[str] = [
+            f"{'feed':<40}{''.join(f'{stage:>10}' for stage in STAGES)}"
+            f"{'bytes':>12}{'items':>8}  cache"
+        ]
+        with self.lock:
+            url: str
+            feed_stats: FeedStats
+            for url, feed_stats in self.feed_stats.items():
+                lines.append(PipelineStats._format_row(url, feed_stats))
+            lines.append(PipelineStats._format_row('total', totals))
+            lines.append(f'wall time {perf_counter() - self.start:.3f} seconds')
+            name: str
+            counters: dict[str, float]
+            for name, counters in self.counters.items():
+                values: str = ', '.join(f'{key}={value}' for key, value in counters.items())
+                lines.append(f'{name}: {values}')
+        return '\n'.join(lines)
+
+class PipelineHooksGroup:
+    """Implements the PipelineHooks protocol by passing every call on to several hooks
+    """
+    def __init__(self, hooks_list: list[PipelineHooks]) -> None:
+        """Build a PipelineHooksGroup calling each of hooks_list in turn
+        """
+        self.hooks_list: list[PipelineHooks] = hooks_list
+
+    def on_stage(self, url: str, stage: str, seconds: float) -> None:
+        """Pass completed stage on to every hooks"""
+        hooks: PipelineHooks
+        for hooks in self.hooks_list:
+            hooks.on_stage(url, stage, seconds)
+
+    def on_feed_loaded(self, url: str, item_count: int, downloaded_bytes: int,
+    cache_outcome: Optional[str]) -> None:
+        """Pass loaded feed on to every hooks"""
+        hooks: PipelineHooks
+        for hooks in self.hooks_list:
+            hooks.on_feed_loaded(url, item_count, downloaded_bytes, cache_outcome)
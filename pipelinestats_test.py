@@ -0,0 +1,62 @@
+"""Tests for module pipelinestats
+"""
+import unittest
+from typing import Any
+from pipelinestats import FeedStats, PipelineHooksGroup, PipelineStats
+
+def _build_pipeline_stats() -> PipelineStats:
+    """Returns PipelineStats with two feeds recorded
+    """
+    pipeline_stats: PipelineStats = PipelineStats()
+    pipeline_stats.on_stage('http://a.lnk', 'fetch', 0.5)
+    pipeline_stats.on_stage('http://a.lnk', 'render', 0.25)
+    pipeline_stats.on_stage('http://a.lnk', 'render', 0.25)
+    pipeline_stats.on_feed_loaded('http://a.lnk', 3, 100, 'miss')
+    pipeline_stats.on_stage('http://b.lnk', 'fetch', 1.0)
+    pipeline_stats.on_feed_loaded('http://b.lnk', 2, 0, 'hit')
+    pipeline_stats.add_counters('html_to_text', {'hits': 1})
+    return pipeline_stats
+
+class TestPipelineStats(unittest.TestCase):
+    """Tests for module pipelinestats members including class PipelineStats
+    """
+    def test_get_totals(self) -> None:
+        """Verify stage durations, items and bytes are summed over feeds
+        """
+        actual_result: FeedStats = _build_pipeline_stats().get_totals()
+        expected_result: FeedStats = FeedStats({'fetch': 1.5, 'render': 0.5}, 5, 100)
+        self.assertEqual(actual_result, expected_result)
+
+    def test_to_dict(self) -> None:
+        """Verify statistics are converted to plain values
+        """
+        actual_result: dict[str, Any] = _build_pipeline_stats().to_dict()
+        self.assertEqual(actual_result['feeds']['http://b.lnk'],
+            {'seconds': {'fetch': 1.0}, 'item_count': 2, 'downloaded_bytes': 0,
+            'cache_outcome': 'hit'})
+        self.assertEqual(actual_result['totals']['item_count'], 5)
+        self.assertEqual(actual_result['counters'], {'html_to_text': {'hits': 1}})
+        self.assertGreaterEqual(actual_result['wall_seconds'], 0)
+
+    def test_format_summary_table(self) -> None:
+        """Verify table has a header, a row per feed, a total row and counters
+        """
+        lines: list[str] = _build_pipeline_stats().format_summary_table().split('\n')
+        self.assertTrue(lines[0].startswith('feed'))
+        self.assertTrue(lines[1].startswith('http://a.lnk'))
+        self.assertTrue(lines[1].endswith('miss'))
+        self.assertIn('0.500', lines[1])
+        self.assertTrue(lines[3].startswith('total'))
+        self.assertTrue(lines[3].endswith('-'))
+        self.assertEqual(lines[-1], 'html_to_text: hits=1')
+
+    def test_pipeline_hooks_group(self) -> None:
+        """Verify every call is passed on to all hooks
+        """
+        first: PipelineStats = PipelineStats()
+        second: PipelineStats = PipelineStats()
+        hooks: PipelineHooksGroup = PipelineHooksGroup([first, second])
+        hooks.on_stage('http://a.lnk', 'parse', 1.0)
+        hooks.on_feed_loaded('http://a.lnk', 1, 10, None)
+        self.assertEqual(first.get_totals(), FeedStats({'parse': 1.0}, 1, 10))
+        self.assertEqual(second.get_totals(), first.get_totals())
@@ -0,0 +1,132 @@
+"""queueworker: load the feeds claimed from a feed queue shared with other workers, show
+them and store them in a result store shared with the other workers
+"""
+from threading import Event, Lock, Thread
+from time import sleep, time
+from typing import Callable, Optional
+from model import RSSFeedChannel
+from rssfeedloader import RSSFeedLoader
+from rssfeedreader import RSSFeedReader
+from feedpool import FeedLoaderPool, UnavailableRSSFeedLoader
+from feedqueue import FeedLease, FeedQueue
+from feedresults import FeedResultStore
+from feedwatcher import DEFAULT_REFRESH_INTERVAL, DEFAULT_MIN_INTERVAL, DEFAULT_MAX_INTERVAL
+
+DEFAULT_BATCH_SIZE: int = 16
+DEFAULT_IDLE_WAIT: float = 1.0
+
+class FeedQueueWorker: # pylint: disable=too-many-instance-attributes
+    """Claims due feeds from a shared feed queue in batches, loads them with feedloader_pool
+    and schedules each again after the interval the feed asked for, or the default interval,
+    between min_interval and max_interval. A feed that failed is retried after min_interval,
+    doubling with each further failure up to max_interval. While a batch loads, the leases
+    on its feeds still loading are renewed every half lease, so slow feeds are not claimed
+    by another worker meanwhile.
+    """
+    def __init__(self, feed_queue: FeedQueue, feedloader_pool: FeedLoaderPool, # pylint: disable=too-many-arguments
+    rss_feed_reader: RSSFeedReader, worker_id: str,
+    result_store: Optional[FeedResultStore]=None, batch_size: int=DEFAULT_BATCH_SIZE,
+    default_interval: float=DEFAULT_REFRESH_INTERVAL, min_interval: float=DEFAULT_MIN_INTERVAL,
+    max_interval: float=DEFAULT_MAX_INTERVAL, skip_unchanged: bool=False,
+    now: Callable[[], float]=time, wait: Callable[[float], None]=sleep) -> None:
+        """Build a FeedQueueWorker showing loaded feeds with rss_feed_reader and storing them
+        in result_store, if any, as worker_id. With skip_unchanged, channels without any
+        items to show are not shown. Optional parameters now and wait replace the system
+        clock.
+        """
+        self.feed_queue: FeedQueue = feed_queue
+        self.feedloader_pool: FeedLoaderPool = feedloader_pool
+        self.rss_feed_reader: RSSFeedReader = rss_feed_reader
+        self.worker_id: str = worker_id
+        self.result_store: Optional[FeedResultStore] = result_store
+        self.batch_size: int = max(1, batch_size)
+        self.min_interval: float = min_interval
+        self.max_interval: float = max(min_interval, max_interval)
+        self.default_interval: float = self._clamp(default_interval)
+        self.skip_unchanged: bool = skip_unchanged
+        self.now: Callable[[], float] = now
+        self.wait: Callable[[float], None] = wait
+        self.lock: Lock = Lock()
+
+    def _clamp(self, interval: float) -> float:
+        """Return interval limited to between min_interval and max_interval
+        """
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def _finish(self, lease: FeedLease, feedloader: RSSFeedLoader) -> None:
+        """Show the feed loaded for lease, store it with all the items loaded, including
+        those not shown, and schedule its next load
+        """
+        refresh_interval: Optional[float] = None
+        if hasattr(feedloader, 'get_refresh_interval'):
+            refresh_interval = feedloader.get_refresh_interval()
+        loaded_channel: RSSFeedChannel = feedloader.get_rss_feed_channel()
+        # items streamed as they are read are all read first, so a feed read only in part
+        # is known to have failed
+        rss_feed_channel: RSSFeedChannel = RSSFeedChannel(loaded_channel.title,
+            loaded_channel.description, loaded_channel.link, list(loaded_channel.items))
+        failed: bool = isinstance(feedloader, UnavailableRSSFeedLoader) or (
+            hasattr(feedloader, 'has_failed') and feedloader.has_failed())
+        if not (self.skip_unchanged and not rss_feed_channel.items and not failed):
+            self.rss_feed_reader.show_rss_feed_content(rss_feed_channel)
+        if failed:
+            self.feed_queue.release(lease.url, self.now() + self._clamp(
+                self.min_interval * 2 ** min(lease.attempts - 1, 32)))
+            return
+        if self.result_store is not None:
+            if hasattr(feedloader, 'get_loaded_rss_feed_channel'):
+                loaded_channel = feedloader.get_loaded_rss_feed_channel()
+                rss_feed_channel = RSSFeedChannel(loaded_channel.title,
+                    loaded_channel.description, loaded_channel.link, list(loaded_channel.items))
+            self.result_store.put(lease.url, rss_feed_channel, self.worker_id)
+        self.feed_queue.complete(lease.url,
+            self.now() + self._clamp(refresh_interval or self.default_interval))
+
+    def _renew_leases(self, loading: dict[str, FeedLease], done: Event) -> None:
+        """Renew the leases on the feeds in loading every half lease until done is set
+        """
+        if not loading:
+            return
+        renew_interval: float = (min(lease.expires for lease in loading.values())
+            - self.now()) / 2
+        while renew_interval > 0 and not done.wait(renew_interval):
+            with self.lock:
+                urls: list[str] = list(loading)
+            self.feed_queue.renew(urls)
+
+    def run_once(self) -> int:
+        """Claim a batch of due feeds, load, show and store them and schedule their next load.
+        Returns number of feeds claimed.
+        """
+        leases: dict[str, FeedLease] = {
+            lease.url: lease for lease in self.feed_queue.claim(self.batch_size)}
+        loading: dict[str, FeedLease] = dict(leases)
+        done: Event = Event()
+        renewer: Thread = Thread(target=self._renew_leases, args=(loading, done), daemon=True)
+        renewer.start()
+        try:
+            url: str
+            feedloader: RSSFeedLoader
+            for url, feedloader in self.feedloader_pool.load_rss_feeds(list(leases)):
+                with self.lock:
+                    del loading[url]
+                self._finish(leases[url], feedloader)
+        finally:
+            done.set()
+            renewer.join()
+        return len(leases)
+
+    def run(self, watch: bool=False, max_rounds: Optional[int]=None) -> None:
+        """Keep claiming and loading feeds until no feed is due, or with watch, waiting for
+        feeds to become due until interrupted. Feeds due but not claimable, being loaded by
+        other workers or of a host still leased by another worker, are waited for, as they
+        may be claimed by this worker once shards change. Stops after max_rounds batches if
+        given.
+        """
+        rounds: int = 0
+        while max_rounds is None or rounds < max_rounds:
+            rounds += 1
+            if self.run_once() == 0:
+                if not watch and self.feed_queue.count_due_feeds() == 0:
+                    return
+                self.wait(DEFAULT_IDLE_WAIT)
@@ -0,0 +1,240 @@
+"""Tests for module queueworker
+"""
+import os
+import tempfile
+import unittest
+from time import sleep
+from typing import Iterator, Optional
+from model import RSSFeedChannel, RSSFeedItem
+from feedpool import FeedLoaderPool
+from feedqueue import SQLiteFeedQueue
+from feedresults import FeedResult, FeedResultStore
+from queueworker import FeedQueueWorker, DEFAULT_IDLE_WAIT
+
+class MockRSSFeedLoader:
+    """Mock implementation of the RSSFeedLoader protocol with one item, or failing for
+    URLs of host missing.lnk. Used for testing purposes.
+    """
+    refresh_interval: Optional[float] = None
+
+    def __init__(self, url: str) -> None:
+        self.url: str = url
+
+    def load_rss_feed(self) -> None:
+        """Nothing to load"""
+        if 'missing.lnk' in self.url:
+            raise ValueError('missing feed')
+
+    def get_rss_feed_channel(self) -> RSSFeedChannel:
+        """Returns a channel with one item, whose items can be read once"""
+        return RSSFeedChannel(self.url, '', self.url, iter([RSSFeedItem('Item', '', self.url)]))
+
+    @staticmethod
+    def get_refresh_interval() -> Optional[float]:
+        """Returns seconds the feed asked to wait before it is loaded again"""
+        return MockRSSFeedLoader.refresh_interval
+
+    @staticmethod
+    def has_failed() -> bool:
+        """Returns False as feeds do not fail once loaded"""
+        return False
+
+class MockRSSFeedReader:
+    """Mock implementation of the RSSFeedReader protocol recording shown channels
+    """
+    def __init__(self) -> None:
+        self.shown: list[RSSFeedChannel] = []
+
+    @staticmethod
+    def initialise() -> None:
+        """Prepare the RSS Feed Reader instance"""
+
+    def show_rss_feed_content(self, content: RSSFeedChannel) -> None:
+        """Record shown channel"""
+        self.shown.append(content)
+
+class TestQueueWorker(unittest.TestCase):
+    """Tests for module queueworker members including class FeedQueueWorker
+    """
+    def setUp(self) -> None:
+        self.now: float = 1000.0
+        MockRSSFeedLoader.refresh_interval = None
+        self.feed_queue: SQLiteFeedQueue = SQLiteFeedQueue(':memory:', 'a',
+            now=lambda: self.now)
+        self.result_store: FeedResultStore = FeedResultStore(':memory:')
+        self.reader: MockRSSFeedReader = MockRSSFeedReader()
+        self.waits: list[float] = []
+        self.worker: FeedQueueWorker = FeedQueueWorker(self.feed_queue,
+            FeedLoaderPool(MockRSSFeedLoader), self.reader, 'a',
+            result_store=self.result_store, batch_size=2, default_interval=100,
+            min_interval=10, max_interval=1000, now=lambda: self.now, wait=self.wait)
+
+    def tearDown(self) -> None:
+        self.feed_queue.close()
+        self.result_store.close()
+
+    def wait(self, seconds: float) -> None:
+        """Mock sleep advancing the clock"""
+        self.waits.append(seconds)
+        self.now += seconds
+
+    def test_run_loads_due_feeds(self) -> None:
+        """Verify due feeds are loaded in batches, shown, stored and scheduled again after
+        the interval the feed asked for, until none is due
+        """
+        MockRSSFeedLoader.refresh_interval = 5000
+        self.feed_queue.add_rss_feed_urls(['http://a.lnk', 'http://b.lnk', 'http://c.lnk'])
+        self.worker.run()
+        self.assertEqual([channel.title for channel in self.reader.shown],
+            ['http://a.lnk', 'http://b.lnk', 'http://c.lnk'])
+        stored_result: FeedResult = self.result_store.get('http://b.lnk')
+        self.assertEqual(stored_result.worker_id, 'a')
+        self.assertEqual(len(stored_result.rss_feed_channel.items), 1)
+        self.now += 999
+        self.assertEqual(self.worker.run_once(), 0)
+        self.now += 1
+        self.assertEqual(self.worker.run_once(), 2)
+        self.assertEqual(self.feed_queue.get_statistics()['completed'], 5)
+
+    def test_failing_feed_is_retried_with_backoff(self) -> None:
+        """Verify a feed that failed is released, not stored, and retried after an interval
+        doubling with every failure
+        """
+        self.feed_queue.add_rss_feed_urls(['http://missing.lnk'])
+        self.worker.run(watch=True, max_rounds=12)
+        self.assertEqual(self.waits, [DEFAULT_IDLE_WAIT] * 10)
+        self.assertEqual(len(self.reader.shown), 2)
+        self.assertIsNone(self.result_store.get('http://missing.lnk'))
+        self.now += 10
+        self.assertEqual(self.worker.run_once(), 0)
+        self.now += 10
+        self.assertEqual(self.worker.run_once(), 1)
+        self.assertEqual(self.feed_queue.get_statistics()['released'], 3)
+
+    def test_run_waits_for_feeds_leased_by_other_workers(self) -> None:
+        """Verify a worker keeps waiting while feeds are due but leased by another worker,
+        and claims them once that lease ended
+        """
+        with tempfile.TemporaryDirectory() as queue_dir:
+            path: str = os.path.join(queue_dir, 'queue.db')
+            other_queue: SQLiteFeedQueue = SQLiteFeedQueue(path, 'b', lease_seconds=3,
+                now=lambda: self.now)
+            other_queue.add_rss_feed_urls(['http://a.lnk'])
+            self.assertEqual(len(other_queue.claim(1)), 1)
+            self.worker.feed_queue = SQLiteFeedQueue(path, 'a', worker_timeout=2,
+                now=lambda: self.now)
+            self.worker.run()
+            self.worker.feed_queue.close()
+            other_queue.close()
+        self.assertEqual(self.waits, [DEFAULT_IDLE_WAIT] * 3)
+        self.assertEqual([channel.title for channel in self.reader.shown], ['http://a.lnk'])
+
+    def test_leases_renewed_while_loading(self) -> None:
+        """Verify the lease on a feed loading longer than the lease is renewed, so the feed
+        is still completed by this worker
+        """
+        def load_slowly() -> None:
+            self.now += 0.15
+            sleep(0.3)
+            self.now += 0.15
+        def factory(url: str) -> MockRSSFeedLoader:
+            feedloader: MockRSSFeedLoader = MockRSSFeedLoader(url)
+            feedloader.load_rss_feed = load_slowly # type: ignore
+            return feedloader
+        feed_queue: SQLiteFeedQueue = SQLiteFeedQueue(':memory:', 'a', lease_seconds=0.2,
+            now=lambda: self.now)
+        feed_queue.add_rss_feed_urls(['http://a.lnk'])
+        worker: FeedQueueWorker = FeedQueueWorker(feed_queue, FeedLoaderPool(factory),
+            self.reader, 'a', now=lambda: self.now)
+        self.assertEqual(worker.run_once(), 1)
+        self.assertEqual(feed_queue.get_statistics()['completed'], 1)
+        feed_queue.close()
+
+    def test_skip_unchanged(self) -> None:
+        """Verify channels without items are not shown with skip_unchanged
+        """
+        self.feed_queue.add_rss_feed_urls(['http://a.lnk'])
+        self.worker.skip_unchanged = True
+        self.worker._finish(self.feed_queue.claim(1)[0], _EmptyRSSFeedLoader()) #pylint: disable=protected-access
+        self.assertEqual(self.reader.shown, [])
+        self.assertEqual(self.feed_queue.get_statistics()['completed'], 1)
+
+    def test_stores_all_loaded_items(self) -> None:
+        """Verify a feed is stored with all the items loaded, including those not shown
+        """
+        self.feed_queue.add_rss_feed_urls(['http://a.lnk'])
+        self.worker.skip_unchanged = True
+        self.worker._finish(self.feed_queue.claim(1)[0], _EmptyRSSFeedLoader()) #pylint: disable=protected-access
+        self.assertEqual(self.reader.shown, [])
+        self.assertEqual(self.result_store.get('http://a.lnk').rss_feed_channel.items,
+            [RSSFeedItem('Item', '', 'http://a.lnk')])
+
+    def test_failed_feed_without_refresh_interval(self) -> None:
+        """Verify a feed that failed is released and not stored, even if its loader does not
+        report a refresh interval
+        """
+        self.feed_queue.add_rss_feed_urls(['http://a.lnk'])
+        self.worker._finish(self.feed_queue.claim(1)[0], _FailedRSSFeedLoader()) #pylint: disable=protected-access
+        self.assertIsNone(self.result_store.get('http://a.lnk'))
+        self.assertEqual(self.feed_queue.get_statistics()['released'], 1)
+
+    def test_feed_read_in_part_fails(self) -> None:
+        """Verify a feed whose items are streamed and that fails only once they are read is
+        shown as far as it was read, then released and not stored
+        """
+        self.feed_queue.add_rss_feed_urls(['http://a.lnk'])
+        self.worker._finish(self.feed_queue.claim(1)[0], _PartlyReadRSSFeedLoader()) #pylint: disable=protected-access
+        self.assertEqual([len(channel.items) for channel in self.reader.shown], [1])
+        self.assertIsNone(self.result_store.get('http://a.lnk'))
+        self.assertEqual(self.feed_queue.get_statistics()['released'], 1)
+
+class _PartlyReadRSSFeedLoader(MockRSSFeedLoader):
+    """Mock implementation of the RSSFeedLoader protocol streaming its item, failing once
+    it has been read"""
+    def __init__(self) -> None:
+        super().__init__('http://a.lnk')
+        self.failed: bool = False
+
+    def _iter_items(self) -> Iterator[RSSFeedItem]:
+        """Yields the item of the feed, then fails"""
+        yield from super().get_rss_feed_channel().items
+        self.failed = True
+
+    def get_rss_feed_channel(self) -> RSSFeedChannel:
+        """Returns a channel whose item is read as it is iterated"""
+        return RSSFeedChannel(self.url, '', self.url, self._iter_items())
+
+    def has_failed(self) -> bool:
+        """Returns True once the item has been read"""
+        return self.failed
+
+class _EmptyRSSFeedLoader(MockRSSFeedLoader):
+    """Mock implementation of the RSSFeedLoader protocol without items to show, but with
+    one item loaded"""
+    def __init__(self) -> None:
+        super().__init__('http://a.lnk')
+
+    def get_rss_feed_channel(self) -> RSSFeedChannel:
+        """Returns a channel without items"""
+        return RSSFeedChannel(self.url, '', self.url, iter([]))
+
+    def get_loaded_rss_feed_channel(self) -> RSSFeedChannel:
+        """Returns a channel with the item loaded"""
+        return super().get_rss_feed_channel()
+
+class _FailedRSSFeedLoader:
+    """Mock implementation of the RSSFeedLoader protocol failing once loaded, without
+    a refresh interval"""
+    @staticmethod
+    def load_rss_feed() -> None:
+        """Nothing to load"""
+
+    @staticmethod
+    def get_rss_feed_channel() -> RSSFeedChannel:
+        """Returns a channel without items"""
+        return RSSFeedChannel('No title', 'Not served', 'http://a.lnk', [])
+
+    @staticmethod
+    def has_failed() -> bool:
+        """Returns True as the feed failed"""
+        return True
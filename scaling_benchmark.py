@@ -0,0 +1,101 @@
+"""Benchmark of parsing and converting feeds in a process pool, across process counts.
+
+Generated feeds are served from a local HTTP server and loaded end to end with app.main,
+first parsing and converting in the loading threads and then in a process pool of 1, 2,
+4, ... processes up to the CPU count. Each run starts with empty html2text memo caches.
+
+Usage: python scaling_benchmark.py --feeds 32 --items 200 --workers 16
+"""
+import json
+import os
+from argparse import ArgumentParser, Namespace
+from time import perf_counter
+from typing import Any, Optional, Sequence
+import feedloaders
+import app
+from feedfixtures import FeedFixtureServer, generate_feed
+from feedloaders import HTMLToTextConverter
+
+def _get_process_counts(max_processes: int) -> list[int]:
+    """Returns 1, 2, 4, ... up to and including max_processes
+    """
+    process_counts: list[int] = []
+    process_count: int = 1
+    while process_count < max_processes:
+        process_counts.append(process_count)
+        process_count *= 2
+    process_counts.append(max_processes)
+    return process_counts
+
+def _time_main(urls: list[str], extra_args: list[str]) -> float:
+    """Returns seconds taken by the application to show urls on the null device
+    """
+    feedloaders.html_to_text_converter = HTMLToTextConverter()
+    args: list[str] = [arg for url in urls for arg in ('--url', url)] + extra_args
+    start: float = perf_counter()
+    with open(os.devnull, mode='w', encoding='utf-8') as output_stream:
+        app.main(output_stream=output_stream, args=args)
+    return perf_counter() - start
+
+def run_benchmark(options: Namespace) -> dict[str, Any]:
+    """Returns seconds, throughput and speedup over loading threads for each process count
+    """
+    worker_args: list[str] = ['--workers', str(options.workers)]
+    runs: dict[str, dict[str, float]] = {}
+    with FeedFixtureServer(latency=options.latency) as server:
+        urls: list[str] = [
+            server.add_feed(f'/feed/{index}', generate_feed(
+                options.items, description_size=options.description_size, name=str(index)))
+            for index in range(options.feeds)
+        ]
+        thread_seconds: float = _time_main(urls, worker_args)
+        runs['threads'] = {'seconds': thread_seconds, 'speedup': 1.0}
+        process_count: int
+        for process_count in _get_process_counts(options.max_processes):
+            seconds: float = _time_main(
+                urls, worker_args + ['--processes', str(process_count)])
+            runs[f'{process_count} processes'] = {
+                'seconds': seconds, 'speedup': thread_seconds / seconds}
+    item_count: int = options.feeds * options.items
+    run: dict[str, float]
+    for run in runs.values():
+        run['items_per_second'] = item_count / run['seconds']
+    return {
+        'options': {key: value for key, value in vars(options).items() if key != 'json'},
+        'cpu_count': os.cpu_count(),
+        'items': item_count,
+        'runs': runs
+    }
+
+def print_report(report: dict[str, Any]) -> None:
+    """Print report as a table"""
+    print(f"{report['items']} items, {report['cpu_count']} CPUs")
+    print(f"{'run':<14}{'seconds':>10}{'items/s':>10}{'speedup':>10}")
+    name: str
+    run: dict[str, float]
+    for name, run in report['runs'].items():
+        print(f"{name:<14}{run['seconds']:>10.3f}{run['items_per_second']:>10.0f}"
+            f"{run['speedup']:>10.2f}")
+
+def main(args: Optional[Sequence[str]]=None) -> None:
+    """Run the benchmark with options from the command line"""
+    parser: ArgumentParser = ArgumentParser(description=__doc__.split('\n', 1)[0])
+    parser.add_argument('--feeds', type=int, default=32, help='number of feeds served')
+    parser.add_argument('--items', type=int, default=200, help='items per feed')
+    parser.add_argument('--description-size', type=int, default=1000,
+        help='approximate characters per item description')
+    parser.add_argument('--latency', type=float, default=0.0,
+        help='seconds the server waits before each response')
+    parser.add_argument('--workers', type=int, default=16, help='feeds loaded concurrently')
+    parser.add_argument('--max-processes', type=int, default=os.cpu_count() or 1,
+        help='largest process pool measured')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    options: Namespace = parser.parse_args(args)
+    report: dict[str, Any] = run_benchmark(options)
+    if not options.json:
+        print_report(report)
+        return
+    print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark of the full-text search index, indexing synthetic feeds into a temporary
+file and timing searches for common, rare and prefix words.
+
+Usage: python search_benchmark.py [item count] [items per feed]
+"""
+import os
+import sys
+import tempfile
+from statistics import median
+from time import perf_counter
+from model import RSSFeedChannel, RSSFeedItem
+from searchindex import SearchIndex
+
+QUERIES: tuple[str, ...] = ('word1', 'word13 word42', 'story7*', '"word5 word6"', 'missing')
+
+def _build_channel(feed: int, item_count: int) -> RSSFeedChannel:
+    """Build channel number feed of item_count items with varied descriptions
+    """
+    return RSSFeedChannel(f'Channel {feed}', '', f'http://channel{feed}.example.com/', [
+        RSSFeedItem(f'Story{index % 1000} of channel {feed}',
+            ' '.join(f'word{(index * 7 + count) % 997}' for count in range(60)),
+            f'http://channel{feed}.example.com/item/{index}')
+        for index in range(item_count)])
+
+def measure_query_milliseconds(search_index: SearchIndex, query: str,
+repeat: int=20) -> float:
+    """Returns median milliseconds taken to search for query
+    """
+    timings: list[float] = []
+    for _ in range(repeat):
+        start: float = perf_counter()
+        search_index.search(query)
+        timings.append((perf_counter() - start) * 1000)
+    return median(timings)
+
+def main(item_count: int=100000, items_per_feed: int=1000) -> None:
+    """Print indexing throughput and search latency"""
+    with tempfile.TemporaryDirectory() as index_dir:
+        search_index: SearchIndex = SearchIndex(os.path.join(index_dir, 'index.db'))
+        start: float = perf_counter()
+        feed: int
+        for feed in range(max(1, item_count // items_per_feed)):
+            search_index.add_rss_feed_channel(f'http://channel{feed}.example.com/feed',
+                _build_channel(feed, items_per_feed))
+        seconds: float = perf_counter() - start
+        indexed: int = search_index.get_statistics()['entries']
+        print(f'indexed {indexed} items in {seconds:.3f} s, {indexed / seconds:.0f} items/s')
+        query: str
+        for query in QUERIES:
+            print(f'{query:<16}{measure_query_milliseconds(search_index, query):8.2f} ms')
+        search_index.close()
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,107 @@
+"""searchindex: persistent full-text index of loaded feed items, updated as feeds load,
+so items fetched before can be searched without loading their feeds again
+"""
+import sqlite3
+from dataclasses import dataclass
+from time import time
+from typing import Optional
+from model import RSSFeedChannel, RSSFeedItem
+from sqlitestore import SQLiteStore
+from seenindex import get_item_identity
+
+DEFAULT_SEARCH_LIMIT: int = 20
+# words of the description shown around the matching words of each search result
+SNIPPET_WORDS: int = 16
+
+@dataclass
+class SearchResult:
+    """ Representation of an indexed feed item matching a search, with an excerpt of
+    its description around the matching words """
+    feed: str
+    title: str
+    link: str
+    snippet: str
+    first_seen: float
+
+class SearchIndex(SQLiteStore):
+    """SQLite backed full-text index of feed items, using an FTS5 inverted index over item
+    titles and descriptions. Items are keyed by feed and identity, their link or else a hash
+    of their content, so loading a feed again only updates the items that changed and keeps
+    the time each item was first seen.
+    """
+    def __init__(self, path: str) -> None:
+        """Build a SearchIndex stored in the SQLite database file at path
+        """
+        super().__init__(path, '''
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY, feed TEXT NOT NULL, item_key TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL, link TEXT NOT NULL, description TEXT NOT NULL,
+                first_seen REAL NOT NULL, last_seen REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS items_first_seen ON items (first_seen);
+            CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+                title, description, content='items', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2');
+            CREATE TRIGGER IF NOT EXISTS items_after_insert AFTER INSERT ON items BEGIN
+                INSERT INTO items_fts (rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END;
+            CREATE TRIGGER IF NOT EXISTS items_after_update AFTER UPDATE ON items
+            WHEN old.title IS NOT new.title OR old.description IS NOT new.description BEGIN
+                INSERT INTO items_fts (items_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+                INSERT INTO items_fts (rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END;
+        ''')
+        self.indexed: int = 0
+
+    @staticmethod
+    def _get_item_key(feed: str, item: RSSFeedItem) -> str:
+        """Returns the key of item in feed: its link, or a hash of its content if it has
+        no link
+        """
+        return f'{feed}\n{get_item_identity(item)}'
+
+    def add_rss_feed_channel(self, feed: str, rss_feed_channel: RSSFeedChannel) -> None:
+        """Index the items of rss_feed_channel loaded from feed, adding new items and
+        updating those indexed before
+        """
+        now: float = time()
+        rows: list[tuple[str, str, str, str, str, float, float]] = [
+            (feed, SearchIndex._get_item_key(feed, item), item.title, item.link,
+                item.description, now, now)
+            for item in rss_feed_channel.items
+        ]
+        with self.lock, self.connection:
+            self.connection.executemany(
+                'INSERT INTO items (feed, item_key, title, link, description, first_seen, '
+                'last_seen) VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (item_key) DO UPDATE SET '
+                'title = excluded.title, link = excluded.link, '
+                'description = excluded.description, last_seen = excluded.last_seen', rows)
+            self.indexed += len(rows)
+
+    def search(self, query: str, since: Optional[float]=None,
+    limit: int=DEFAULT_SEARCH_LIMIT) -> list[SearchResult]:
+        """Returns up to limit items matching query, in the FTS5 query syntax, best matches
+        first. With since, only items first seen since that time are returned.
+        ValueError: If query is not a valid FTS5 query
+        """
+        try:
+            with self.lock:
+                rows: list[tuple[str, str, str, str, float]] = self.connection.execute(
+                    'SELECT items.feed, items.title, items.link, '
+                    "snippet(items_fts, 1, '', '', '...', ?), items.first_seen "
+                    'FROM items_fts JOIN items ON items.id = items_fts.rowid '
+                    'WHERE items_fts MATCH ? AND items.first_seen >= ? '
+                    'ORDER BY items_fts.rank LIMIT ?',
+                    (SNIPPET_WORDS, query, since or 0.0, limit)).fetchall()
+        except sqlite3.OperationalError as error:
+            raise ValueError(f'Invalid search query: {error}') from error
+        return [SearchResult(*row) for row in rows]
+
+    def get_statistics(self) -> dict[str, int]:
+        """Returns counters of items indexed in this run and of items in the index
+        """
+        with self.lock:
+            entries: int = self.connection.execute('SELECT COUNT(*) FROM items').fetchone()[0]
+            return {'indexed': self.indexed, 'entries': entries}
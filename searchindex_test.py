@@ -0,0 +1,102 @@
+"""Tests for module searchindex
+"""
+import os
+import tempfile
+import unittest
+from model import RSSFeedChannel, RSSFeedItem
+from searchindex import SearchIndex, SearchResult
+
+def _build_channel(*items: tuple[str, str, str]) -> RSSFeedChannel:
+    """Returns a channel of items given as title, description and link
+    """
+    return RSSFeedChannel('Channel', '', 'http://feed.lnk',
+        [RSSFeedItem(title, description, link) for title, description, link in items])
+
+class TestSearchIndex(unittest.TestCase):
+    """Tests for class SearchIndex
+    """
+    def test_search_finds_matching_items(self) -> None:
+        """Verify items are found by words of their title or description, ignoring case
+        and diacritics, best matches first
+        """
+        search_index: SearchIndex = SearchIndex(':memory:')
+        search_index.add_rss_feed_channel('http://feed.lnk', _build_channel(
+            ('Python release', 'A new Python version', 'http://feed.lnk/1'),
+            ('Café opening', 'Coffee and Python meetup', 'http://feed.lnk/2'),
+            ('Weather', 'Sunny', 'http://feed.lnk/3')))
+        actual_result: list[str] = [result.link for result in search_index.search('python')]
+        self.assertEqual(actual_result, ['http://feed.lnk/1', 'http://feed.lnk/2'])
+        actual_result = [result.title for result in search_index.search('CAFE')]
+        self.assertEqual(actual_result, ['Café opening'])
+        self.assertEqual(search_index.search('snow'), [])
+        search_index.close()
+
+    def test_search_result(self) -> None:
+        """Verify search results carry the feed, item and an excerpt of the description
+        """
+        search_index: SearchIndex = SearchIndex(':memory:')
+        search_index.add_rss_feed_channel('http://feed.lnk', _build_channel(
+            ('Title', 'Some description here.', 'http://feed.lnk/1')))
+        actual_result: SearchResult = search_index.search('description')[0]
+        self.assertEqual((actual_result.feed, actual_result.title, actual_result.link,
+            actual_result.snippet), ('http://feed.lnk', 'Title', 'http://feed.lnk/1',
+            'Some description here.'))
+        search_index.close()
+
+    def test_add_rss_feed_channel_updates_items(self) -> None:
+        """Verify loading a feed again updates its items instead of adding them again,
+        and keeps the time they were first seen
+        """
+        search_index: SearchIndex = SearchIndex(':memory:')
+        search_index.add_rss_feed_channel('http://feed.lnk', _build_channel(
+            ('Title', 'Old words', 'http://feed.lnk/1')))
+        first_seen: float = search_index.search('old')[0].first_seen
+        search_index.add_rss_feed_channel('http://feed.lnk', _build_channel(
+            ('Title', 'New words', 'http://feed.lnk/1'), ('Other', 'New too', '')))
+        self.assertEqual(search_index.search('old'), [])
+        self.assertEqual([result.first_seen for result in search_index.search('words')],
+            [first_seen])
+        self.assertEqual(len(search_index.search('new')), 2)
+        self.assertEqual(search_index.get_statistics(), {'indexed': 3, 'entries': 2})
+        search_index.close()
+
+    def test_add_rss_feed_channel_keeps_items_without_link(self) -> None:
+        """Verify items without a link are all indexed rather than replacing each other
+        """
+        search_index: SearchIndex = SearchIndex(':memory:')
+        search_index.add_rss_feed_channel('http://feed.lnk', _build_channel(
+            ('First', 'Linkless story', 'No link'), ('Second', 'Linkless story', 'No link')))
+        self.assertEqual(sorted(result.title for result in search_index.search('linkless')),
+            ['First', 'Second'])
+        self.assertEqual(search_index.get_statistics(), {'indexed': 2, 'entries': 2})
+        search_index.close()
+
+    def test_search_since_and_limit(self) -> None:
+        """Verify items first seen before since are not found, and at most limit are
+        """
+        search_index: SearchIndex = SearchIndex(':memory:')
+        search_index.add_rss_feed_channel('http://feed.lnk', _build_channel(
+            *[(f'Item {index}', 'word', f'http://feed.lnk/{index}') for index in range(5)]))
+        self.assertEqual(len(search_index.search('word', limit=3)), 3)
+        self.assertEqual(search_index.search('word', since=4102444800.0), [])
+        search_index.close()
+
+    def test_search_invalid_query(self) -> None:
+        """Verify a query that is not valid FTS5 syntax raises ValueError
+        """
+        search_index: SearchIndex = SearchIndex(':memory:')
+        self.assertRaises(ValueError, search_index.search, '"unterminated')
+        search_index.close()
+
+    def test_search_index_persists(self) -> None:
+        """Verify indexed items are found after the index is opened again
+        """
+        with tempfile.TemporaryDirectory() as index_dir:
+            path: str = os.path.join(index_dir, 'index.db')
+            search_index: SearchIndex = SearchIndex(path)
+            search_index.add_rss_feed_channel('http://feed.lnk', _build_channel(
+                ('Title', 'Kept words', 'http://feed.lnk/1')))
+            search_index.close()
+            search_index = SearchIndex(path)
+            self.assertEqual(len(search_index.search('kept')), 1)
+            search_index.close()
@@ -0,0 +1,160 @@
+"""seenindex: persistent index of feed items already seen, across feeds and runs, so
+they can be dropped before they are converted and shown again
+"""
+from hashlib import blake2b
+from math import ceil, log
+from time import time
+from typing import Any, Iterable
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from model import RSSFeedItem
+from sqlitestore import SQLiteStore
+
+DEFAULT_MAX_AGE: float = 90 * 24 * 60 * 60
+DEFAULT_EXPECTED_ITEMS: int = 1000000
+DEFAULT_FALSE_POSITIVE_RATE: float = 0.01
+# query parameters that only track where a link was followed from
+_TRACKING_PARAMETER_PREFIXES: tuple[str, ...] = ('utm_', 'fbclid', 'gclid')
+
+def normalize_link(link: str) -> str:
+    """Return link with scheme and host in lower case, without fragment, tracking
+    query parameters or trailing slash, so links to the same story compare equal
+    """
+    parts = urlsplit(link.strip())
+    query: str = urlencode([
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith(_TRACKING_PARAMETER_PREFIXES)
+    ])
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(),
+        parts.path.rstrip('/'), query, ''))
+
+def get_parsed_rss_feed_item_identities(parsed_rss_feed_item: dict[str, Any]) -> list[str]:
+    """Return the identities of a parsed feed item: its normalized link and its guid,
+    or a digest of its raw content if it has neither
+    """
+    identities: list[str] = []
+    link: str = str(parsed_rss_feed_item.get('link') or '')
+    if link:
+        identities.append('link:' + normalize_link(link))
+    guid: str = str(parsed_rss_feed_item.get('id') or '')
+    if guid and guid != link:
+        identities.append('guid:' + guid)
+    if not identities:
+        content: str = (f"{parsed_rss_feed_item.get('title', '')}\n"
+            f"{parsed_rss_feed_item.get('description', '')}")
+        identities.append('content:' + blake2b(
+            content.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest())
+    return identities
+
+def get_item_identity(item: RSSFeedItem) -> str:
+    """Return a string identifying item, its link if it has one or else a hash of its content
+    """
+    if item.link and item.link != 'No link':
+        return item.link
+    return blake2b(f'{item.title}\n{item.description}'.encode('utf-8', 'surrogatepass'),
+        digest_size=16).hexdigest()
+
+class BloomFilter:
+    """Fixed size set of digests that may report false positives but no false negatives
+    """
+    def __init__(self, expected_items: int, false_positive_rate: float) -> None:
+        """Build a BloomFilter sized for expected_items at false_positive_rate
+        """
+        self.bit_count: int = max(8, ceil(
+            -expected_items * log(false_positive_rate) / log(2) ** 2))
+        self.hash_count: int = max(1, round(self.bit_count / max(1, expected_items) * log(2)))
+        self.bits: bytearray = bytearray((self.bit_count + 7) // 8)
+
+    def _get_bit_indexes(self, digest: bytes) -> Iterable[int]:
+        """Yields the bit indexes for a 16 byte digest by double hashing
+        """
+        first: int = int.from_bytes(digest[:8], 'little')
+        second: int = int.from_bytes(digest[8:16], 'little') | 1
+        index: int
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.bit_count
+
+    def add(self, digest: bytes) -> None:
+        """Add digest to the set"""
+        bit_index: int
+        for bit_index in self._get_bit_indexes(digest):
+            self.bits[bit_index >> 3] |= 1 << (bit_index & 7)
+
+    def __contains__(self, digest: bytes) -> bool:
+        """Returns True if digest may be in the set, False if it certainly is not"""
+        return all(self.bits[bit_index >> 3] & (1 << (bit_index & 7))
+            for bit_index in self._get_bit_indexes(digest))
+
+class SeenItemIndex(SQLiteStore):
+    """SQLite backed set of item identity digests with an in-memory Bloom filter in front,
+    so unseen items, the common case, are recognised without a database lookup.
+    Identities not seen again for max_age seconds are pruned when the index is opened.
+    """
+    def __init__(self, path: str, max_age: float=DEFAULT_MAX_AGE,
+    expected_items: int=DEFAULT_EXPECTED_ITEMS,
+    false_positive_rate: float=DEFAULT_FALSE_POSITIVE_RATE) -> None:
+        """Build a SeenItemIndex stored in the SQLite database file at path
+        """
+        super().__init__(path,
+            'CREATE TABLE IF NOT EXISTS seen_items ('
+            'identity BLOB PRIMARY KEY, seen_at REAL NOT NULL) WITHOUT ROWID')
+        self.seen: int = 0
+        self.unseen: int = 0
+        with self.connection:
+            self.connection.execute(
+                'DELETE FROM seen_items WHERE seen_at < ?', (time() - max_age,))
+        self.bloom_filter: BloomFilter = BloomFilter(expected_items, false_positive_rate)
+        digest: bytes
+        for (digest,) in self.connection.execute('SELECT identity FROM seen_items'):
+            self.bloom_filter.add(digest)
+
+    @staticmethod
+    def _get_digest(identity: str) -> bytes:
+        """Return compact fixed size digest of identity
+        """
+        return blake2b(identity.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+    def _contains(self, digest: bytes) -> bool:
+        """Returns True if digest is in the index
+        """
+        if digest not in self.bloom_filter:
+            return False
+        return self.connection.execute(
+            'SELECT 1 FROM seen_items WHERE identity = ?', (digest,)).fetchone() is not None
+
+    def check_and_add(self, identities: list[str]) -> bool:
+        """Returns True if any of the identities of an item has been seen before.
+        All identities are then recorded as seen now, to be saved by commit.
+        """
+        digests: list[bytes] = [SeenItemIndex._get_digest(identity) for identity in identities]
+        now: float = time()
+        with self.lock:
+            seen: bool = any(self._contains(digest) for digest in digests)
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO seen_items VALUES (?, ?)',
+                [(digest, now) for digest in digests])
+            digest: bytes
+            for digest in digests:
+                self.bloom_filter.add(digest)
+            if seen:
+                self.seen += 1
+            else:
+                self.unseen += 1
+        return seen
+
+    def commit(self) -> None:
+        """Save identities recorded since the last commit"""
+        with self.lock:
+            self.connection.commit()
+
+    def get_statistics(self) -> dict[str, int]:
+        """Returns counters of items seen before, items not seen before and indexed identities
+        """
+        with self.lock:
+            entries: int = self.connection.execute('SELECT COUNT(*) FROM seen_items').fetchone()[0]
+            return {'seen': self.seen, 'unseen': self.unseen, 'entries': entries}
+
+    def close(self) -> None:
+        """Save recorded identities and close the underlying database"""
+        with self.lock:
+            self.connection.commit()
+        super().close()
@@ -0,0 +1,83 @@
+"""Tests for module seenindex
+"""
+import os
+import tempfile
+import unittest
+from seenindex import BloomFilter, SeenItemIndex
+from seenindex import get_item_identity, get_parsed_rss_feed_item_identities, normalize_link
+from model import RSSFeedItem
+
+class TestSeenItemIndex(unittest.TestCase):
+    """Tests for module seenindex members including class SeenItemIndex
+    """
+    def test_normalize_link(self) -> None:
+        """Verify links differing only in case of host, fragment, tracking parameters or
+        trailing slash are normalized alike
+        """
+        self.assertEqual(
+            normalize_link(' HTTP://Example.COM/story/?id=1&utm_source=feed&fbclid=x#top '),
+            'http://example.com/story?id=1')
+        self.assertEqual(normalize_link('http://example.com/story'),
+            'http://example.com/story')
+
+    def test_get_parsed_rss_feed_item_identities(self) -> None:
+        """Verify items are identified by link and guid, or by content without either
+        """
+        self.assertEqual(get_parsed_rss_feed_item_identities(
+            {'link': 'http://A.lnk/1/', 'id': 'urn:1'}), ['link:http://a.lnk/1', 'guid:urn:1'])
+        self.assertEqual(get_parsed_rss_feed_item_identities(
+            {'link': 'http://a.lnk/1', 'id': 'http://a.lnk/1'}), ['link:http://a.lnk/1'])
+        identities: list[str] = get_parsed_rss_feed_item_identities({'title': 'a'})
+        self.assertEqual(len(identities), 1)
+        self.assertTrue(identities[0].startswith('content:'))
+        self.assertEqual(identities, get_parsed_rss_feed_item_identities({'title': 'a'}))
+        self.assertNotEqual(identities, get_parsed_rss_feed_item_identities({'title': 'b'}))
+
+    def test_get_item_identity(self) -> None:
+        """Verify items are identified by link, or by content without a link
+        """
+        self.assertEqual(get_item_identity(RSSFeedItem('T', 'D', 'http://x.lnk')), 'http://x.lnk')
+        self.assertEqual(get_item_identity(RSSFeedItem('T', 'D', 'No link')),
+            get_item_identity(RSSFeedItem('T', 'D', '')))
+        self.assertNotEqual(get_item_identity(RSSFeedItem('T', 'D', '')),
+            get_item_identity(RSSFeedItem('T', 'E', '')))
+
+    def test_bloom_filter(self) -> None:
+        """Verify added digests are always found and few others are
+        """
+        bloom_filter: BloomFilter = BloomFilter(1000, 0.01)
+        digests: list[bytes] = [index.to_bytes(16, 'little') for index in range(2000)]
+        digest: bytes
+        for digest in digests[:1000]:
+            bloom_filter.add(digest)
+        self.assertTrue(all(digest in bloom_filter for digest in digests[:1000]))
+        self.assertLess(sum(digest in bloom_filter for digest in digests[1000:]), 50)
+
+    def test_check_and_add(self) -> None:
+        """Verify an item is seen if any of its identities was seen before
+        """
+        seen_index: SeenItemIndex = SeenItemIndex(':memory:')
+        self.assertFalse(seen_index.check_and_add(['link:a', 'guid:1']))
+        self.assertTrue(seen_index.check_and_add(['link:a']))
+        self.assertTrue(seen_index.check_and_add(['link:b', 'guid:1']))
+        self.assertFalse(seen_index.check_and_add(['link:c']))
+        self.assertEqual(seen_index.get_statistics(), {'seen': 2, 'unseen': 2, 'entries': 4})
+        seen_index.close()
+
+    def test_persists_across_runs(self) -> None:
+        """Verify committed identities are seen when the index is opened again, until they
+        are older than max_age
+        """
+        with tempfile.TemporaryDirectory() as index_dir:
+            path: str = os.path.join(index_dir, 'seen.db')
+            seen_index: SeenItemIndex = SeenItemIndex(path)
+            seen_index.check_and_add(['link:a'])
+            seen_index.commit()
+            seen_index.close()
+            seen_index = SeenItemIndex(path)
+            self.assertTrue(seen_index.check_and_add(['link:a']))
+            seen_index.close()
+            seen_index = SeenItemIndex(path, max_age=-1)
+            self.assertEqual(seen_index.get_statistics()['entries'], 0)
+            self.assertFalse(seen_index.check_and_add(['link:a']))
+            seen_index.close()
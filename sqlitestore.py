@@ -0,0 +1,30 @@
+"""sqlitestore: SQLite database setup shared by the persistent stores of rss-feed-reader
+"""
+import sqlite3
+from threading import Lock
+from typing import Optional
+
+# seconds to wait for a database another process is writing to, as sqlite3 does by default
+DEFAULT_TIMEOUT: float = 5.0
+
+class SQLiteStore: # pylint: disable=too-few-public-methods
+    """Base of the stores kept in a SQLite database file. The connection may be used from
+    any thread while holding lock, and the tables of the store are created by schema, a
+    script of SQL statements, when the database is opened.
+    """
+    def __init__(self, path: str, schema: str, timeout: float=DEFAULT_TIMEOUT,
+    isolation_level: Optional[str]='') -> None:
+        """Build a SQLiteStore stored in the SQLite database file at path, waiting up to
+        timeout seconds for other processes writing to it. With isolation_level None,
+        transactions are only begun explicitly.
+        """
+        self.lock: Lock = Lock()
+        self.connection: sqlite3.Connection = sqlite3.connect(path, timeout=timeout,
+            isolation_level=isolation_level, check_same_thread=False)
+        with self.connection:
+            self.connection.executescript(schema)
+
+    def close(self) -> None:
+        """Close the underlying database"""
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,44 @@
+"""Tests for module sqlitestore
+"""
+import os
+import sqlite3
+import tempfile
+import unittest
+from threading import Thread
+from sqlitestore import SQLiteStore
+
+class TestSQLiteStore(unittest.TestCase):
+    """Tests for module sqlitestore members including class SQLiteStore
+    """
+    def test_schema_and_threads(self) -> None:
+        """Verify tables of the schema are created once, and the database is usable from
+        another thread while holding the lock and closed by close
+        """
+        with tempfile.TemporaryDirectory() as store_dir:
+            path: str = os.path.join(store_dir, 'store.db')
+            schema: str = ('CREATE TABLE IF NOT EXISTS a (x INTEGER);'
+                'CREATE TABLE IF NOT EXISTS b (y INTEGER);')
+            SQLiteStore(path, schema).close()
+            sqlite_store: SQLiteStore = SQLiteStore(path, schema)
+            def insert() -> None:
+                with sqlite_store.lock, sqlite_store.connection:
+                    sqlite_store.connection.execute('INSERT INTO a VALUES (1)')
+            thread: Thread = Thread(target=insert)
+            thread.start()
+            thread.join()
+            self.assertEqual(sqlite_store.connection.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0], 2)
+            self.assertEqual(sqlite_store.connection.execute(
+                'SELECT x FROM a').fetchall(), [(1,)])
+            sqlite_store.close()
+            self.assertRaises(sqlite3.ProgrammingError, sqlite_store.connection.execute,
+                'SELECT 1')
+
+    def test_explicit_transactions(self) -> None:
+        """Verify with isolation_level None no transaction is begun implicitly
+        """
+        sqlite_store: SQLiteStore = SQLiteStore(':memory:',
+            'CREATE TABLE a (x INTEGER);', isolation_level=None)
+        sqlite_store.connection.execute('INSERT INTO a VALUES (1)')
+        self.assertFalse(sqlite_store.connection.in_transaction)
+        sqlite_store.close()